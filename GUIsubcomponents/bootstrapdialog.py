@@ -0,0 +1,132 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+from PyQt5 import QtCore, QtWidgets
+
+class BootstrapWindow(QtWidgets.QDialog):
+    """
+    BootstrapWindow enables a user to set up bootstrap confidence intervals
+    of the MLE fit of a candidate distribution: the resampling mode, the
+    number of resamples, the confidence level and a time budget.
+
+    BootstrapWindow is subordinate to the main gamut window, and accepts the
+    name of the distribution, the available modes and the default settings
+    (a dict with the keys of getSettings) as arguments.
+    """
+
+    def __init__(self,
+                 parent,
+                 dist_name,
+                 modes=("nonparametric", "parametric"),
+                 defaults=None):
+        super().__init__(parent=parent)
+
+        # Defaults
+        self.settings = None
+
+        # Definite attributes
+        self.distribution = dist_name
+        self.modes        = list(modes)
+        self.defaults     = dict(defaults or {})
+        self.initUI()
+
+
+    def initUI(self):
+        """
+        Set up user interface
+        """
+        # Window Widget
+        self.setWindowTitle("Bootstrap: " + self.distribution)
+        self.resize(354, 190)
+        self.windowWidget = QtWidgets.QWidget(self)
+        self.windowWidget.setGeometry(QtCore.QRect(0, 0, 351, 180))
+
+        # Labels
+        self.modeLabel = QtWidgets.QLabel()
+        self.modeLabel.setText("Resampling")
+        self.resamplesLabel = QtWidgets.QLabel()
+        self.resamplesLabel.setText("Number of Resamples")
+        self.levelLabel = QtWidgets.QLabel()
+        self.levelLabel.setText("Confidence Level")
+        self.budgetLabel = QtWidgets.QLabel()
+        self.budgetLabel.setText("Time Budget [s]")
+
+        # Inputs
+        self.modeComboBox = QtWidgets.QComboBox()
+        self.modeComboBox.addItems(self.modes)
+        if self.defaults.get("mode") in self.modes:
+            self.modeComboBox.setCurrentIndex(
+                self.modes.index(self.defaults["mode"]))
+        self.resamplesSpinBox = QtWidgets.QSpinBox()
+        self.resamplesSpinBox.setRange(10, 100000)
+        self.resamplesSpinBox.setValue(self.defaults.get("resamples", 200))
+        self.levelSpinBox = QtWidgets.QDoubleSpinBox()
+        self.levelSpinBox.setRange(0.5, 0.999)
+        self.levelSpinBox.setDecimals(3)
+        self.levelSpinBox.setSingleStep(0.01)
+        self.levelSpinBox.setValue(self.defaults.get("level", 0.95))
+        self.budgetSpinBox = QtWidgets.QDoubleSpinBox()
+        self.budgetSpinBox.setRange(0.0, 86400.0)
+        self.budgetSpinBox.setDecimals(1)
+        self.budgetSpinBox.setSpecialValueText("No limit")
+        self.budgetSpinBox.setValue(self.defaults.get("budget") or 0.0)
+
+        # Button
+        self.startButton = QtWidgets.QPushButton()
+        self.startButton.setText("Start")
+        self.startButton.clicked.connect(self.acceptSettings)
+
+        # Spacers
+        spacerItem2 = QtWidgets.QSpacerItem(40, 20,
+                                            QtWidgets.QSizePolicy.Expanding,
+                                            QtWidgets.QSizePolicy.Minimum)
+        spacerItem3 = QtWidgets.QSpacerItem(40, 20,
+                                            QtWidgets.QSizePolicy.Expanding,
+                                            QtWidgets.QSizePolicy.Minimum)
+
+        # Layout Objects
+        self.gridLayout = QtWidgets.QGridLayout()
+        self.gridLayout.addWidget(self.modeLabel, 0, 0, 1, 1)
+        self.gridLayout.addWidget(self.modeComboBox, 0, 1, 1, 1)
+        self.gridLayout.addWidget(self.resamplesLabel, 1, 0, 1, 1)
+        self.gridLayout.addWidget(self.resamplesSpinBox, 1, 1, 1, 1)
+        self.gridLayout.addWidget(self.levelLabel, 2, 0, 1, 1)
+        self.gridLayout.addWidget(self.levelSpinBox, 2, 1, 1, 1)
+        self.gridLayout.addWidget(self.budgetLabel, 3, 0, 1, 1)
+        self.gridLayout.addWidget(self.budgetSpinBox, 3, 1, 1, 1)
+
+        self.horizontalLayout = QtWidgets.QHBoxLayout()
+        self.horizontalLayout.addItem(spacerItem2)
+        self.horizontalLayout.addWidget(self.startButton)
+        self.horizontalLayout.addItem(spacerItem3)
+
+        self.verticalLayout = QtWidgets.QVBoxLayout(self.windowWidget)
+        self.verticalLayout.setContentsMargins(10, 10, 10, 10)
+        self.verticalLayout.addLayout(self.gridLayout)
+        self.verticalLayout.addLayout(self.horizontalLayout)
+
+        QtCore.QMetaObject.connectSlotsByName(self)
+        self.show()
+
+    def acceptSettings(self):
+        """
+        Store the bootstrap settings as self.settings
+        """
+        self.settings = {"mode"      : self.modeComboBox.currentText(),
+                         "resamples" : self.resamplesSpinBox.value(),
+                         "level"     : self.levelSpinBox.value(),
+                         "budget"    : self.budgetSpinBox.value() or None}
+        self.accept()
+
+    def getSettings(self):
+        """
+        Return the bootstrap settings (mode, resamples, level, budget) or None
+        """
+        return self.settings
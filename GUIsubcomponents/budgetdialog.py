@@ -0,0 +1,127 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+from PyQt5 import QtCore, QtWidgets
+
+class TimeBudgetWindow(QtWidgets.QDialog):
+    """
+    TimeBudgetWindow enables a user to set the wall-clock time budget of each
+    distribution's fit, globally and for particular distributions.  Fits out
+    of time are stopped and reported as timed out.
+
+    TimeBudgetWindow is subordinate to the main gamut window, and accepts the
+    current global budget (seconds, None for no limit), the per-distribution
+    budgets (a dict) and the known distribution labels as arguments.
+    """
+
+    def __init__(self,
+                 parent,
+                 budget=None,
+                 family_budgets=None,
+                 labels=()):
+        super().__init__(parent=parent)
+
+        # Defaults
+        self.budgets = None
+
+        # Definite attributes
+        self.budget         = budget
+        self.family_budgets = dict(family_budgets or {})
+        self.labels         = set(labels)
+        self.initUI()
+
+
+    def initUI(self):
+        """
+        Set up user interface
+        """
+        # Window Widget
+        self.setWindowTitle("Fit Time Budgets")
+        self.resize(354, 260)
+        self.windowWidget = QtWidgets.QWidget(self)
+        self.windowWidget.setGeometry(QtCore.QRect(0, 0, 351, 250))
+
+        # Labels
+        self.budgetLabel = QtWidgets.QLabel()
+        self.budgetLabel.setText("Budget per Fit [s]")
+        self.familyLabel = QtWidgets.QLabel()
+        self.familyLabel.setText("Per Distribution (one 'label = seconds' "
+                                 "per line):")
+
+        # Inputs
+        self.budgetSpinBox = QtWidgets.QDoubleSpinBox()
+        self.budgetSpinBox.setRange(0.0, 86400.0)
+        self.budgetSpinBox.setDecimals(1)
+        self.budgetSpinBox.setSpecialValueText("No limit")
+        self.budgetSpinBox.setValue(self.budget or 0.0)
+        self.familyTextEdit = QtWidgets.QPlainTextEdit()
+        self.familyTextEdit.setPlainText(
+            "\n".join("%s = %g" % (label, seconds) for label, seconds in
+                      sorted(self.family_budgets.items())))
+
+        # Button
+        self.okButton = QtWidgets.QPushButton()
+        self.okButton.setText("OK")
+        self.okButton.clicked.connect(self.acceptBudgets)
+
+        # Spacers
+        spacerItem2 = QtWidgets.QSpacerItem(40, 20,
+                                            QtWidgets.QSizePolicy.Expanding,
+                                            QtWidgets.QSizePolicy.Minimum)
+        spacerItem3 = QtWidgets.QSpacerItem(40, 20,
+                                            QtWidgets.QSizePolicy.Expanding,
+                                            QtWidgets.QSizePolicy.Minimum)
+
+        # Layout Objects
+        self.gridLayout = QtWidgets.QGridLayout()
+        self.gridLayout.addWidget(self.budgetLabel, 0, 0, 1, 1)
+        self.gridLayout.addWidget(self.budgetSpinBox, 0, 1, 1, 1)
+
+        self.horizontalLayout = QtWidgets.QHBoxLayout()
+        self.horizontalLayout.addItem(spacerItem2)
+        self.horizontalLayout.addWidget(self.okButton)
+        self.horizontalLayout.addItem(spacerItem3)
+
+        self.verticalLayout = QtWidgets.QVBoxLayout(self.windowWidget)
+        self.verticalLayout.setContentsMargins(10, 10, 10, 10)
+        self.verticalLayout.addLayout(self.gridLayout)
+        self.verticalLayout.addWidget(self.familyLabel)
+        self.verticalLayout.addWidget(self.familyTextEdit)
+        self.verticalLayout.addLayout(self.horizontalLayout)
+
+        QtCore.QMetaObject.connectSlotsByName(self)
+        self.show()
+
+    def acceptBudgets(self):
+        """
+        Validate the budgets and store them as self.budgets
+        """
+        family_budgets = dict()
+        for line in self.familyTextEdit.toPlainText().splitlines():
+            if not line.strip():
+                continue
+            try:
+                label, seconds = (item.strip() for item in line.split("="))
+                seconds = float(seconds)
+            except ValueError:
+                self.familyLabel.setText("Invalid line: %s" % line.strip())
+                return
+            if label not in self.labels or seconds <= 0.0:
+                self.familyLabel.setText("Invalid budget: %s" % line.strip())
+                return
+            family_budgets[label] = seconds
+        self.budgets = (self.budgetSpinBox.value() or None, family_budgets)
+        self.accept()
+
+    def getBudgets(self):
+        """
+        Return (budget per fit or None, {label: seconds}) or None
+        """
+        return self.budgets
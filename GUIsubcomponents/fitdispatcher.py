@@ -0,0 +1,192 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+from PyQt5 import QtCore
+from gamutlibs.screening import screen_candidates, SCREEN_FINALISTS
+
+class FitDispatcher(QtCore.QObject):
+    """
+    FitDispatcher runs the prob. plot/MLE work of the candidate distributions
+    (and other slow calculations, e.g. PPCC) on the executor of a
+    CandidateDistributions object, and bridges each completed result back to
+    the GUI thread with Qt signals, so that the event loop never blocks.
+
+    Each batch of work belongs to a 'generation'.  When the data set changes,
+    the generation is advanced: pending fits (and DATA_TASKS) are cancelled
+    and their results that arrive later from work already running are
+    discarded.  Other tasks (e.g. PPCC, shape sweeps) always complete, so
+    that taskFinished is emitted for every one of them.
+
+    Stale candidates may be screened first (see screenStale); candidates
+    being screened are not submitted for fitting until the screen is done.
+
+    Signals:
+        - resultReady(original_obj, fitted_obj) for each completed fit
+        - fitFailed(original_obj, message) for each failed fit
+        - taskFinished(tag, value) for each completed 'submitTask' call
+        - progressChanged(done, total) as fits are submitted and completed
+    """
+
+    resultReady     = QtCore.pyqtSignal(object, object)
+    fitFailed       = QtCore.pyqtSignal(object, str)
+    taskFinished    = QtCore.pyqtSignal(object, object)
+    progressChanged = QtCore.pyqtSignal(int, int)
+
+    # emitted from executor threads, delivered on the GUI thread
+    _futureDone = QtCore.pyqtSignal(int, object, object, object)
+
+    # Tasks bound to the candidates' data set, cancelled with the fits
+    DATA_TASKS = ("screen", "bootstrap")
+
+    def __init__(self,
+                 cDists,
+                 parent=None):
+        super().__init__(parent=parent)
+        self.cDists = cDists
+        self.generation = 0
+        self.pending = dict()
+        self.screening = set()
+        self.done = 0
+        self.total = 0
+        self._futureDone.connect(self._onFutureDone,
+                                 QtCore.Qt.QueuedConnection)
+
+    def cancel(self):
+        """
+        Cancel pending fits and data set tasks, and discard results of those
+        already running (other tasks continue)
+        """
+        self.generation += 1
+        kept = dict()
+        for key_id, (key, future) in self.pending.items():
+            if self._isDataWork(*key):
+                future.cancel()
+            else:
+                kept[key_id] = (key, future)
+        self.pending = kept
+        self.screening = set()
+        self.done = 0
+        self.total = len(kept)
+        self.progressChanged.emit(self.done, self.total)
+
+    def _isDataWork(self, kind, item):
+        """
+        Return True for work bound to the data set (see cancel)
+        """
+        return kind == "fit" or item[0] in self.DATA_TASKS
+
+    def submitStale(self, samples):
+        """
+        Submit fits for every stale candidate distribution not yet in progress
+
+        Fits are submitted most expensive first (CandidateDistributions.
+        get_schedule).  If samples differ from the data set of the work in progress, that
+        work is cancelled first.
+        """
+        if self.cDists.set_samples(samples):
+            self.cancel()
+        for index in self.cDists.get_schedule():
+            dist_obj = self.cDists.get_obj(index)
+            if id(dist_obj) in self.pending or id(dist_obj) in self.screening:
+                continue
+            future = self.cDists.submit(dist_obj)
+            self._track(("fit", dist_obj), future)
+
+    def screenStale(self, samples, **settings):
+        """
+        Screen the stale candidates not yet in progress, in the background
+
+        The task is tagged ("screen", dist_objs); its ScreeningReport is to
+        be applied (CandidateDistributions.apply_screening) before the
+        finalists are submitted.  Return False, without screening, if there
+        are no more candidates than would be kept anyway.
+        """
+        if self.cDists.set_samples(samples):
+            self.cancel()
+        dist_objs = [self.cDists.get_obj(index)
+                     for index in self.cDists.get_stale()]
+        dist_objs = [dist_obj for dist_obj in dist_objs
+                     if id(dist_obj) not in self.pending and
+                     id(dist_obj) not in self.screening]
+        if len(dist_objs) <= settings.get("finalists", SCREEN_FINALISTS):
+            return False
+        self.screening.update(id(dist_obj) for dist_obj in dist_objs)
+        self.submitTask(("screen", dist_objs),
+                        screen_candidates,
+                        self.cDists.engine,
+                        [(dist_obj.get_label(),
+                          dist_obj.get_shape_count(),
+                          dist_obj.get_shapes())
+                         for dist_obj in dist_objs],
+                        **settings)
+        return True
+
+    def submitTask(self, tag, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the executor; emit taskFinished(tag, value)
+        """
+        future = self.cDists.executor.submit(fn, *args, **kwargs)
+        self._track(("task", tag), future)
+
+    def watchTask(self, tag, future):
+        """
+        Emit taskFinished(tag, value) when future (e.g. of work that spans
+        several executor tasks) completes
+        """
+        self._track(("task", tag), future)
+
+    def isPending(self, tag):
+        """
+        Return True if the task submitted with 'tag' (the same object) is
+        still in progress
+        """
+        return id(tag) in self.pending and self.pending[id(tag)][0][1] is tag
+
+    def isBusy(self):
+        """
+        Return True if there is work in progress
+        """
+        return len(self.pending) > 0
+
+    def _track(self, key, future):
+        """
+        Register future under the current generation; signal its completion
+        """
+        generation = self.generation
+        self.pending[id(key[1])] = (key, future)
+        self.total += 1
+        self.progressChanged.emit(self.done, self.total)
+        future.add_done_callback(
+            lambda f: self._futureDone.emit(generation, key[0], key[1], f))
+
+    def _onFutureDone(self, generation, kind, item, future):
+        """
+        Deliver a completed result on the GUI thread, unless it is stale
+        """
+        if future.cancelled() or (generation != self.generation and
+                                  self._isDataWork(kind, item)):
+            return
+        self.pending.pop(id(item), None)
+        self.done += 1
+        if self.done == self.total:
+            self.done = self.total = 0
+        self.progressChanged.emit(self.done, self.total)
+
+        exc = future.exception()
+        if kind == "task" and item[0] == "screen":
+            self.screening.difference_update(id(dist_obj)
+                                             for dist_obj in item[1])
+        if kind == "task":
+            self.taskFinished.emit(item, exc if exc is not None
+                                   else future.result())
+        elif exc is not None:
+            self.fitFailed.emit(item, "%s: %s" % (type(exc).__name__, exc))
+        else:
+            self.resultReady.emit(item, future.result())
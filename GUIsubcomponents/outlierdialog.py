@@ -20,17 +20,25 @@ class OutlierWindow(QtWidgets.QDialog):
     The main attributes are 'is_testing_for_outliers' and 'significance level',
     which can be retrieved with the 'getSelection' method.  This informs
     gamut what to do with the data set.
+
+    If provided, 'count_outliers' is a callable returning the number of
+    outliers for an array of significance levels; it is used to preview the
+    number of outliers that would be removed.
     """
 
+    PREVIEW_LEVELS = (0.01, 0.05, 0.10)
+
     def __init__(self,
                  parent,
                  outlier_boolean,
-                 significance_level):
+                 significance_level,
+                 count_outliers=None):
         super().__init__(parent=parent)
 
         # Open window the current settings from gamut window
         self.is_testing_for_outliers = outlier_boolean
         self.significance_level = significance_level
+        self.count_outliers = count_outliers
         
         self.initUI()
                 
@@ -70,6 +78,15 @@ class OutlierWindow(QtWidgets.QDialog):
             self.signlevSpinBox.setHidden(True)
         else:
             self.signlevSpinBox.setValue(self.significance_level)
+        #action
+        self.signlevSpinBox.valueChanged.connect(self.updatePreview)
+
+        # Outlier count preview
+        self.previewLabel = QtWidgets.QLabel()
+        if self.count_outliers is None or \
+                self.is_testing_for_outliers == False:
+            self.previewLabel.setHidden(True)
+        self.updatePreview()
 
         # Button
         self.savesettingsButton = QtWidgets.QPushButton()
@@ -113,6 +130,7 @@ class OutlierWindow(QtWidgets.QDialog):
         self.verticalLayout.addWidget(self.outlierCheckbox)
         self.verticalLayout.addWidget(self.line)
         self.verticalLayout.addLayout(self.horizontalLayout)
+        self.verticalLayout.addWidget(self.previewLabel)
         self.verticalLayout.addWidget(self.line_1)
         self.verticalLayout.addLayout(self.horizontalLayout_1)
 
@@ -138,14 +156,30 @@ class OutlierWindow(QtWidgets.QDialog):
         if self.outlierCheckbox.isChecked():
             self.signlevelLabel.setHidden(False)
             self.signlevSpinBox.setHidden(False)
+            self.previewLabel.setHidden(self.count_outliers is None)
             self.line.setHidden(False)
             self.line_1.setHidden(False)
         else:
             self.signlevelLabel.setHidden(True)
             self.signlevSpinBox.setHidden(True)
+            self.previewLabel.setHidden(True)
             self.line.setHidden(True)
             self.line_1.setHidden(True)
                         
+    def updatePreview(self, *args):
+        """
+        Show the number of outliers at the selected and preset sign. levels
+        """
+        if self.count_outliers is None:
+            return
+        levels = (self.signlevSpinBox.value(),) + self.PREVIEW_LEVELS
+        counts = self.count_outliers(levels)
+        text = "Outliers: %d at %.3f" % (counts[0], levels[0])
+        text += "  (" + ", ".join("%d at %.2f" % (count, level)
+                                  for count, level in zip(counts[1:],
+                                                          levels[1:])) + ")"
+        self.previewLabel.setText(text)
+
     def getSelection(self):
         """
         Return boolean of whether to remove outliers, if so the significance level
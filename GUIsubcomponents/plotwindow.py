@@ -9,19 +9,61 @@
 ###############################################################################
 
 from PyQt5 import QtCore, QtGui, QtWidgets
+from concurrent.futures import ThreadPoolExecutor
+import collections
 import matplotlib
 matplotlib.rcParams['backend'] = "Qt5Agg"
 matplotlib.rcParams['font.size'] = 6
 matplotlib.use("Qt5Agg")
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.figure import Figure
+from gamutlibs import instrument
+
+# Name of the drawing method of the plotted object, by plot type
+PLOT_METHODS = {"pplot"  : "create_pplot",
+                "pdfcdf" : "plot_pdfcdf",
+                "sweep"  : "plot_sweep"}
+
+# Single background thread rendering PNG exports (see export_plot)
+_exporter = None
+
+# Number of exports not yet done, by id of the plotted object; its plot
+# data are not released while an export may be reading them
+_pending_exports = collections.Counter()
+
+
+def export_plot(dist_obj, plot_type, fpath, dpi=600):
+    """
+    Render a plot of dist_obj to a PNG file; return the seconds taken.
+
+    Uses its own Figure and Agg canvas (no pyplot state), so that it can run
+    off the GUI thread.
+    """
+    with instrument.stage("export",
+                          label=dist_obj.get_label(),
+                          plot_type=plot_type,
+                          dpi=dpi) as entry:
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        axes = fig.add_subplot(111)
+        getattr(dist_obj, PLOT_METHODS[plot_type])(axes)
+        fig.savefig(fpath, dpi=dpi)
+    return entry["seconds"]
+
 
 class PlotWindow(QtWidgets.QMainWindow):
     """
     PlotWindow is a child window to gamut that hosts plot canvases for the
-    PDF/CDF and the Probability Plots
+    PDF/CDF, the Probability Plots and the shape sweep (PPCC) curves
+
+    Canvases are returned to a pool when the window is closed and reused by
+    later windows (see PlotCanvas.acquire); plots are saved in the background.
     """
-    
+
+    # emitted from the export thread, delivered on the GUI thread
+    _exportDone = QtCore.pyqtSignal(str, object)
+
     def __init__(self,
                  parent,
                  dist_obj,
@@ -30,12 +72,15 @@ class PlotWindow(QtWidgets.QMainWindow):
         super().__init__(parent=parent)
         self.dist_obj = dist_obj
         self.plot_type = plot_type
+        self.closed = False
         if self.plot_type == "pplot":
-            self.plot_canvas = ProbabilityPlot(self,
-                                               dist_obj=dist_obj)
+            self.plot_canvas = ProbabilityPlot.acquire(self, dist_obj)
         elif self.plot_type == "pdfcdf":
-            self.plot_canvas = PDFCDFPlot(self,
-                                          dist_obj=dist_obj)
+            self.plot_canvas = PDFCDFPlot.acquire(self, dist_obj)
+        elif self.plot_type == "sweep":
+            self.plot_canvas = ShapeSweepPlot.acquire(self, dist_obj)
+        self._exportDone.connect(self.onExportDone,
+                                 QtCore.Qt.QueuedConnection)
         self.windowWidget = QtWidgets.QWidget(self)
         self.setWindowTitle(dist_name)
         self.initUI()
@@ -69,31 +114,70 @@ class PlotWindow(QtWidgets.QMainWindow):
         verticalLayout = QtWidgets.QVBoxLayout(self.windowWidget)
         verticalLayout.addWidget(self.plot_canvas)
         verticalLayout.addLayout(horizontalLayout)
+        self.plot_canvas.show()
 
         self.windowWidget.setFocus()
         self.setCentralWidget(self.windowWidget)
         self.show()
 
+    def closeEvent(self, event):
+        """
+        Return the plot canvas to the pool for reuse by a later window, and
+        release the plot arrays of the distribution object
+        """
+        self.closed = True
+        if self.plot_canvas is not None:
+            self.plot_canvas.release()
+            self.plot_canvas = None
+        self.releasePlotData()
+        event.accept()
+
+    def releasePlotData(self):
+        """
+        Release the plot arrays of the distribution object, unless an export
+        of it is still in progress (they are then released when it is done)
+        """
+        if hasattr(self.dist_obj, "release_plot_data") and \
+                _pending_exports[id(self.dist_obj)] == 0:
+            self.dist_obj.release_plot_data()
+
     def savePlot(self, *args):
-        """Save a *.png of the present probability plot"""
+        """Save a *.png of the present plot (rendered in the background)"""
 
+        global _exporter
         fpath = QtWidgets.QFileDialog.getSaveFileName(self.windowWidget,
                                                       "Specify destination",
                                                       '',
                                                       "Portable Networks Graphic (*.png)")[0]
         if fpath:
-            try:
-                import matplotlib.pyplot as plt
-                axes = plt.axes()
-                
-                if self.plot_type == "pplot":
-                    self.dist_obj.create_pplot(axes)
-                elif self.plot_type == "pdfcdf":
-                    self.dist_obj.plot_pdfcdf(axes)
-                plt.savefig(fpath, dpi=600)
-                plt.close()
-            except:
-                pass
+            if _exporter is None:
+                _exporter = ThreadPoolExecutor(max_workers=1)
+            self.statusBar().showMessage("Saving %s..." % fpath)
+            _pending_exports[id(self.dist_obj)] += 1
+            future = _exporter.submit(export_plot,
+                                      self.dist_obj,
+                                      self.plot_type,
+                                      fpath)
+            future.add_done_callback(
+                lambda f: self._exportDone.emit(fpath, f))
+
+    def onExportDone(self, fpath, future):
+        """
+        Report a completed (or failed) export in the status bar
+
+        If the window was closed meanwhile, the plot data are released now.
+        """
+        _pending_exports[id(self.dist_obj)] -= 1
+        if _pending_exports[id(self.dist_obj)] <= 0:
+            del _pending_exports[id(self.dist_obj)]
+        if self.closed:
+            self.releasePlotData()
+        if future.exception() is not None:
+            self.statusBar().showMessage("Error saving %s (%s)"
+                                         % (fpath, future.exception()))
+        else:
+            self.statusBar().showMessage("Saved %s in %.2f s"
+                                         % (fpath, future.result()))
     
 
 class PlotCanvas(FigureCanvas):
@@ -101,9 +185,14 @@ class PlotCanvas(FigureCanvas):
     Surfaces/axes onto which a matplotlib plot is made, and which can be
     embedded in a GUI child-window
     
-    PlotCanvas is a master class
+    PlotCanvas is a master class.  Released canvases are pooled per class,
+    so that the Figure and canvas are reused rather than rebuilt.
     """
- 
+
+    # released canvases by class, reused by 'acquire'
+    pool = dict()
+    MAX_POOLED = 4
+
     def __init__(self,
                  parent=None,
                  dist_obj=None):
@@ -117,8 +206,51 @@ class PlotCanvas(FigureCanvas):
                                    QtWidgets.QSizePolicy.Expanding,
                                    QtWidgets.QSizePolicy.Expanding)
         FigureCanvas.updateGeometry(self)
-        self._plot()
-        self.draw()
+        self.timedPlot()
+
+    @classmethod
+    def acquire(cls, parent, dist_obj):
+        """
+        Return a pooled canvas of this class plotting dist_obj, or a new one
+        """
+        pooled = PlotCanvas.pool.get(cls)
+        if not pooled:
+            return cls(parent, dist_obj=dist_obj)
+        canvas = pooled.pop()
+        canvas.setParent(parent)
+        canvas.replot(dist_obj)
+        return canvas
+
+    def replot(self, dist_obj):
+        """
+        Clear the figure and plot dist_obj on it
+        """
+        self.dist_obj = dist_obj
+        self.figure.clear()
+        self.axes = self.figure.add_subplot(111)
+        self.timedPlot()
+
+    def timedPlot(self):
+        """
+        Draw the plot (see _plot), timed as stage 'plot'
+        """
+        with instrument.stage("plot",
+                              label=self.dist_obj.get_label(),
+                              plot_type=type(self).__name__):
+            self._plot()
+
+    def release(self):
+        """
+        Clear the figure and return the canvas to the pool (or delete it)
+        """
+        self.dist_obj = None
+        self.figure.clear()
+        self.setParent(None)
+        pooled = PlotCanvas.pool.setdefault(type(self), list())
+        if len(pooled) < self.MAX_POOLED:
+            pooled.append(self)
+        else:
+            self.deleteLater()
 
 class ProbabilityPlot(PlotCanvas):
     
@@ -139,3 +271,13 @@ class PDFCDFPlot(PlotCanvas):
         """
         self.dist_obj.plot_pdfcdf(self.axes)
         self.draw()
+
+
+class ShapeSweepPlot(PlotCanvas):
+
+    def _plot(self):
+        """
+        Call on shape sweep object to draw the R^2 curve on class axes
+        """
+        self.dist_obj.plot_sweep(self.axes)
+        self.draw()
@@ -9,32 +9,34 @@
 ###############################################################################
 
 from PyQt5 import QtCore, QtWidgets
-import scipy.stats as stats
 
 class ShapeFactorBoundsWindow(QtWidgets.QDialog):
     """
-    ShapeFactorBoundsWindow enables a user to specify the bounds of a
-    distribution's shape factor (provided it only has one shape factor), in
-    order to use the 'scipy.statsppcc_max' to compute the maximum likely shape
-    factor.
+    ShapeFactorBoundsWindow enables a user to specify the bounds of each of a
+    distribution's shape factors (up to four), in order to compute the shape
+    factors that maximize the probability plot correlation coefficient (PPCC).
     
     ShapeFactorBoundsWindow is subordinate to the main gamut window, and
-    accepts the samples and the name if the distribution as arguments.
+    accepts the samples, the name of the distribution, its number of shape
+    factors and (optionally) the default bounds to display as arguments.
     """
 
     def __init__(self,
                  parent,
                  samples,
-                 dist_name):
+                 dist_name,
+                 num_shapes=1,
+                 default_bounds=None):
         super().__init__(parent=parent)
 
         # Defaults
-        self.lowerBound = None
-        self.upperBound = None
+        self.bounds = None
 
         # Definite attributes
         self.samples = samples
         self.distribution = dist_name
+        self.num_shapes = num_shapes
+        self.default_bounds = default_bounds
         self.initUI()
         
 
@@ -44,10 +46,10 @@ class ShapeFactorBoundsWindow(QtWidgets.QDialog):
         """
         # Window Widget
         self.setWindowTitle("Shape Factor Bounds")
-        self.resize(354, 110)
+        self.resize(354, 80 + 30 * self.num_shapes)
         self.windowWidget = QtWidgets.QWidget(self)
-        self.windowWidget.setGeometry(QtCore.QRect(0, 0, 351, 90))
-        
+        self.windowWidget.setGeometry(QtCore.QRect(0, 0, 351,
+                                                   60 + 30 * self.num_shapes))
 
         # Labels
         self.lowerBoundLabel = QtWidgets.QLabel()
@@ -55,9 +57,21 @@ class ShapeFactorBoundsWindow(QtWidgets.QDialog):
         self.upperBoundLabel = QtWidgets.QLabel()
         self.upperBoundLabel.setText("Upper Bound")
         
-        # Line Edits
-        self.lowerBoundLineEdit = QtWidgets.QLineEdit()
-        self.upperBoundLineEdit = QtWidgets.QLineEdit()
+        # Line Edits (one pair per shape factor)
+        self.shapeLabels = list()
+        self.lowerBoundLineEdits = list()
+        self.upperBoundLineEdits = list()
+        for ii in range(self.num_shapes):
+            label = QtWidgets.QLabel()
+            label.setText("Shape Factor %d" % (ii + 1))
+            lowerBoundLineEdit = QtWidgets.QLineEdit()
+            upperBoundLineEdit = QtWidgets.QLineEdit()
+            if self.default_bounds is not None:
+                lowerBoundLineEdit.setText("%g" % self.default_bounds[ii][0])
+                upperBoundLineEdit.setText("%g" % self.default_bounds[ii][1])
+            self.shapeLabels.append(label)
+            self.lowerBoundLineEdits.append(lowerBoundLineEdit)
+            self.upperBoundLineEdits.append(upperBoundLineEdit)
 
         # Button
         self.calcPPCCButton = QtWidgets.QPushButton()
@@ -74,10 +88,14 @@ class ShapeFactorBoundsWindow(QtWidgets.QDialog):
 
         # Layout Objects
         self.gridLayout = QtWidgets.QGridLayout()
-        self.gridLayout.addWidget(self.lowerBoundLabel, 0, 0, 1, 1)
-        self.gridLayout.addWidget(self.upperBoundLabel, 1, 0, 1, 1)
-        self.gridLayout.addWidget(self.lowerBoundLineEdit, 0, 1, 1, 1)
-        self.gridLayout.addWidget(self.upperBoundLineEdit, 1, 1, 1, 1)
+        self.gridLayout.addWidget(self.lowerBoundLabel, 0, 1, 1, 1)
+        self.gridLayout.addWidget(self.upperBoundLabel, 0, 2, 1, 1)
+        for ii in range(self.num_shapes):
+            self.gridLayout.addWidget(self.shapeLabels[ii], ii + 1, 0, 1, 1)
+            self.gridLayout.addWidget(self.lowerBoundLineEdits[ii],
+                                      ii + 1, 1, 1, 1)
+            self.gridLayout.addWidget(self.upperBoundLineEdits[ii],
+                                      ii + 1, 2, 1, 1)
 
         self.horizontalLayout = QtWidgets.QHBoxLayout()
         self.horizontalLayout.addItem(spacerItem2)
@@ -95,11 +113,18 @@ class ShapeFactorBoundsWindow(QtWidgets.QDialog):
 
     def calcPPCC(self):
         """
-        Calculate the prob. plot correlation coeff. and store as self.value
+        Validate the bounds of each shape factor and store them as self.bounds
         """
         try:
-            self.lowerBound = float(self.lowerBoundLineEdit.text()) 
-            self.upperBound = float(self.upperBoundLineEdit.text()) 
+            bounds = list()
+            for lowerBoundLineEdit, upperBoundLineEdit in \
+                    zip(self.lowerBoundLineEdits, self.upperBoundLineEdits):
+                lowerBound = float(lowerBoundLineEdit.text())
+                upperBound = float(upperBoundLineEdit.text())
+                if upperBound < lowerBound:
+                    return
+                bounds.append((lowerBound, upperBound))
+            self.bounds = bounds
             self.accept()
 
         except ValueError:
@@ -109,8 +134,6 @@ class ShapeFactorBoundsWindow(QtWidgets.QDialog):
 
     def getBounds(self):
         """
-        Return the bounds of the shape factor.
+        Return the (lower, upper) bounds of each shape factor.
         """
-        return self.lowerBound, self.upperBound
-
-
+        return self.bounds
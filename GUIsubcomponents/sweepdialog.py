@@ -0,0 +1,148 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+from PyQt5 import QtCore, QtWidgets
+
+class ShapeSweepWindow(QtWidgets.QDialog):
+    """
+    ShapeSweepWindow enables a user to specify a range of values of one of a
+    distribution's shape factors, over which the probability plot correlation
+    coefficient (PPCC) curve is computed.  The other shape factors are held at
+    the values entered in the main window.
+
+    ShapeSweepWindow is subordinate to the main gamut window, and accepts the
+    name of the distribution, its number of shape factors and (optionally)
+    the default bounds of each shape factor as arguments.
+    """
+
+    def __init__(self,
+                 parent,
+                 dist_name,
+                 num_shapes=1,
+                 default_bounds=None):
+        super().__init__(parent=parent)
+
+        # Defaults
+        self.settings = None
+
+        # Definite attributes
+        self.distribution   = dist_name
+        self.num_shapes     = num_shapes
+        self.default_bounds = default_bounds
+        self.initUI()
+
+
+    def initUI(self):
+        """
+        Set up user interface
+        """
+        # Window Widget
+        self.setWindowTitle("Shape Sweep: " + self.distribution)
+        self.resize(354, 210)
+        self.windowWidget = QtWidgets.QWidget(self)
+        self.windowWidget.setGeometry(QtCore.QRect(0, 0, 351, 200))
+
+        # Labels
+        self.shapeLabel = QtWidgets.QLabel()
+        self.shapeLabel.setText("Shape Factor")
+        self.lowerBoundLabel = QtWidgets.QLabel()
+        self.lowerBoundLabel.setText("Lower Bound")
+        self.upperBoundLabel = QtWidgets.QLabel()
+        self.upperBoundLabel.setText("Upper Bound")
+        self.pointsLabel = QtWidgets.QLabel()
+        self.pointsLabel.setText("Number of Points")
+        self.bestLabel = QtWidgets.QLabel()
+        self.bestLabel.setText("Candidates to Add")
+
+        # Inputs
+        self.shapeComboBox = QtWidgets.QComboBox()
+        self.shapeComboBox.addItems(["Shape Factor %d" % (ii + 1)
+                                     for ii in range(self.num_shapes)])
+        self.shapeComboBox.currentIndexChanged.connect(self.fillDefaultBounds)
+        self.lowerBoundLineEdit = QtWidgets.QLineEdit()
+        self.upperBoundLineEdit = QtWidgets.QLineEdit()
+        self.pointsSpinBox = QtWidgets.QSpinBox()
+        self.pointsSpinBox.setRange(2, 100000)
+        self.pointsSpinBox.setValue(200)
+        self.bestSpinBox = QtWidgets.QSpinBox()
+        self.bestSpinBox.setRange(0, 10)
+        self.bestSpinBox.setValue(3)
+        self.fillDefaultBounds(0)
+
+        # Button
+        self.sweepButton = QtWidgets.QPushButton()
+        self.sweepButton.setText("Sweep")
+        self.sweepButton.clicked.connect(self.acceptSettings)
+
+        # Spacers
+        spacerItem2 = QtWidgets.QSpacerItem(40, 20,
+                                            QtWidgets.QSizePolicy.Expanding,
+                                            QtWidgets.QSizePolicy.Minimum)
+        spacerItem3 = QtWidgets.QSpacerItem(40, 20,
+                                            QtWidgets.QSizePolicy.Expanding,
+                                            QtWidgets.QSizePolicy.Minimum)
+
+        # Layout Objects
+        self.gridLayout = QtWidgets.QGridLayout()
+        self.gridLayout.addWidget(self.shapeLabel, 0, 0, 1, 1)
+        self.gridLayout.addWidget(self.shapeComboBox, 0, 1, 1, 1)
+        self.gridLayout.addWidget(self.lowerBoundLabel, 1, 0, 1, 1)
+        self.gridLayout.addWidget(self.lowerBoundLineEdit, 1, 1, 1, 1)
+        self.gridLayout.addWidget(self.upperBoundLabel, 2, 0, 1, 1)
+        self.gridLayout.addWidget(self.upperBoundLineEdit, 2, 1, 1, 1)
+        self.gridLayout.addWidget(self.pointsLabel, 3, 0, 1, 1)
+        self.gridLayout.addWidget(self.pointsSpinBox, 3, 1, 1, 1)
+        self.gridLayout.addWidget(self.bestLabel, 4, 0, 1, 1)
+        self.gridLayout.addWidget(self.bestSpinBox, 4, 1, 1, 1)
+
+        self.horizontalLayout = QtWidgets.QHBoxLayout()
+        self.horizontalLayout.addItem(spacerItem2)
+        self.horizontalLayout.addWidget(self.sweepButton)
+        self.horizontalLayout.addItem(spacerItem3)
+
+        self.verticalLayout = QtWidgets.QVBoxLayout(self.windowWidget)
+        self.verticalLayout.setContentsMargins(10, 10, 10, 10)
+        self.verticalLayout.addLayout(self.gridLayout)
+        self.verticalLayout.addLayout(self.horizontalLayout)
+
+        QtCore.QMetaObject.connectSlotsByName(self)
+        self.show()
+
+    def fillDefaultBounds(self, index):
+        """
+        Prefill the bounds line edits with the default bounds of a shape factor
+        """
+        if self.default_bounds is not None and index >= 0:
+            self.lowerBoundLineEdit.setText("%g" % self.default_bounds[index][0])
+            self.upperBoundLineEdit.setText("%g" % self.default_bounds[index][1])
+
+    def acceptSettings(self):
+        """
+        Validate the sweep settings and store them as self.settings
+        """
+        try:
+            lowerBound = float(self.lowerBoundLineEdit.text())
+            upperBound = float(self.upperBoundLineEdit.text())
+        except ValueError:
+            return
+        if upperBound <= lowerBound:
+            return
+        self.settings = {"index"  : self.shapeComboBox.currentIndex(),
+                         "lower"  : lowerBound,
+                         "upper"  : upperBound,
+                         "points" : self.pointsSpinBox.value(),
+                         "best"   : self.bestSpinBox.value()}
+        self.accept()
+
+    def getSettings(self):
+        """
+        Return the sweep settings (index, lower, upper, points, best) or None
+        """
+        return self.settings
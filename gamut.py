@@ -10,39 +10,148 @@
 
 
 from PyQt5 import QtCore, QtGui, QtWidgets
+from gamutlibs.startup import defer_heavy_imports, lazy_import, preload
+from gamutlibs.startup import import_time_report, format_import_report
+from gamutlibs.startup import HEAVY_MODULES
+defer_heavy_imports()
 import numpy as np
-import scipy.stats as stats
+from gamutlibs.registry import DistributionRegistry, DEFAULT_REGISTRY_PATH
+from gamutlibs.registry import measure_costs
 from gamutlibs.distributions import CandidateDistributions, SciPyContDist
+from gamutlibs.distributions import PDFCDFOverlay, pdf_cdf_curves
+from gamutlibs.distributions import format_memory_report
+from gamutlibs.executors import make_executor
+from gamutlibs.fitcache import FitResultCache
+from gamutlibs.ingest import load_samples, FILE_FILTER
+from gamutlibs.shapeopt import maximize_ppcc, default_shape_bounds, shape_sweep
 from gamutlibs.outlier_tests import GeneralizedExtremeStudentizedDeviate
+from gamutlibs.outlier_tests import bounded_max_outliers
+from gamutlibs.bootstrap import submit_bootstrap, BOOTSTRAP_MODES
+from gamutlibs.bootstrap import DEFAULT_RESAMPLES, DEFAULT_LEVEL
+from gamutlibs import instrument
 from GUIsubcomponents.sfdialog import ShapeFactorBoundsWindow
-from GUIsubcomponents.plotwindow import PlotWindow
+from GUIsubcomponents.sweepdialog import ShapeSweepWindow
 from GUIsubcomponents.outlierdialog import OutlierWindow
+from GUIsubcomponents.fitdispatcher import FitDispatcher
+from GUIsubcomponents.budgetdialog import TimeBudgetWindow
+from GUIsubcomponents.bootstrapdialog import BootstrapWindow
 import sys
+import os
+
+# matplotlib is imported with the plot windows, after the main window shows
+plotwindow = lazy_import("GUIsubcomponents.plotwindow")
 
 pyVer = sys.version_info[0]  # i.e. 2 or 3
-if pyVer < 3:
-    import cPickle as pickle
-else:
-    import _pickle as pickle
+
+# Goodness-of-fit columns of the candidates table: (header, GOF_FIELDS key)
+GOF_COLUMNS = [("KS", "ks"),
+               ("A^2", "ad"),
+               ("W^2", "cvm"),
+               ("AIC", "aic"),
+               ("BIC", "bic")]
+
+# Columns of the bootstrap confidence intervals and of the per-stage
+# timings (see Settings > Show Timings)
+BOOTSTRAP_COLUMN = 8 + len(GOF_COLUMNS)
+TIMINGS_COLUMN   = BOOTSTRAP_COLUMN + 1
+
+
+class ResultItem(QtWidgets.QTableWidgetItem):
+    """
+    Candidates table item sorted by a numeric key rather than by its text
+
+    Items without a key (e.g. values not computed yet) sort after all others.
+    """
+
+    def __init__(self, text, key=None):
+        super().__init__(text)
+        self.key = key if key is not None and np.isfinite(key) else np.inf
+
+    def __lt__(self, other):
+        if isinstance(other, ResultItem):
+            return self.key < other.key
+        return super().__lt__(other)
 
 
 class MainWindow(QtWidgets.QMainWindow):
     
     def __init__(self,
-                 scipy_dist_file="scipy_cont_rvs.p"):
+                 registry_path=DEFAULT_REGISTRY_PATH,
+                 executor_kind="process",
+                 max_workers=None,
+                 large_data_points=4096,
+                 time_budget=60.0,
+                 fit_cache_path=None):
         self.pyVer = sys.version_info[0]
-        self.distributions = pickle.load( open(scipy_dist_file, 'rb') )
+        # The costs of a new registry are measured once the window is shown
+        self.registry = DistributionRegistry.load(registry_path, measure=False)
+        self.costsTask = None
+        self.distributions = self.registry.get_shape_counts()
         if pyVer >=3:
             super().__init__()
         
         #Initialize
-        self.cDists = CandidateDistributions()
+        # Fit results are cached in memory; on disk only if a path is given
+        self.fitCache = FitResultCache(path=fit_cache_path)
+        self.cDists = CandidateDistributions(make_executor(executor_kind,
+                                                           max_workers),
+                                             cache=self.fitCache,
+                                             registry=self.registry)
+        self.cDists.set_time_budget(time_budget)
+        self.original_samples=None
+        self.samples=None
+        self.esd=None
+        self.esdTask=None
+        self.large_data_points=large_data_points
+
+        # Fitting runs on the executor; results arrive through signals
+        self.fitDispatcher = FitDispatcher(self.cDists, parent=self)
+        self.fitDispatcher.resultReady.connect(self.onFitResult)
+        self.fitDispatcher.fitFailed.connect(self.onFitFailed)
+        self.fitDispatcher.taskFinished.connect(self.onTaskFinished)
+        self.fitDispatcher.progressChanged.connect(self.onFitProgress)
         self.shape1Value=None
         self.shape1Changed=False
         self.outlierBool=False
         self.significance_level=0.05
         
+        self.startup_timings=None
+        self.screeningReport=None
+        self.bootstrapSettings = {"mode"      : BOOTSTRAP_MODES[0],
+                                  "resamples" : DEFAULT_RESAMPLES,
+                                  "level"     : DEFAULT_LEVEL,
+                                  "budget"    : time_budget}
+
         self.initUI()
+
+        # Load the deferred modules once the window is on screen
+        QtCore.QTimer.singleShot(100, self.preloadModules)
+
+    def preloadModules(self):
+        """
+        Import the modules deferred at startup (SciPy stats, matplotlib)
+        """
+        self.startup_timings = preload(HEAVY_MODULES
+                                       + ("GUIsubcomponents.plotwindow",))
+        if not self.statusbar.currentMessage():
+            self.statusbar.showMessage("Ready (deferred imports: %.0f ms)"
+                                       % sum(self.startup_timings.values()))
+        self.measureCosts()
+
+    def measureCosts(self):
+        """
+        Measure the costs of the registry's distributions in the background
+
+        Only needed when the registry was rebuilt (e.g. the first launch, or
+        a new SciPy version); until then candidates are fit in list order.
+        """
+        if self.registry.has_costs() or \
+                self.fitDispatcher.isPending(self.costsTask):
+            return
+        self.costsTask = ("costs", self.registry)
+        self.fitDispatcher.submitTask(self.costsTask,
+                                      measure_costs,
+                                      self.registry.get_entries())
         
     def initUI(self):
         
@@ -129,6 +238,13 @@ class MainWindow(QtWidgets.QMainWindow):
         #action
         self.PPCCButton.clicked.connect(self.calcPPCC)
 
+        # Shape Sweep Button
+        self.sweepButton = QtWidgets.QPushButton()
+        self.sweepButton.setEnabled(False)
+        self.sweepButton.setText("Shape Sweep")
+        #action
+        self.sweepButton.clicked.connect(self.sweepShape)
+
 
         # Add/Rm Distributions Buttons        
         self.rmAllButton = QtWidgets.QPushButton()
@@ -154,7 +270,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.probPlotLabel = QtWidgets.QLabel()
         self.probPlotLabel.setText("Probability Plotting:")
         self.candDistsTable = QtWidgets.QTableWidget()
-        self.candDistsTable.setColumnCount(8)
+        self.candDistsTable.setColumnCount(TIMINGS_COLUMN + 1)
         self.candDistsTable.setRowCount(0)
         self.candDistsTable.setHorizontalHeaderLabels(["Distribution",
                                                        "R^2",
@@ -163,7 +279,16 @@ class MainWindow(QtWidgets.QMainWindow):
                                                        "Shape 1",
                                                        "Shape 2",
                                                        "Shape 3",
-                                                       "Shape 4"])
+                                                       "Shape 4"] +
+                                                      [header for header, key
+                                                       in GOF_COLUMNS] +
+                                                      ["Bootstrap CI",
+                                                       "Timings"])
+        # Per-stage timings (see Settings > Show Timings)
+        self.candDistsTable.setColumnHidden(TIMINGS_COLUMN, True)
+        # Rows are sorted by clicking on a header; the index of each row's
+        # distribution in self.cDists is stored with its first item
+        self.candDistsTable.setSortingEnabled(True)
         self.candDistsTable.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.candDistsTable.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         # Actions
@@ -186,6 +311,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.pdfcdfButton.setText("PDF/CDF")
         self.pdfcdfButton.clicked.connect(self.makePDFCDF)
 
+        # Bootstrap
+        self.bootstrapButton = QtWidgets.QPushButton()
+        self.bootstrapButton.setEnabled(False)
+        self.bootstrapButton.setText("Bootstrap")
+        self.bootstrapButton.clicked.connect(self.bootstrapFit)
+
         # Spacers
         spacerItem1 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
         spacerItem2 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
@@ -234,6 +365,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.gridLayout.addWidget(self.shape2Text, 1, 1, 1, 1)
         self.gridLayout.addWidget(self.shape2Label, 1, 0, 1, 1)
         self.gridLayout.addWidget(self.PPCCButton, 0, 2, 1, 1)
+        self.gridLayout.addWidget(self.sweepButton, 1, 2, 1, 1)
         self.gridLayout.addWidget(self.shape1Label, 0, 0, 1, 1)
         self.gridLayout.addWidget(self.shape1Text, 0, 1, 1, 1)
         self.gridLayout.addWidget(self.shape4Label, 3, 0, 1, 1)
@@ -262,6 +394,7 @@ class MainWindow(QtWidgets.QMainWindow):
         horizontalLayout_4.addItem(spacerItem5)
         horizontalLayout_4.addWidget(self.scipyCallButton)
         horizontalLayout_4.addWidget(self.pdfcdfButton)
+        horizontalLayout_4.addWidget(self.bootstrapButton)
         horizontalLayout_4.addItem(spacerItem6)
         
         verticalLayout_9 = QtWidgets.QVBoxLayout()
@@ -288,17 +421,88 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.menubar = QtWidgets.QMenuBar(self)
         self.menubar.setGeometry(QtCore.QRect(0, 0, 729, 19))
+        self.menuSettings = QtWidgets.QMenu(self.menubar)
+        self.menuSettings.setTitle("Settings")
         self.menuAbout = QtWidgets.QMenu(self.menubar)
         self.menuAbout.setTitle("Help")
         self.setMenuBar(self.menubar)
 
         self.statusbar = QtWidgets.QStatusBar(self)
         self.setStatusBar(self.statusbar)
+        self.progressBar = QtWidgets.QProgressBar()
+        self.progressBar.setMaximumWidth(200)
+        self.progressBar.setFormat("Fitting %v/%m")
+        self.progressBar.setHidden(True)
+        self.statusbar.addPermanentWidget(self.progressBar)
 
         self.actionAbout = QtWidgets.QAction(self)
         self.actionAbout.setText("About")
         self.actionAbout.triggered.connect(self.showAbout)
         self.menuAbout.addAction(self.actionAbout)
+
+        self.actionLargeData = QtWidgets.QAction(self)
+        self.actionLargeData.setText("Large Data Mode")
+        self.actionLargeData.setCheckable(True)
+        self.actionLargeData.setToolTip(
+            "Regress on about %d stratified order statistics "
+            "(and MLE-fit a random subsample) for large data sets"
+            % self.large_data_points)
+        self.actionLargeData.toggled.connect(self.setLargeDataMode)
+        self.menuSettings.addAction(self.actionLargeData)
+
+        self.actionTimeBudgets = QtWidgets.QAction(self)
+        self.actionTimeBudgets.setText("Fit Time Budgets...")
+        self.actionTimeBudgets.triggered.connect(self.setTimeBudgets)
+        self.menuSettings.addAction(self.actionTimeBudgets)
+
+        self.actionScreening = QtWidgets.QAction(self)
+        self.actionScreening.setText("Screen Candidates")
+        self.actionScreening.setCheckable(True)
+        self.actionScreening.setToolTip(
+            "Prob. plot new candidates on growing subsamples first, and "
+            "fully fit only the most promising (successive halving)")
+        self.actionScreening.toggled.connect(self.setScreening)
+        self.menuSettings.addAction(self.actionScreening)
+
+        self.actionScreeningReport = QtWidgets.QAction(self)
+        self.actionScreeningReport.setText("Screening Report...")
+        self.actionScreeningReport.triggered.connect(self.showScreeningReport)
+        self.menuSettings.addAction(self.actionScreeningReport)
+        self.menuSettings.addSeparator()
+
+        self.actionShowTimings = QtWidgets.QAction(self)
+        self.actionShowTimings.setText("Show Timings")
+        self.actionShowTimings.setCheckable(True)
+        self.actionShowTimings.toggled.connect(
+            lambda checked: self.candDistsTable.setColumnHidden(TIMINGS_COLUMN,
+                                                                not checked))
+        self.menuSettings.addAction(self.actionShowTimings)
+
+        self.actionTrackMemory = QtWidgets.QAction(self)
+        self.actionTrackMemory.setText("Track Peak Memory")
+        self.actionTrackMemory.setCheckable(True)
+        self.actionTrackMemory.setToolTip("Record the peak memory of each "
+                                          "stage (slows down fitting)")
+        self.actionTrackMemory.toggled.connect(instrument.track_memory)
+        self.menuSettings.addAction(self.actionTrackMemory)
+
+        self.actionProfile = QtWidgets.QAction(self)
+        self.actionProfile.setText("Profile Stages...")
+        self.actionProfile.setCheckable(True)
+        self.actionProfile.toggled.connect(self.setProfiling)
+        self.menuSettings.addAction(self.actionProfile)
+
+        self.actionExportTimings = QtWidgets.QAction(self)
+        self.actionExportTimings.setText("Export Timings...")
+        self.actionExportTimings.triggered.connect(self.exportTimings)
+        self.menuSettings.addAction(self.actionExportTimings)
+
+        self.actionMemoryReport = QtWidgets.QAction(self)
+        self.actionMemoryReport.setText("Memory Report...")
+        self.actionMemoryReport.triggered.connect(self.showMemoryReport)
+        self.menuSettings.addAction(self.actionMemoryReport)
+
+        self.menubar.addAction(self.menuSettings.menuAction())
         self.menubar.addAction(self.menuAbout.menuAction())
 
         QtCore.QMetaObject.connectSlotsByName(self)
@@ -306,16 +510,26 @@ class MainWindow(QtWidgets.QMainWindow):
         self.show()
 
 
+    def closeEvent(self, event):
+        """
+        Release the worker pool used for fitting before closing
+        """
+        self.cDists.executor.shutdown(wait=False)
+        self.fitCache.close()
+        event.accept()
+
     def updateExisting(function):
         """
         Define decorator to recompute prob plot regression and MLE param fit
+
+        Work in progress for a previous data set is cancelled.
         """
         def wrapper(self, *args):
             function(self, *args)
-            if self.cDists.get_count() > 0 and self.samples != None:
-                self.candDistsTable.clearContents()
-                self.cDists.calc_all(self.samples)
+            if self.samples is not None:
                 self.updateResults()
+            else:
+                self.fitDispatcher.cancel()
         return wrapper   
 
     def showAbout(self):
@@ -342,6 +556,92 @@ As a courtesy, please acknowledge use of gamut in any publications/reports to wh
         QtWidgets.QMessageBox.about(self,  "About gamut", text)
 
 
+    @updateExisting
+    def setLargeDataMode(self, checked):
+        """
+        Turn large data mode (approx. prob. plots of reduced data) on/off
+        """
+        self.cDists.engine.set_reduction(self.large_data_points
+                                         if checked else None)
+
+    @updateExisting
+    def setTimeBudgets(self, *args):
+        """
+        Open the time budget dialog; timed-out fits are redone with new budgets
+        """
+        dialog = TimeBudgetWindow(self,
+                                  self.cDists.time_budget,
+                                  self.cDists.family_budgets,
+                                  self.registry.get_labels())
+        if dialog.exec_():
+            self.cDists.set_time_budget(*dialog.getBudgets())
+
+    @updateExisting
+    def setScreening(self, checked):
+        """
+        Turn screening of the candidates on/off; pruned candidates are fit
+        once it is off
+        """
+        if not checked:
+            self.cDists.clear_screening()
+
+    def showScreeningReport(self):
+        """
+        Display the decisions of the last screening of the candidates
+        """
+        if self.screeningReport is None:
+            self.statusbar.showMessage("No candidates have been screened "
+                                       "(see Settings > Screen Candidates)")
+            return
+        QtWidgets.QMessageBox.information(self,
+                                          "Screening Report",
+                                          "<pre>%s</pre>"
+                                          % self.screeningReport.report())
+
+    def setProfiling(self, checked):
+        """
+        Write a cProfile file of each stage to a chosen directory (or stop)
+        """
+        if not checked:
+            instrument.set_profile_hook(None)
+            return
+        directory = QtWidgets.QFileDialog.getExistingDirectory(
+            self, "Select directory for profiles")
+        if not directory:
+            self.actionProfile.setChecked(False)
+            return
+        instrument.set_profile_hook(instrument.ProfileDumper(directory))
+        self.statusbar.showMessage("Profiling stages to %s" % directory)
+
+    def exportTimings(self):
+        """
+        Save the stage log and the timings of each candidate as JSON
+        """
+        fpath = QtWidgets.QFileDialog.getSaveFileName(self,
+                                                      "Export timings",
+                                                      '',
+                                                      "JSON (*.json)")[0]
+        if not fpath:
+            return
+        distributions = [{"label"   : dist_obj.get_label(),
+                          "shapes"  : dist_obj.get_shapes(),
+                          "timings" : dist_obj.get_timings()}
+                         for dist_obj in self.cDists.dists]
+        try:
+            instrument.export_json(fpath, distributions)
+            self.statusbar.showMessage("Saved timings to %s" % fpath)
+        except OSError as error:
+            self.statusbar.showMessage("Error saving %s (%s)" % (fpath, error))
+
+    def showMemoryReport(self):
+        """
+        Display the memory held by each candidate, and shared between them
+        """
+        text = format_memory_report(self.cDists.memory_report())
+        QtWidgets.QMessageBox.information(self,
+                                          "Memory Report",
+                                          "<pre>%s</pre>" % text)
+
     @updateExisting
     def loadSamples(self, *args):
         """Read samples from file, add error message to status bar if error"""
@@ -349,13 +649,19 @@ As a courtesy, please acknowledge use of gamut in any publications/reports to wh
         fpath = QtWidgets.QFileDialog.getOpenFileName(self,
                                                       "Select data file",
                                                       '',
-                                                      "Comma-Separated Values (*.csv)")[0]
+                                                      FILE_FILTER)[0]
         try:
-            raw_data = np.loadtxt(fpath, delimiter=",")
-            self.original_samples = raw_data.flatten()
-            self.samples = np.copy(self.original_samples)
+            # Read-only array, shared (not copied) while outliers are kept
+            with instrument.stage("load_samples", path=fpath) as entry:
+                self.original_samples, report = load_samples(fpath)
+                entry["samples"] = report["samples"]
+            self.samples = self.original_samples
+            self.esd = None
             self.outliersButton.setEnabled(True)
-            self.statusbar.clearMessage()
+            self.statusbar.showMessage("Loaded %d samples in %.2f s (%.1f MB/s)"
+                                       % (report["samples"],
+                                          report["seconds"],
+                                          report["MB_per_s"]))
             self.scipyDistsList.setEnabled(True)
             self.addButton.setEnabled(True)
             self.filePathLineEdit.setText(fpath)
@@ -372,20 +678,39 @@ As a courtesy, please acknowledge use of gamut in any publications/reports to wh
     def handleOutliers(self, *args):
         """
         Initiate outliers dialog, and perform outlier actions based on user action
+
+        The generalized ESD test statistics are computed once per data set (on
+        the original samples, testing at most bounded_max_outliers), in the
+        background; the dialog opens when they are ready (see onTaskFinished),
+        and each significance level is then re-evaluated against them.
         """
+        if self.esd is None:
+            if self.esdTask is None or \
+                    self.esdTask[1] is not self.original_samples or \
+                    not self.fitDispatcher.isPending(self.esdTask):
+                samples = self.original_samples
+                self.esdTask = ("esd", samples)
+                self.fitDispatcher.submitTask(
+                    self.esdTask,
+                    GeneralizedExtremeStudentizedDeviate,
+                    samples,
+                    max_outliers=bounded_max_outliers(len(samples)))
+            self.statusbar.showMessage("Computing outlier test statistics...")
+            return
         dialog = OutlierWindow(self,
                                self.outlierBool,
-                               self.significance_level)
+                               self.significance_level,
+                               count_outliers=self.esd.count_outliers)
         if dialog.exec_():
             self.outlierBool, self.significance_level = dialog.getSelection()
+            self.cDists.set_significance_level(self.significance_level)
             if self.outlierBool == True:
-                test = GeneralizedExtremeStudentizedDeviate(self.samples,
-                                                           significance_level=self.significance_level)
-                self.samples = test.get_remainders()
-                num_outliers = test.get_num_outliers()
+                self.esd.set_significance_level(self.significance_level)
+                self.samples = self.esd.get_remainders()
+                num_outliers = self.esd.get_num_outliers()
                 self.statusbar.showMessage("%d outliers removed" % num_outliers)
             else:
-                self.samples = np.copy(self.original_samples)
+                self.samples = self.original_samples
                 self.statusbar.clearMessage()
 
     def unlockShapeBoxes(self):
@@ -428,7 +753,7 @@ As a courtesy, please acknowledge use of gamut in any publications/reports to wh
             self.shape3Text.setEnabled(False)
             self.shape4Label.setEnabled(False)
             self.shape4Text.setEnabled(False)
-            self.PPCCButton.setEnabled(False)
+            self.PPCCButton.setEnabled(True)
         elif num_shape_params == 3:
             self.shape1Label.setEnabled(True)
             self.shape1Text.setEnabled(True)
@@ -438,7 +763,7 @@ As a courtesy, please acknowledge use of gamut in any publications/reports to wh
             self.shape3Text.setEnabled(True)
             self.shape4Label.setEnabled(False)
             self.shape4Text.setEnabled(False)
-            self.PPCCButton.setEnabled(False)
+            self.PPCCButton.setEnabled(True)
         elif num_shape_params == 4:
             self.shape1Label.setEnabled(True)
             self.shape1Text.setEnabled(True)
@@ -448,33 +773,280 @@ As a courtesy, please acknowledge use of gamut in any publications/reports to wh
             self.shape3Text.setEnabled(True)
             self.shape4Label.setEnabled(True)
             self.shape4Text.setEnabled(True)
-            self.PPCCButton.setEnabled(False)
+            self.PPCCButton.setEnabled(True)
+
+        self.sweepButton.setEnabled(num_shape_params > 0)
+
+        # Label the shape boxes with SciPy's shape names
+        shape_names = self.registry.get_shape_names(dist_name)
+        for index, label in enumerate([self.shape1Label,
+                                       self.shape2Label,
+                                       self.shape3Label,
+                                       self.shape4Label]):
+            text = "Shape Factor %d" % (index + 1)
+            if index < len(shape_names):
+                text += " (%s)" % shape_names[index]
+            label.setText(text)
 
     def updateResults(self):
         """
         Recalc. values from prob. plot and MLE fit and update the candidates table
+
+        Only the stale candidates are recomputed, in the background; their rows
+        are updated as each result arrives (see onFitResult).  With screening
+        on, they are screened first, and only the finalists are submitted
+        (see onTaskFinished).
+        """
+        if not (self.actionScreening.isChecked() and
+                self.fitDispatcher.screenStale(self.samples)):
+            self.fitDispatcher.submitStale(self.samples)
+        for ii in self.cDists.get_stale():
+            self.updateRow(ii, self.cDists.get_obj(ii))
+        # resubmit if a change of data set cancelled the measurement
+        self.measureCosts()
+
+    def onFitResult(self, original_obj, fitted_obj):
+        """
+        Store a completed fit and update its row of the candidates table
+        """
+        row_index = self.cDists.replace_obj(original_obj, fitted_obj)
+        if row_index is not None:
+            self.updateRow(row_index, fitted_obj)
+            if fitted_obj.is_timed_out():
+                self.statusbar.showMessage(
+                    "Fit of %s timed out (budget: %g s)"
+                    % (fitted_obj.get_label(),
+                       self.cDists.get_time_budget(fitted_obj.get_label())))
+
+    def onFitFailed(self, original_obj, message):
+        """
+        Report a failed fit in the status bar and the candidates table
         """
-        self.cDists.calc_all(self.samples)
-        for ii, dist in enumerate(self.cDists.dists):
-            self.updateRow(ii, dist)
+        if original_obj in self.cDists.dists:
+            row_index = self.tableRow(self.cDists.dists.index(original_obj))
+            self.candDistsTable.setSortingEnabled(False)
+            self.candDistsTable.setItem(row_index, 1, ResultItem("failed"))
+            self.candDistsTable.setSortingEnabled(True)
+        self.statusbar.showMessage("Fit of %s failed (%s)"
+                                   % (original_obj.get_label(), message))
+
+    def onFitProgress(self, done, total):
+        """
+        Show the progress of the fits in progress (hide when there are none)
+        """
+        self.progressBar.setHidden(total == 0)
+        self.progressBar.setRange(0, total)
+        self.progressBar.setValue(done)
+
+    def onTaskFinished(self, tag, value):
+        """
+        Handle completed background tasks (e.g. PPCC shape factors)
+        """
+        if tag[0] == "ppcc":
+            self.PPCCButton.setEnabled(True)
+            if isinstance(value, Exception):
+                self.statusbar.showMessage("PPCC calculation failed (%s)" % value)
+                return
+            self.statusbar.showMessage("%s: PPCC = %.6f (%d evaluations, %.2f s)"
+                                       % (tag[1],
+                                          value["ppcc"],
+                                          value["evaluations"],
+                                          value["seconds"]))
+            if self.scipyDistsList.currentItem() is not None and \
+                    self.scipyDistsList.currentItem().text() == tag[1]:
+                for shape, textBox in zip(value["shapes"],
+                                          [self.shape1Text,
+                                           self.shape2Text,
+                                           self.shape3Text,
+                                           self.shape4Text]):
+                    textBox.setText(str(shape))
+
+        elif tag[0] == "costs":
+            if isinstance(value, Exception):
+                self.statusbar.showMessage("Measuring distribution costs "
+                                           "failed (%s)" % value)
+            else:
+                self.registry.set_costs(value)
+
+        elif tag[0] == "overlay":
+            dist_objs, todo, fits = tag[1:]
+            if isinstance(value, Exception):
+                self.statusbar.showMessage("PDF/CDF curves failed (%s)" % value)
+                return
+            fingerprint = self.cDists.engine.get_fingerprint()
+            if any(dist_obj.is_stale(fingerprint) for dist_obj in dist_objs):
+                self.statusbar.showMessage("PDF/CDF overlay discarded: the "
+                                           "fits changed meanwhile")
+                return
+            for dist_obj, (_, fit_params), curves in zip(todo, fits, value):
+                # curves of a fit replaced meanwhile are not stored
+                if dist_obj.get_fit_params() == fit_params:
+                    dist_obj.set_pdf_cdf_curves(curves)
+            self.statusbar.clearMessage()
+            self.showOverlay(dist_objs)
+
+        elif tag[0] == "esd":
+            if isinstance(value, Exception):
+                self.statusbar.showMessage("Outlier test failed (%s)" % value)
+            elif tag[1] is self.original_samples:
+                # open the dialog, unless the data set was replaced since
+                self.esd = value
+                self.statusbar.clearMessage()
+                self.handleOutliers()
+
+        elif tag[0] == "bootstrap":
+            dist_obj = tag[1]
+            if isinstance(value, Exception):
+                self.statusbar.showMessage("Bootstrap of %s failed (%s)"
+                                           % (dist_obj.get_label(), value))
+                return
+            # Discard intervals of a fit that has since been replaced
+            for ii, obj in enumerate(self.cDists.dists):
+                if obj is dist_obj:
+                    dist_obj.set_bootstrap(value)
+                    self.updateRow(ii, dist_obj)
+            fit, requested = value.get_count()
+            self.statusbar.showMessage("%s: %d of %d bootstrap resamples fit "
+                                       "in %.2f s%s"
+                                       % (dist_obj.get_label(),
+                                          fit,
+                                          requested,
+                                          value.get_seconds(),
+                                          " (timed out)"
+                                          if value.is_timed_out() else ""))
+
+        elif tag[0] == "screen":
+            dist_objs = tag[1]
+            if isinstance(value, Exception):
+                self.statusbar.showMessage("Screening failed (%s); fitting "
+                                           "every candidate" % value)
+            elif self.actionScreening.isChecked():
+                self.cDists.apply_screening(dist_objs, value)
+                self.screeningReport = value
+                self.statusbar.showMessage(value.summary() + " (see Settings "
+                                           "> Screening Report)")
+            self.fitDispatcher.submitStale(self.samples)
+            for ii, obj in enumerate(self.cDists.dists):
+                if any(obj is dist_obj for dist_obj in dist_objs):
+                    self.updateRow(ii, obj)
+
+        elif tag[0] == "sweep":
+            self.sweepButton.setEnabled(True)
+            if isinstance(value, Exception):
+                self.statusbar.showMessage("Shape sweep failed (%s)" % value)
+                return
+            sweep, num_best = value, tag[2]
+            plotwindow.PlotWindow(self, sweep, sweep.get_label(), plot_type="sweep")
+            best = sweep.get_best(num_best)
+            for shape_factors in best:
+                self.addDistribution(sweep.get_label(), shape_factors)
+            self.statusbar.showMessage("%s: %d-point shape sweep in %.2f s; "
+                                       "added %d candidates"
+                                       % (sweep.get_label(),
+                                          len(sweep.get_values()),
+                                          sweep.get_seconds(),
+                                          len(best)))
+
+    def getFittedObj(self, row_index, needs_fit=True):
+        """
+        Return the distr. object of a row if its results are current, else None
+
+        Objects of fits that timed out without an MLE fit (or, unless
+        needs_fit is False, without any results) are not returned either.
+        """
+        if row_index < 0 or row_index >= self.candDistsTable.rowCount():
+            return None
+        dist_obj = self.cDists.get_obj(self.distIndex(row_index))
+        if dist_obj.is_pruned(self.cDists.engine.get_fingerprint()):
+            self.statusbar.showMessage("%s was pruned by screening (see "
+                                       "Settings > Screening Report)"
+                                       % dist_obj.get_label())
+            return None
+        if dist_obj.is_stale(self.cDists.engine.get_fingerprint()):
+            self.statusbar.showMessage("%s is still being fit"
+                                       % dist_obj.get_label())
+            return None
+        if dist_obj.get_r2() is None or \
+                (needs_fit and not dist_obj.has_fit()):
+            self.statusbar.showMessage("%s timed out before it was fit"
+                                       % dist_obj.get_label())
+            return None
+        return dist_obj
         
-    def updateRow(self, row_index, dist_obj):
+    def tableRow(self, dist_index):
+        """
+        Return the table row showing distribution dist_index of self.cDists
+        """
+        for row_index in range(self.candDistsTable.rowCount()):
+            if self.distIndex(row_index) == dist_index:
+                return row_index
+        return None
+
+    def distIndex(self, row_index):
+        """
+        Return the index in self.cDists of the distribution of a table row
+        """
+        return self.candDistsTable.item(row_index, 0).data(QtCore.Qt.UserRole)
+
+    def updateRow(self, dist_index, dist_obj):
         """
         Query values from distr. object, and update cand. distr. table
+
+        dist_index is the index of dist_obj in self.cDists (rows may be
+        sorted differently).  Values are shown as '...' while the object is
+        being (re)fit; in large data mode R^2 is followed by its estimated
+        error bound, and by '(timed out)' if the fit ran out of time.
+        Candidates pruned by screening show their screening outcome.  The
+        goodness-of-fit columns follow the shape factors, and the (hidden)
+        last column summarizes the timed stages of the fit.
         """
+        timings = ""
+        r2_key = None
+        r2_tip = ""
+        gof = dist_obj.get_gof()
+        if dist_obj.is_pruned(self.cDists.engine.get_fingerprint()):
+            decision = dist_obj.get_screening()
+            r2 = "%s (screening)" % decision["status"]
+            r2_tip = decision["reason"]
+            if decision["r2"] is not None:
+                r2_tip = "R^2 = %.6f on %d samples: %s" \
+                    % (decision["r2"], decision["size"], r2_tip)
+            loc = scale = "NA"
+            gof = dict()
+        elif dist_obj.is_stale(self.cDists.engine.get_fingerprint()):
+            r2 = loc = scale = "..."
+            gof = dict()
+        elif dist_obj.get_r2() is None:
+            # timed out before the regression completed
+            timings = instrument.format_timings(dist_obj.get_timings())
+            r2 = "timed out"
+            loc = scale = "NA"
+        else:
+            timings = instrument.format_timings(dist_obj.get_timings())
+            r2_key = -dist_obj.get_r2()
+            r2 = str(dist_obj.get_r2())
+            if dist_obj.get_r2_bound():
+                r2 += " \u00b1 %.1e" % dist_obj.get_r2_bound()
+            if dist_obj.is_timed_out():
+                r2 += " (timed out)"
+            loc = str(dist_obj.get_loc())
+            scale = str(dist_obj.get_scale())
 
-        self.candDistsTable.setItem(row_index,
-                                    0,
-                                    QtWidgets.QTableWidgetItem(dist_obj.get_label()))
-        self.candDistsTable.setItem(row_index,
-                                    1,
-                                    QtWidgets.QTableWidgetItem(str(dist_obj.get_r2())))
+        row_index = self.tableRow(dist_index)
+        self.candDistsTable.setSortingEnabled(False)
+        item = QtWidgets.QTableWidgetItem(dist_obj.get_label())
+        item.setData(QtCore.Qt.UserRole, dist_index)
+        self.candDistsTable.setItem(row_index, 0, item)
+        # R^2 sorts best (largest) first
+        item = ResultItem(r2, r2_key)
+        item.setToolTip(r2_tip)
+        self.candDistsTable.setItem(row_index, 1, item)
         self.candDistsTable.setItem(row_index,
                                     2,
-                                    QtWidgets.QTableWidgetItem(str(dist_obj.get_loc())))
+                                    QtWidgets.QTableWidgetItem(loc))
         self.candDistsTable.setItem(row_index,
                                     3,
-                                    QtWidgets.QTableWidgetItem(str(dist_obj.get_scale())))
+                                    QtWidgets.QTableWidgetItem(scale))
         # Shape Parameters
         num_shapes = dist_obj.get_shape_count()
         shape_params = dist_obj.get_shapes()
@@ -486,36 +1058,120 @@ As a courtesy, please acknowledge use of gamut in any publications/reports to wh
             self.candDistsTable.setItem(row_index,
                                         ii,
                                         QtWidgets.QTableWidgetItem(text))
+        # Goodness-of-fit statistics (smaller is better)
+        for ii, (header, key) in enumerate(GOF_COLUMNS, 8):
+            value = gof.get(key)
+            if value is None:
+                text = "..." if r2 == "..." else "NA"
+            else:
+                text = "%.6g" % value
+            self.candDistsTable.setItem(row_index,
+                                        ii,
+                                        ResultItem(text, value))
+        # Bootstrap confidence intervals (see bootstrapFit)
+        intervals = dist_obj.get_bootstrap()
+        item = QtWidgets.QTableWidgetItem(intervals.summary()
+                                          if intervals is not None else "")
+        if intervals is not None:
+            item.setToolTip(intervals.report())
+        self.candDistsTable.setItem(row_index, BOOTSTRAP_COLUMN, item)
+        item = QtWidgets.QTableWidgetItem(timings)
+        item.setToolTip(timings.replace(", ", "\n"))
+        self.candDistsTable.setItem(row_index, TIMINGS_COLUMN, item)
+        self.candDistsTable.setSortingEnabled(True)
 
     def addRow(self):
         """
         Add a blank row to the candidate distributions table.
         
         This is a preparation step in order to make room for a distribution's
-        values
+        values; the row is of the last distribution in self.cDists, whose
+        index is returned.
         """
 
         row_index = self.candDistsTable.rowCount()
+        dist_index = self.cDists.get_count() - 1
+        self.candDistsTable.setSortingEnabled(False)
         self.candDistsTable.insertRow(row_index)
-        return row_index
+        item = QtWidgets.QTableWidgetItem()
+        item.setData(QtCore.Qt.UserRole, dist_index)
+        self.candDistsTable.setItem(row_index, 0, item)
+        self.candDistsTable.setSortingEnabled(True)
+        return dist_index
 
 
     def calcPPCC(self):
         """
         Open shape parameter bounds dialog, compute shape parameter accordingly
+
+        The PPCC maximization runs in the background (see onTaskFinished).
         """
         dist_name = self.scipyDistsList.currentItem().text()
+        num_shapes = self.distributions[dist_name]
         dialog = ShapeFactorBoundsWindow(self,
                                          self.samples,
-                                         dist_name)
+                                         dist_name,
+                                         num_shapes=num_shapes,
+                                         default_bounds=default_shape_bounds(dist_name))
         if dialog.exec_():
-            lowerBound, upperBound = dialog.getBounds()
-            if lowerBound != None and upperBound != None:
-                value = stats.ppcc_max(self.samples,
-                                       brack=(lowerBound,
-                                              upperBound),
-                                       dist=dist_name)
-                self.shape1Text.setText(str(value))
+            bounds = dialog.getBounds()
+            if bounds != None:
+                self.PPCCButton.setEnabled(False)
+                self.statusbar.showMessage("Maximizing PPCC of %s..." % dist_name)
+                self.fitDispatcher.submitTask(("ppcc", dist_name),
+                                              maximize_ppcc,
+                                              self.cDists.engine,
+                                              dist_name,
+                                              bounds)
+
+    def sweepShape(self):
+        """
+        Open shape sweep dialog, compute the PPCC curve of one shape factor
+
+        The other shape factors are taken from the shape factor boxes.  The
+        curve is computed in the background, then plotted and its best points
+        added as candidates (see onTaskFinished).
+        """
+        if self.samples is None:
+            self.statusbar.showMessage("Load samples before sweeping a shape factor")
+            return
+        dist_name = self.scipyDistsList.currentItem().text()
+        num_shapes = self.distributions[dist_name]
+        dialog = ShapeSweepWindow(self,
+                                  dist_name,
+                                  num_shapes=num_shapes,
+                                  default_bounds=default_shape_bounds(dist_name))
+        if dialog.exec_():
+            settings = dialog.getSettings()
+            if settings == None:
+                return
+            shape_factors = list()
+            for index, textBox in zip(range(num_shapes),
+                                      [self.shape1Text,
+                                       self.shape2Text,
+                                       self.shape3Text,
+                                       self.shape4Text]):
+                if index == settings["index"]:
+                    shape_factors.append(settings["lower"])
+                    continue
+                try:
+                    shape_factors.append( float(textBox.text()) )
+                except ValueError:
+                    self.statusbar.showMessage("All other shape factors must be validly defined")
+                    return
+            values = np.linspace(settings["lower"],
+                                 settings["upper"],
+                                 settings["points"])
+            self.sweepButton.setEnabled(False)
+            self.statusbar.showMessage("Sweeping shape factor %d of %s..."
+                                       % (settings["index"] + 1, dist_name))
+            self.fitDispatcher.submitTask(("sweep", dist_name, settings["best"]),
+                                          shape_sweep,
+                                          self.cDists.engine,
+                                          dist_name,
+                                          values,
+                                          shape_factors,
+                                          settings["index"])
 
     def addDistByButton(self):
         """
@@ -531,40 +1187,42 @@ As a courtesy, please acknowledge use of gamut in any publications/reports to wh
         dist_name = item.text()
         self.addDistribution(dist_name) 
 
-    def addDistribution(self, dist_name):
+    def addDistribution(self, dist_name, shape_factors=None):
         """
         Instantiate a dist. obj. by label; perform regression/fitting and add to table.
-        """
-        # Initialize
-        shape_factors = list() 
 
+        Shape factors are read from the shape factor boxes unless given.
+        """
         num_shape_facs = self.distributions[dist_name]
 
-        # Check that all shape factors validly specified
-        for index, textBox in zip(range(num_shape_facs),
-                                  [self.shape1Text,
-                                   self.shape2Text,
-                                   self.shape3Text,
-                                   self.shape4Text]):
-
-            try:
-                shape_factors.append( float(textBox.text()) )
-            except ValueError:
-                self.statusbar.showMessage("All shape factors must be validly defined")
-                return
+        if shape_factors is None:
+            # Check that all shape factors validly specified
+            shape_factors = list()
+            for index, textBox in zip(range(num_shape_facs),
+                                      [self.shape1Text,
+                                       self.shape2Text,
+                                       self.shape3Text,
+                                       self.shape4Text]):
+
+                try:
+                    shape_factors.append( float(textBox.text()) )
+                except ValueError:
+                    self.statusbar.showMessage("All shape factors must be validly defined")
+                    return
 
-        # Ready-to-go
+        # Ready-to-go; the fit is performed in the background
         self.statusbar.clearMessage()
-        self.cDists.add_distribution(dist_name,
-                                     num_shape_facs,
-                                     shape_factors,
-                                     self.samples)
-        row_index = self.addRow()
-        self.updateRow(row_index, self.cDists.get_obj(-1))
+        dist_obj = self.cDists.add_distribution(dist_name,
+                                                num_shape_facs,
+                                                shape_factors)
+        dist_index = self.addRow()
+        self.updateRow(dist_index, dist_obj)
+        self.fitDispatcher.submitStale(self.samples)
         self.rmButton.setEnabled(True)
         self.rmAllButton.setEnabled(True)
         self.scipyCallButton.setEnabled(True)
         self.pdfcdfButton.setEnabled(True)
+        self.bootstrapButton.setEnabled(True)
 
 
     def rmDistribution(self):
@@ -574,13 +1232,21 @@ As a courtesy, please acknowledge use of gamut in any publications/reports to wh
 
         try:
             row = self.candDistsTable.currentRow()
-            self.cDists.remove_dist(row)
+            dist_index = self.distIndex(row)
+            self.cDists.remove_dist(dist_index)
             self.candDistsTable.removeRow(row)
+            # Renumber the rows of the distributions after the removed one
+            for row_index in range(self.candDistsTable.rowCount()):
+                index = self.distIndex(row_index)
+                if index > dist_index:
+                    self.candDistsTable.item(row_index, 0).setData(
+                        QtCore.Qt.UserRole, index - 1)
             if self.candDistsTable.rowCount() == 0:
                 self.rmButton.setEnabled(False)
                 self.rmAllButton.setEnabled(False)
                 self.scipyCallButton.setEnabled(False)
                 self.pdfcdfButton.setEnabled(False)
+                self.bootstrapButton.setEnabled(False)
         except:
             self.statusbar.showMessage("Select a cand. distri. to remove")
 
@@ -596,6 +1262,7 @@ As a courtesy, please acknowledge use of gamut in any publications/reports to wh
         self.rmAllButton.setEnabled(False)
         self.scipyCallButton.setEnabled(False)
         self.pdfcdfButton.setEnabled(False)
+        self.bootstrapButton.setEnabled(False)
 
     def makePPlot(self, item):
         """
@@ -603,18 +1270,84 @@ As a courtesy, please acknowledge use of gamut in any publications/reports to wh
         """
 
         row = item.row()
-        dist_obj = self.cDists.get_obj(row)
+        dist_obj = self.getFittedObj(row, needs_fit=False)
+        if dist_obj is None:
+            return
         dist_name = dist_obj.get_label()
-        PlotWindow(self, dist_obj, dist_name, plot_type="pplot")
+        plotwindow.PlotWindow(self, dist_obj, dist_name, plot_type="pplot")
         
     def makePDFCDF(self, item):
         """
         Open a new window with PDF/CDF curve of selected candiate distribution
+
+        If several rows are selected, their missing curves are computed in a
+        batch in the background, and overlaid in one window when done (see
+        onTaskFinished).
         """
+        rows = sorted(set(index.row() for index in
+                          self.candDistsTable.selectionModel().selectedRows()))
+        if len(rows) > 1:
+            dist_objs = [self.getFittedObj(row) for row in rows]
+            if None in dist_objs:
+                return
+            todo = [dist_obj for dist_obj in dist_objs
+                    if not dist_obj.has_pdf_cdf_curves()]
+            if not todo:
+                self.showOverlay(dist_objs)
+                return
+            fits = [(dist_obj.get_label(), dist_obj.get_fit_params())
+                    for dist_obj in todo]
+            self.statusbar.showMessage("Computing PDF/CDF curves of %d "
+                                       "distributions..." % len(todo))
+            self.fitDispatcher.submitTask(("overlay", dist_objs, todo, fits),
+                                          pdf_cdf_curves,
+                                          fits)
+            return
         row = self.candDistsTable.currentRow()
-        dist_obj = self.cDists.get_obj(row)
+        dist_obj = self.getFittedObj(row)
+        if dist_obj is None:
+            return
         dist_name = dist_obj.get_label()
-        PlotWindow(self, dist_obj, dist_name, plot_type="pdfcdf")
+        plotwindow.PlotWindow(self, dist_obj, dist_name, plot_type="pdfcdf")
+
+    def showOverlay(self, dist_objs):
+        """
+        Open a new window overlaying the PDF/CDF curves of dist_objs
+        """
+        overlay = PDFCDFOverlay(dist_objs)
+        plotwindow.PlotWindow(self, overlay, overlay.get_label(), plot_type="pdfcdf")
+
+    def bootstrapFit(self):
+        """
+        Open bootstrap dialog; compute confidence intervals of the selected fit
+
+        The resample fits run in the background, on the executor of the
+        candidates (see gamutlibs.bootstrap.submit_bootstrap); the intervals
+        are shown in the candidates table when done (see onTaskFinished).
+        """
+        row = self.candDistsTable.currentRow()
+        dist_obj = self.getFittedObj(row)
+        if dist_obj is None:
+            return
+        dialog = BootstrapWindow(self,
+                                 dist_obj.get_label(),
+                                 BOOTSTRAP_MODES,
+                                 self.bootstrapSettings)
+        if not dialog.exec_() or dialog.getSettings() is None:
+            return
+        self.bootstrapSettings = dialog.getSettings()
+        try:
+            future = submit_bootstrap(self.cDists.executor,
+                                      dist_obj,
+                                      self.cDists.engine.get_fit_samples(),
+                                      **self.bootstrapSettings)
+        except ValueError as error:
+            self.statusbar.showMessage(str(error))
+            return
+        self.fitDispatcher.watchTask(("bootstrap", dist_obj), future)
+        self.statusbar.showMessage("Bootstrapping %s (%d resamples)..."
+                                   % (dist_obj.get_label(),
+                                      self.bootstrapSettings["resamples"]))
 
     def showScipyDef(self):
         """
@@ -622,15 +1355,28 @@ As a courtesy, please acknowledge use of gamut in any publications/reports to wh
         """
         
         row = self.candDistsTable.currentRow()
-        dist_obj = self.cDists.get_obj(row)
+        dist_obj = self.getFittedObj(row)
+        if dist_obj is None:
+            return
+        text = "%s\n\nMLE fit: %s (%d iterations)" \
+            % (dist_obj.get_scipy_command(),
+               dist_obj.get_fit_method(),
+               dist_obj.get_fit_iterations())
         QtWidgets.QMessageBox.about(self,
                                     "SciPy Definition: " + dist_obj.get_label(),
-                                    dist_obj.get_scipy_command())
+                                    text)
 
 
 if __name__ == "__main__":
+    if "--import-report" in sys.argv:
+        print(format_import_report(import_time_report("gamut")))
+        sys.exit(0)
+    # Opt-in on-disk fit-result cache, kept between sessions
+    fit_cache_path = None
+    if "--fit-cache" in sys.argv[:-1]:
+        fit_cache_path = sys.argv[sys.argv.index("--fit-cache") + 1]
     app = QtWidgets.QApplication(sys.argv)
-    ui = MainWindow()
+    ui = MainWindow(fit_cache_path=fit_cache_path)
     sys.exit(app.exec_())
         
         
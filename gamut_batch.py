@@ -0,0 +1,158 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+"""
+Headless scan of every distribution in the gamut registry against a data set.
+
+Usage:
+
+    python gamut_batch.py samples.csv -o results.csv [-w 8] [-e process]
+
+Each distribution is probability-plotted and MLE-fit (shape factors chosen
+automatically, see gamutlibs.scan.choose_shapes).  Results are printed as
+they complete, together with their current rank, and the final ranked table,
+with the goodness-of-fit statistics of each MLE fit (KS, Anderson-Darling,
+Cramer-von Mises, log-likelihood, AIC and BIC), is written as CSV or JSON
+(by the extension of the output file).
+
+With --screen, the distributions are first screened by successive halving
+on growing subsamples (see gamutlibs.screening); only the finalists are
+fully fit, and the others are listed last, with the reason they were pruned.
+"""
+
+import argparse
+import json
+import csv
+import sys
+from gamutlibs.distributions import ProbabilityPlotEngine
+from gamutlibs.ingest import load_samples
+from gamutlibs.registry import DistributionRegistry, DEFAULT_REGISTRY_PATH
+from gamutlibs.executors import make_executor, EXECUTOR_KINDS
+from gamutlibs.scan import scan_all, rank_results, RESULT_FIELDS
+from gamutlibs.scan import screen_distributions, screened_row
+from gamutlibs.screening import SCREEN_FINALISTS
+
+
+def write_results(rows, fpath):
+    """
+    Write ranked result rows to fpath (.json, otherwise CSV)
+    """
+    rows = [dict(row, rank=rank + 1) for rank, row in enumerate(rows)]
+    fields = ["rank"] + RESULT_FIELDS
+    with open(fpath, "w", newline="") as f:
+        if fpath.lower().endswith(".json"):
+            json.dump(rows, f, indent=1, default=float)
+        else:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({k: (" ".join("%.10g" % v for v in row[k])
+                                     if isinstance(row[k], (list, tuple))
+                                     else row[k])
+                                 for k in fields})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("samples",
+                        help="sample file (.csv, .npy or raw float64 binary)")
+    parser.add_argument("-o", "--output", default="gamut_results.csv",
+                        help="results table (.csv or .json)")
+    parser.add_argument("-r", "--registry", default=DEFAULT_REGISTRY_PATH,
+                        help="distribution registry (JSON; rebuilt if it "
+                        "does not match the installed SciPy)")
+    parser.add_argument("-e", "--executor", default="process",
+                        choices=EXECUTOR_KINDS)
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of workers (default: one per core)")
+    parser.add_argument("-x", "--exclude", nargs="*", default=[],
+                        help="distributions to skip")
+    parser.add_argument("--reduce", type=int, default=None, metavar="N",
+                        help="large data mode: regress on about N stratified "
+                        "order statistics (and MLE-fit a random subsample)")
+    parser.add_argument("-b", "--budget", type=float, default=None,
+                        metavar="SECONDS",
+                        help="time budget of each distribution's fit; fits "
+                        "out of time are killed and reported as timed out")
+    parser.add_argument("--family-budget", nargs="*", default=[],
+                        metavar="LABEL=SECONDS",
+                        help="time budgets of particular distributions")
+    parser.add_argument("--screen", action="store_true",
+                        help="screen the distributions on growing subsamples "
+                        "and fully fit only the best (successive halving)")
+    parser.add_argument("--finalists", type=int, default=SCREEN_FINALISTS,
+                        metavar="N",
+                        help="least number of distributions kept by "
+                        "screening (default: %(default)s)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="do not stream results as they complete")
+    args = parser.parse_args(argv)
+    try:
+        family_budgets = {label: float(seconds) for label, seconds in
+                          (item.split("=") for item in args.family_budget)}
+    except ValueError:
+        parser.error("--family-budget expects LABEL=SECONDS items")
+
+    registry = DistributionRegistry.load(args.registry)
+    # Most expensive families first, so that they do not finish last
+    distributions = {label: registry.get_shape_count(label)
+                     for label in registry.by_cost()
+                     if label not in args.exclude}
+    samples, report = load_samples(args.samples)
+    if not args.quiet:
+        print("Loaded %d samples from %s in %.2f s (%.1f MB/s)"
+              % (report["samples"], args.samples, report["seconds"],
+                 report["MB_per_s"]))
+    engine = ProbabilityPlotEngine(samples, reduced_points=args.reduce)
+    executor = make_executor(args.executor, args.workers)
+
+    rows = list()
+    try:
+        budgets = lambda label: family_budgets.get(label, args.budget)
+        screened = list()
+        if args.screen:
+            distributions, report = screen_distributions(
+                distributions, engine, executor, budgets,
+                finalists=args.finalists)
+            screened = [screened_row(decision)
+                        for decision in report.get_decisions()
+                        if decision["status"] != "finalist"]
+            if not args.quiet:
+                print(report.report())
+                sys.stdout.flush()
+        for row in scan_all(distributions, engine, executor, budgets):
+            rows.append(row)
+            if not args.quiet:
+                rank = rank_results(rows).index(row) + 1
+                if row["timed_out"]:
+                    status = "timed out"
+                    if row["r2"] is not None:
+                        status += " (R^2=%.6f so far)" % row["r2"]
+                elif row["error"]:
+                    status = "failed (%s)" % row["error"]
+                else:
+                    status = "R^2=%.6f rank %d" % (row["r2"], rank)
+                    if row["r2_bound"]:
+                        status += " (+/- %.1e)" % row["r2_bound"]
+                print("[%3d/%3d] %-16s %7.2fs  %s"
+                      % (len(rows), len(distributions), row["label"],
+                         row["seconds"], status))
+                sys.stdout.flush()
+    finally:
+        executor.shutdown()
+
+    rows = rank_results(rows) + screened
+    write_results(rows, args.output)
+    print("Wrote %d results to %s; best fit: %s"
+          % (len(rows), args.output, rows[0]["label"] if rows else "none"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
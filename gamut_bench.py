@@ -0,0 +1,112 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+"""
+Reproducible performance benchmarks of the gamut workloads.
+
+Usage:
+
+    python gamut_bench.py [-g calc_all esd] [-o results.json] [--full]
+
+Candidate fitting (calc_all over 1/10/all distributions), MLE fits per
+family, the generalized ESD outlier test (N = 10^3 ... 10^7), CSV ingest and
+plot rendering are timed on deterministic synthetic data sets.  Results are
+written as JSON and compared against a stored baseline recorded on the same
+host (CPU model and count); the exit status is 1 if any case regressed.
+"""
+
+import argparse
+import os
+import sys
+from gamutlibs.benchmark import (GROUPS, DEFAULT_TOLERANCE, benchmark_cases,
+                                 run_benchmarks, save_results, load_results,
+                                 compare_results, format_comparison,
+                                 same_host, format_host)
+from gamutlibs.registry import DistributionRegistry, DEFAULT_REGISTRY_PATH
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "benchmarks",
+                                "baseline.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("-g", "--groups", nargs="*", default=list(GROUPS),
+                        choices=GROUPS, help="benchmark groups to run")
+    parser.add_argument("-k", "--match", default=None,
+                        help="only run cases whose name contains MATCH")
+    parser.add_argument("--full", action="store_true",
+                        help="also fit every registered distribution "
+                        "(calc_all/all; slow)")
+    parser.add_argument("-n", "--repeat", type=int, default=3,
+                        help="runs per case (the best is recorded)")
+    parser.add_argument("-o", "--output", default="gamut_bench.json",
+                        help="results file (JSON)")
+    parser.add_argument("-b", "--baseline", default=DEFAULT_BASELINE,
+                        help="baseline results to compare against")
+    parser.add_argument("-t", "--tolerance", type=float,
+                        default=DEFAULT_TOLERANCE,
+                        help="relative slow-down flagged as a regression")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results to the baseline file")
+    parser.add_argument("--any-host", action="store_true",
+                        help="compare against a baseline recorded on "
+                        "different hardware")
+    parser.add_argument("-r", "--registry", default=DEFAULT_REGISTRY_PATH,
+                        help="distribution registry (JSON)")
+    args = parser.parse_args(argv)
+
+    registry = DistributionRegistry.load(args.registry)
+    cases = benchmark_cases(registry, args.groups, args.full)
+    if args.match is not None:
+        cases = [case for case in cases if args.match in case.name]
+
+    def progress(name, result):
+        print("%-26s %10.4f s  (%d runs)"
+              % (name, result["seconds"], result["runs"]))
+        sys.stdout.flush()
+
+    results = run_benchmarks(cases, args.repeat, progress)
+    save_results(results, args.output)
+    print("Wrote %d results to %s" % (len(results["results"]), args.output))
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print("Saved baseline %s" % args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline %s to compare against" % args.baseline)
+        return 0
+
+    # Only compare timings measured on the same hardware
+    baseline = load_results(args.baseline)
+    if not same_host(results, baseline):
+        print("Baseline %s was recorded on another host (%s; this is %s); "
+              "not comparing (use --any-host to compare anyway)"
+              % (args.baseline, format_host(baseline), format_host(results)))
+        if not args.any_host:
+            return 0
+
+    # Only compare the cases that were run
+    baseline["results"] = {name: value
+                           for name, value in baseline["results"].items()
+                           if name in results["results"]}
+    rows = compare_results(results, baseline, args.tolerance)
+    print()
+    print(format_comparison(rows))
+    regressions = [row[0] for row in rows if row[-1] == "regression"]
+    if regressions:
+        print("\n%d regression(s): %s"
+              % (len(regressions), ", ".join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,423 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+import copy
+import json
+import os
+import platform
+import tempfile
+import time
+from importlib import metadata
+import numpy as np
+from gamutlibs.distributions import CandidateDistributions, SciPyContDist
+from gamutlibs.ingest import load_samples
+from gamutlibs.outlier_tests import GeneralizedExtremeStudentizedDeviate
+from gamutlibs.registry import freeze
+
+# Version of the benchmark results file layout
+BENCHMARK_FORMAT = 2
+
+# Benchmark groups, in the order they are run
+GROUPS = ("calc_all", "probplot", "mle_fit", "esd", "ingest", "plot")
+
+# Families of the 10-distribution calc_all case and of the MLE_fit cases
+BENCH_FAMILIES = ("norm", "expon", "gamma", "lognorm", "weibull_min",
+                  "beta", "genextreme", "t", "loggamma", "johnsonsu")
+
+# Sample sizes of the calc_all/MLE_fit, ESD, ingest and plot cases
+FIT_SIZE     = 10000
+ALL_SIZE     = 1000
+ESD_SIZES    = (10**3, 10**4, 10**5, 10**6, 10**7)
+INGEST_SIZES = (10**5, 10**6)
+PLOT_SIZE    = 10**6
+
+# Cases slower than this (one run) are not repeated
+LONG_CASE_SECONDS = 5.0
+
+# Default relative slow-down flagged as a regression, and the absolute
+# slow-down (seconds) below which differences are treated as timing noise
+DEFAULT_TOLERANCE = 0.25
+NOISE_SECONDS     = 0.01
+
+
+def synthetic_samples(n, seed=0):
+    """
+    Return n deterministic samples of a shifted gamma distribution
+    """
+    rng = np.random.default_rng(seed)
+    return 10.0 + rng.gamma(2.5, 3.0, size=n)
+
+
+def family_samples(registry, label, n, seed=0):
+    """
+    Return n deterministic samples of 'label' at its registry default shapes
+    """
+    shapes = registry.get_default_shapes(label) or []
+    return freeze(label, list(shapes) + [0.0, 1.0]).rvs(
+        size=n, random_state=np.random.default_rng(seed))
+
+
+class BenchmarkCase:
+    """
+    A named, timed piece of work.
+
+    'setup' is called (untimed) before every run and returns the argument
+    of 'run', so that each run starts from the same state.
+    """
+
+    def __init__(self, name, group, run, setup=None, size=None):
+        self.name  = name
+        self.group = group
+        self.run   = run
+        self.setup = setup
+        self.size  = size
+
+    def time_once(self):
+        """
+        Return the seconds of one run
+        """
+        state = self.setup() if self.setup is not None else None
+        start = time.perf_counter()
+        self.run(state)
+        return time.perf_counter() - start
+
+    def measure(self, repeat=3):
+        """
+        Return a dict of the best and median seconds over 'repeat' runs
+
+        Cases taking more than LONG_CASE_SECONDS are run only once.
+        """
+        timings = [self.time_once()]
+        while len(timings) < repeat and timings[0] < LONG_CASE_SECONDS:
+            timings.append(self.time_once())
+        return {"group"   : self.group,
+                "size"    : self.size,
+                "seconds" : float(min(timings)),
+                "median"  : float(np.median(timings)),
+                "runs"    : len(timings)}
+
+
+def _candidates(registry, labels, samples):
+    """
+    Return a setup function building fresh candidates of labels for samples
+    """
+    def setup():
+        cDists = CandidateDistributions(registry=registry)
+        for label in labels:
+            shapes = registry.get_default_shapes(label) or \
+                [1.0] * registry.get_shape_count(label)
+            cDists.add_distribution(label,
+                                    registry.get_shape_count(label),
+                                    shapes)
+        return cDists
+    return lambda: (setup(), samples)
+
+
+def _calc_all(state):
+    cDists, samples = state
+    cDists.calc_all(samples)
+
+
+def _probplot_each(state):
+    cDists, samples = state
+    cDists.set_samples(samples)
+    for dist_obj in cDists.dists:
+        cDists.engine.probplot(dist_obj.get_label(), dist_obj.get_shapes())
+
+
+def _probplot_batch(state):
+    cDists, samples = state
+    cDists.probplot_all(samples)
+
+
+def _fitted(registry, label, samples):
+    """
+    Return a setup function giving a prob. plotted (not yet MLE fit) object
+    """
+    cDists = CandidateDistributions(registry=registry)
+    cDists.engine.set_samples(samples)
+    shapes = registry.get_default_shapes(label) or \
+        [1.0] * registry.get_shape_count(label)
+    dist_obj = SciPyContDist(label, registry.get_shape_count(label))
+    dist_obj.set_shapes(*shapes)
+    results = cDists.engine.probplot(label, dist_obj.get_shapes())
+    dist_obj.feed_pplot_data(*results,
+                             cDists.engine.get_uniform_medians())
+    samples = cDists.engine.get_fit_samples()
+    return lambda: (dist_obj, samples)
+
+
+def _mle_fit(state):
+    dist_obj, samples = state
+    dist_obj.MLE_fit(samples)
+
+
+def _render(plot_method):
+    """
+    Return a run function drawing plot_method of a fitted object with Agg
+    """
+    def run(dist_obj):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = Figure()
+        canvas = FigureCanvasAgg(fig)
+        getattr(dist_obj, plot_method)(fig.add_subplot(111))
+        canvas.draw()
+    return run
+
+
+def _uncached(dist_obj):
+    """
+    Return a setup function giving a copy of dist_obj without PDF/CDF curves
+    """
+    def setup():
+        fresh = copy.copy(dist_obj)
+        fresh.y = dist_obj.y
+        fresh.uniform_medians = dist_obj.uniform_medians
+        fresh.release_plot_data()
+        return fresh
+    return setup
+
+
+def benchmark_cases(registry, groups=GROUPS, full=False):
+    """
+    Return the list of BenchmarkCase objects of 'groups'
+
+    calc_all is benchmarked over 1 ('norm'), 10 (BENCH_FAMILIES) and, if
+    'full', all registered distributions (on ALL_SIZE samples).  The
+    probplot cases regress BENCH_FAMILIES one by one and in one batch.
+    """
+    cases = list()
+    samples = synthetic_samples(FIT_SIZE)
+
+    if "calc_all" in groups:
+        sets = [("1", ["norm"]), ("10", list(BENCH_FAMILIES))]
+        if full:
+            sets.append(("all", registry.get_labels()))
+        for name, labels in sets:
+            data = samples if name != "all" else synthetic_samples(ALL_SIZE)
+            cases.append(BenchmarkCase("calc_all/%s" % name,
+                                       "calc_all",
+                                       _calc_all,
+                                       _candidates(registry, labels, data),
+                                       len(data)))
+
+    if "probplot" in groups:
+        for name, run in (("each", _probplot_each),
+                          ("batch", _probplot_batch)):
+            cases.append(BenchmarkCase("probplot/%s" % name,
+                                       "probplot",
+                                       run,
+                                       _candidates(registry,
+                                                   BENCH_FAMILIES,
+                                                   samples),
+                                       len(samples)))
+
+    if "mle_fit" in groups:
+        for label in BENCH_FAMILIES:
+            data = family_samples(registry, label, FIT_SIZE)
+            cases.append(BenchmarkCase("mle_fit/%s" % label,
+                                       "mle_fit",
+                                       _mle_fit,
+                                       _fitted(registry, label, data),
+                                       FIT_SIZE))
+
+    if "esd" in groups:
+        for n in ESD_SIZES:
+            cases.append(BenchmarkCase("esd/%d" % n,
+                                       "esd",
+                                       GeneralizedExtremeStudentizedDeviate,
+                                       lambda n=n: np.random.default_rng(
+                                           n).standard_normal(n),
+                                       n))
+
+    if "ingest" in groups:
+        for n in INGEST_SIZES:
+            cases.append(BenchmarkCase("ingest_csv/%d" % n,
+                                       "ingest",
+                                       load_samples,
+                                       _csv_file(n),
+                                       n))
+
+    if "plot" in groups:
+        state = _fitted(registry, "gamma", synthetic_samples(PLOT_SIZE))()
+        _mle_fit(state)
+        for method in ("create_pplot", "plot_pdfcdf"):
+            cases.append(BenchmarkCase("plot/%s" % method,
+                                       "plot",
+                                       _render(method),
+                                       _uncached(state[0]),
+                                       PLOT_SIZE))
+    return cases
+
+
+def _csv_file(n):
+    """
+    Return a setup function giving the path of a CSV file of n samples
+
+    The file is written (once) to the temporary directory.
+    """
+    fpath = os.path.join(tempfile.gettempdir(), "gamut_bench_%d.csv" % n)
+
+    def setup():
+        if not os.path.exists(fpath):
+            np.savetxt(fpath, synthetic_samples(n), fmt="%.17g")
+        return fpath
+    return setup
+
+
+def cpu_model():
+    """
+    Return the CPU model name (from /proc/cpuinfo where available)
+    """
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def host():
+    """
+    Return a dict identifying the hardware benchmarked (see same_host)
+    """
+    return {"machine" : platform.machine(),
+            "cpu"     : cpu_model(),
+            "cpus"    : os.cpu_count()}
+
+
+def environment():
+    """
+    Return a dict describing the machine and the versions benchmarked
+    """
+    versions = dict()
+    for package in ("numpy", "scipy", "matplotlib"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {"host"      : host(),
+            "hostname"  : platform.node(),
+            "python"    : platform.python_version(),
+            "platform"  : platform.platform(),
+            "processor" : platform.processor() or platform.machine(),
+            "cpus"      : os.cpu_count(),
+            "versions"  : versions}
+
+
+def same_host(current, baseline):
+    """
+    Return True if two results dicts were measured on the same hardware
+
+    Timings are only comparable between runs on the same machine type, CPU
+    model and number of CPUs (see host).
+    """
+    return current["environment"]["host"] == \
+        baseline["environment"].get("host")
+
+
+def format_host(results):
+    """
+    Return a one-line description of the host of a results dict
+    """
+    description = results["environment"].get("host")
+    if description is None:
+        return "unknown host"
+    return "%s, %s CPU(s), %s" % (description["cpu"],
+                                  description["cpus"],
+                                  description["machine"])
+
+
+def run_benchmarks(cases, repeat=3, progress=None):
+    """
+    Measure every case; return the results dict (see save_results)
+
+    If given, progress(name, result) is called after each case.
+    """
+    results = dict()
+    for case in cases:
+        results[case.name] = case.measure(repeat)
+        if progress is not None:
+            progress(case.name, results[case.name])
+    return {"format"      : BENCHMARK_FORMAT,
+            "created"     : time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "environment" : environment(),
+            "results"     : results}
+
+
+def save_results(results, fpath):
+    with open(fpath, "w") as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+
+
+def load_results(fpath):
+    """
+    Return the results dict stored at fpath by save_results
+    """
+    with open(fpath) as f:
+        results = json.load(f)
+    if results.get("format") != BENCHMARK_FORMAT:
+        raise ValueError("%s is not a gamut benchmark file (format %d)"
+                         % (fpath, BENCHMARK_FORMAT))
+    return results
+
+
+def compare_results(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare two results dicts case by case.
+
+    Return a list of (name, baseline seconds, current seconds, ratio,
+    status) tuples, where status is 'regression' if the case is more than
+    'tolerance' (relative) and NOISE_SECONDS slower than the baseline,
+    'improvement' in the opposite case, 'ok' otherwise, and 'new' or
+    'missing' for cases in only one of the two.
+    """
+    rows = list()
+    old = baseline["results"]
+    new = current["results"]
+    for name in sorted(set(old) | set(new)):
+        if name not in old:
+            rows.append((name, None, new[name]["seconds"], None, "new"))
+            continue
+        if name not in new:
+            rows.append((name, old[name]["seconds"], None, None, "missing"))
+            continue
+        before, after = old[name]["seconds"], new[name]["seconds"]
+        ratio = after / before if before > 0 else np.inf
+        if after > before * (1.0 + tolerance) and \
+                after - before > NOISE_SECONDS:
+            status = "regression"
+        elif before > after * (1.0 + tolerance) and \
+                before - after > NOISE_SECONDS:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, before, after, ratio, status))
+    return rows
+
+
+def format_comparison(rows):
+    """
+    Return the rows of compare_results as a printable table
+    """
+    lines = ["%-26s %12s %12s %8s  %s"
+             % ("case", "baseline [s]", "current [s]", "ratio", "status")]
+    fmt = lambda value, spec: spec % value if value is not None else "-"
+    for name, before, after, ratio, status in rows:
+        lines.append("%-26s %12s %12s %8s  %s"
+                     % (name,
+                        fmt(before, "%.4f"),
+                        fmt(after, "%.4f"),
+                        fmt(ratio, "%.2f"),
+                        status))
+    return "\n".join(lines)
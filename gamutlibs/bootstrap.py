@@ -0,0 +1,376 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+import numpy as np
+from gamutlibs.distributions import SciPyContDist
+from gamutlibs.executors import TimeBudgetExceeded, submit_with_budget
+from gamutlibs.registry import rv_handle, freeze
+
+# Resampling modes: resample the data (with replacement), or draw samples
+# from the fitted distribution
+BOOTSTRAP_MODES = ("nonparametric", "parametric")
+
+DEFAULT_RESAMPLES     = 200
+DEFAULT_LEVEL         = 0.95
+DEFAULT_PROBABILITIES = (0.01, 0.1, 0.5, 0.9, 0.99)
+
+# Largest resample matrix (resamples x samples) of one task of a vectorized
+# estimator, and the resamples per task of the other (iterative) fits
+MATRIX_ELEMENTS = 2 * 10**7
+BLOCK_FITS      = 8
+
+
+def _vec_norm(resamples):
+    return np.column_stack((np.mean(resamples, axis=1),
+                            np.std(resamples, axis=1)))
+
+
+def _vec_expon(resamples):
+    loc = np.min(resamples, axis=1)
+    return np.column_stack((loc, np.mean(resamples, axis=1) - loc))
+
+
+def _vec_uniform(resamples):
+    loc = np.min(resamples, axis=1)
+    return np.column_stack((loc, np.max(resamples, axis=1) - loc))
+
+
+def _vec_laplace(resamples):
+    loc = np.median(resamples, axis=1)
+    return np.column_stack((loc, np.mean(np.abs(resamples - loc[:, None]),
+                                         axis=1)))
+
+
+def _vec_halfnorm(resamples):
+    loc = np.min(resamples, axis=1)
+    return np.column_stack((loc, np.sqrt(np.mean((resamples - loc[:, None])**2.0,
+                                                 axis=1))))
+
+
+# Closed-form MLEs of (loc, scale), vectorized over the rows of a resample
+# matrix (see distributions.CLOSED_FORM_MLE for the 1-D versions)
+VECTORIZED_MLE = {"norm"     : _vec_norm,
+                  "expon"    : _vec_expon,
+                  "uniform"  : _vec_uniform,
+                  "laplace"  : _vec_laplace,
+                  "halfnorm" : _vec_halfnorm}
+
+
+def resample_matrix(label, fit_params, samples, mode, rows, seed):
+    """
+    Return a (rows, len(samples)) matrix of bootstrap resamples
+
+    Nonparametric resamples index the samples with one random index matrix;
+    parametric resamples are drawn from the fitted distribution.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(samples)
+    if mode == "nonparametric":
+        return samples[rng.integers(0, n, size=(rows, n))]
+    return freeze(label, fit_params).rvs(size=(rows, n), random_state=rng)
+
+
+def _bootstrap_block(label, fit_params, samples, mode, rows, seed, deadline):
+    """
+    Return the MLE parameters fit to 'rows' resamples, one row per resample
+
+    Module-level so that it can be dispatched to a process pool.  Iterative
+    fits are warm-started from fit_params and stop at 'deadline' (a
+    time.time value); resamples not fit in time are NaN rows.
+    """
+    params = np.full((rows, len(fit_params)), np.nan)
+    if time.time() > deadline:
+        return params
+    resamples = resample_matrix(label, fit_params, samples, mode, rows, seed)
+    if label in VECTORIZED_MLE:
+        return VECTORIZED_MLE[label](resamples)
+
+    dist_obj = SciPyContDist(label, len(fit_params) - 2)
+    dist_obj.set_shapes(*fit_params[:-2])
+    with np.errstate(all="ignore"):
+        for ii, resample in enumerate(resamples):
+            remaining = deadline - time.time()
+            if remaining <= 0.0:
+                break
+            dist_obj.set_loc(fit_params[-2])
+            dist_obj.set_scale(fit_params[-1])
+            try:
+                dist_obj.MLE_fit(resample,
+                                 time.perf_counter() + remaining,
+                                 statistics=False)
+            except Exception:
+                continue
+            if dist_obj.has_fit() and not dist_obj.is_timed_out():
+                params[ii] = dist_obj.get_fit_params()
+    return params
+
+
+def parameter_names(label):
+    """
+    Return the names of the parameters of 'label' (shapes..., loc, scale)
+    """
+    shapes = rv_handle(label).shapes
+    names = [name.strip() for name in shapes.split(",")] if shapes else []
+    return names + ["loc", "scale"]
+
+
+class BootstrapIntervals:
+    """
+    Bootstrap percentile confidence intervals of an MLE fit
+
+    Intervals are given for each parameter (shapes..., loc, scale) and for
+    the quantiles of the fitted distribution at 'probabilities'.  Resample
+    fits that failed, or were not done within the time budget, are left out
+    (see get_count).
+    """
+
+    def __init__(self,
+                 label,
+                 fit_params,
+                 draws,
+                 mode,
+                 level=DEFAULT_LEVEL,
+                 probabilities=DEFAULT_PROBABILITIES,
+                 seconds=None,
+                 timed_out=False):
+        self.label         = label
+        self.fit_params    = tuple(fit_params)
+        self.mode          = mode
+        self.level         = level
+        self.probabilities = tuple(probabilities)
+        self.requested     = len(draws)
+        self.seconds       = seconds
+        self.timed_out     = timed_out
+        self.draws         = draws[np.all(np.isfinite(draws), axis=1)]
+        self.bounds        = self._percentiles(self.draws)
+        self.quantiles     = self._quantiles(np.array([self.fit_params]))[0]
+        self.quantile_bounds = self._percentiles(self._quantiles(self.draws))
+
+    def _percentiles(self, values):
+        """
+        Return (lower, upper) percentile bounds of the columns of values
+        """
+        if len(values) == 0:
+            nan = np.full(values.shape[1], np.nan)
+            return nan, nan
+        tail = 50.0 * (1.0 - self.level)
+        return (np.percentile(values, tail, axis=0),
+                np.percentile(values, 100.0 - tail, axis=0))
+
+    def _quantiles(self, params):
+        """
+        Return the quantiles at self.probabilities for each row of params
+        """
+        p = np.array(self.probabilities)[None, :]
+        shapes = [params[:, [ii]] for ii in range(params.shape[1] - 2)]
+        with np.errstate(all="ignore"):
+            return rv_handle(self.label).ppf(p,
+                                             *shapes,
+                                             loc=params[:, [-2]],
+                                             scale=params[:, [-1]])
+
+    def get_label(self):
+        return self.label
+
+    def get_mode(self):
+        return self.mode
+
+    def get_level(self):
+        return self.level
+
+    def get_count(self):
+        """
+        Return (resamples fit, resamples requested)
+        """
+        return len(self.draws), self.requested
+
+    def get_seconds(self):
+        return self.seconds
+
+    def is_timed_out(self):
+        return self.timed_out
+
+    def get_parameter_intervals(self):
+        """
+        Return a list of (name, estimate, lower, upper) per parameter
+        """
+        return list(zip(parameter_names(self.label),
+                        self.fit_params,
+                        self.bounds[0],
+                        self.bounds[1]))
+
+    def get_quantile_intervals(self):
+        """
+        Return a list of (probability, quantile, lower, upper)
+        """
+        return list(zip(self.probabilities,
+                        self.quantiles,
+                        self.quantile_bounds[0],
+                        self.quantile_bounds[1]))
+
+    def summary(self):
+        """
+        Return a one-line summary of the parameter intervals
+        """
+        return "; ".join("%s [%.4g, %.4g]" % (name, lower, upper)
+                         for name, _, lower, upper in
+                         self.get_parameter_intervals())
+
+    def report(self):
+        """
+        Return a multi-line description of all intervals
+        """
+        fit, requested = self.get_count()
+        lines = ["%s bootstrap, %d of %d resamples%s, %g%% intervals:"
+                 % (self.mode.capitalize(),
+                    fit,
+                    requested,
+                    " (timed out)" if self.timed_out else "",
+                    100.0 * self.level)]
+        for name, estimate, lower, upper in self.get_parameter_intervals():
+            lines.append("%s = %.6g [%.6g, %.6g]"
+                         % (name, estimate, lower, upper))
+        for p, estimate, lower, upper in self.get_quantile_intervals():
+            lines.append("quantile %g = %.6g [%.6g, %.6g]"
+                         % (p, estimate, lower, upper))
+        return "\n".join(lines)
+
+
+class _BootstrapFuture(Future):
+    """
+    Future of a bootstrap, running from submission
+
+    Cancelling it cancels the blocks of resamples not yet started; if any
+    was, the bootstrap is cancelled: cancelled() is then True and result()
+    raises CancelledError.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.works           = list()
+        self.lock            = threading.Lock()
+        self.cancel_received = False
+
+    def cancel(self):
+        cancelled = [work.cancel() for work in self.works]
+        return any(cancelled) or self.cancel_received
+
+    def cancelled(self):
+        return self.cancel_received
+
+    def abort(self):
+        """
+        Complete the (running) future as cancelled, unless it is done;
+        call with the lock held
+        """
+        if not self.done():
+            self.cancel_received = True
+            self.set_exception(CancelledError())
+
+
+def submit_bootstrap(executor,
+                     dist_obj,
+                     samples,
+                     resamples=DEFAULT_RESAMPLES,
+                     mode="nonparametric",
+                     budget=None,
+                     level=DEFAULT_LEVEL,
+                     probabilities=DEFAULT_PROBABILITIES,
+                     seed=0):
+    """
+    Start a bootstrap of the MLE fit of dist_obj; return a Future of the
+    BootstrapIntervals.
+
+    The resamples are split into blocks dispatched through 'executor' (see
+    _bootstrap_block): large blocks for distributions with a vectorized
+    estimator (VECTORIZED_MLE), blocks of BLOCK_FITS resamples otherwise.
+    Each block has its own random stream, so results do not depend on the
+    executor.  After 'budget' seconds no more resamples are fit; with an
+    IsolatedExecutor, blocks still running a little later are killed.
+    Cancelling the Future cancels the blocks not yet started, and the
+    bootstrap with them (see _BootstrapFuture); the first block to fail
+    fails it.
+    """
+    if mode not in BOOTSTRAP_MODES:
+        raise ValueError("Unknown bootstrap mode '%s'; expected one of %s"
+                         % (mode, ", ".join(BOOTSTRAP_MODES)))
+    if not dist_obj.has_fit():
+        raise ValueError("%s has no MLE fit to bootstrap"
+                         % dist_obj.get_label())
+    label = dist_obj.get_label()
+    fit_params = dist_obj.get_fit_params()
+    start = time.time()
+    deadline = start + budget if budget is not None else np.inf
+
+    if label in VECTORIZED_MLE:
+        rows = max(1, MATRIX_ELEMENTS // len(samples))
+    else:
+        rows = BLOCK_FITS
+    sizes = [min(rows, resamples - first)
+             for first in range(0, resamples, rows)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    future = _BootstrapFuture()
+    future.set_running_or_notify_cancel()
+    blocks = [None] * len(sizes)
+    remaining = [len(sizes)]
+
+    def finish(index, work):
+        exc = None if work.cancelled() else work.exception()
+        if isinstance(exc, TimeBudgetExceeded):
+            blocks[index] = np.full((sizes[index], len(fit_params)), np.nan)
+            exc = None
+        elif exc is None and not work.cancelled():
+            blocks[index] = work.result()
+        with future.lock:
+            remaining[0] -= 1
+            if future.done():
+                return
+            if work.cancelled():
+                future.abort()
+                return
+            if exc is not None:
+                future.set_exception(exc)
+                return
+            if remaining[0] > 0:
+                return
+        # the last block to finish, and no block failed
+        try:
+            draws = np.vstack(blocks)
+            future.set_result(BootstrapIntervals(
+                label,
+                fit_params,
+                draws,
+                mode,
+                level,
+                probabilities,
+                time.time() - start,
+                time.time() > deadline and
+                not np.all(np.isfinite(draws))))
+        except Exception as exc:
+            future.set_exception(exc)
+
+    for index, (size, block_seed) in enumerate(zip(sizes, seeds)):
+        work = submit_with_budget(executor,
+                                  budget,
+                                  _bootstrap_block,
+                                  label,
+                                  fit_params,
+                                  samples,
+                                  mode,
+                                  size,
+                                  block_seed,
+                                  deadline)
+        future.works.append(work)
+        work.add_done_callback(lambda w, index=index: finish(index, w))
+    return future
@@ -8,8 +8,752 @@
 #
 ###############################################################################
 import scipy.stats
+import scipy.optimize
+import scipy.special
 import numpy as np
+import hashlib
+import copy
 import sys
+import time
+import weakref
+from concurrent.futures import Future
+from gamutlibs.executors import SerialExecutor, TimeBudgetExceeded
+from gamutlibs.executors import report_progress, submit_with_budget
+from gamutlibs.registry import rv_handle, freeze
+from gamutlibs import instrument
+from gamutlibs.goodness import GOF_FIELDS, goodness_of_fit
+
+# Largest number of quantiles (candidates x samples) held at once by a
+# batch of probability plot regressions (see ProbabilityPlotEngine.
+# probplot_batch)
+PROBPLOT_CHUNK_ELEMENTS = 2**22
+
+
+def sample_fingerprint(samples):
+    """
+    Return a hex digest identifying the contents of a sample array
+    """
+    samples = np.ascontiguousarray(samples, dtype=np.float64)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(samples.shape).encode())
+    digest.update(samples.data)
+    return digest.hexdigest()
+
+
+def uniform_order_statistic_medians(n):
+    """
+    Return Filliben's estimate of the uniform order statistic medians for N=n
+
+        Filliben, J. J. (February 1975), The Probability Plot Correlation
+        Coefficient Test for Normality, Technometrics, pp. 111-117.
+
+    Identical to the values used internally by scipy.stats.probplot.
+    """
+    v = np.empty(n, dtype=np.float64)
+    v[-1] = 0.5**(1.0 / n)
+    v[0] = 1 - v[-1]
+    i = np.arange(2, n)
+    v[1:-1] = (i - 0.3175) / (n + 0.365)
+    return v
+
+
+def stratified_ranks(n, num_points):
+    """
+    Return about num_points order statistic ranks (0-based) of n samples.
+
+    The ranks are evenly spaced in logit(p), so that both tails are kept
+    (nearly) complete while the centre, where the quantile function is
+    smoothest, is thinned out.  The first and last ranks are always included.
+    """
+    if n <= num_points:
+        return np.arange(n)
+    p = scipy.special.expit(np.linspace(scipy.special.logit(0.5 / n),
+                                        scipy.special.logit(1.0 - 0.5 / n),
+                                        num_points))
+    ranks = np.clip(np.round(p * n - 0.5), 0, n - 1).astype(np.intp)
+    ranks[0], ranks[-1] = 0, n - 1
+    return np.unique(ranks)
+
+
+def decimation_indices(n, max_points=4000, tail_points=200):
+    """
+    Return the indices of the sorted points to draw out of n.
+
+    The 'tail_points' smallest and largest points (including the extremes) are
+    all kept; the points in between are taken at evenly spaced ranks, so that
+    the density of points along the plotted curve is preserved.
+    """
+    if n <= max_points:
+        return np.arange(n)
+    tail_points = min(tail_points, max_points // 4)
+    centre = np.linspace(tail_points,
+                         n - tail_points - 1,
+                         max_points - 2 * tail_points)
+    return np.unique(np.concatenate((np.arange(tail_points),
+                                     np.round(centre).astype(np.intp),
+                                     np.arange(n - tail_points, n))))
+
+
+def adaptive_pdf_cdf(frozen,
+                     max_points=1000,
+                     initial_points=17,
+                     tolerance=2.0e-3):
+    """
+    Return (x, cdf, pdf) curves of a frozen SciPy distribution.
+
+    The curves span the CDF values 1/max_points to 1 - 1/max_points.  They
+    start from 'initial_points' evenly spaced CDF values, and each interval is
+    bisected (in CDF value) while the PDF or CDF midpoint deviates from the
+    straight chord by more than 'tolerance' (relative to the curve's range).
+    Points therefore concentrate where curvature is high.  All midpoints of
+    one refinement round are evaluated in one ppf/pdf call.
+    """
+    lower, upper = 1.0 / max_points, 1.0 - 1.0 / max_points
+    cdf = np.linspace(lower, upper, initial_points)
+    x = frozen.ppf(cdf)
+    pdf = frozen.pdf(x)
+    refine = np.ones(len(cdf) - 1, dtype=bool)
+    while np.any(refine) and len(cdf) < max_points:
+        left = np.flatnonzero(refine)[:max_points - len(cdf)]
+        cdf_mid = 0.5 * (cdf[left] + cdf[left + 1])
+        x_mid = frozen.ppf(cdf_mid)
+        pdf_mid = frozen.pdf(x_mid)
+
+        # Deviation of the midpoints from the chords, in units of the range
+        with np.errstate(all="ignore"):
+            t = (x_mid - x[left]) / (x[left + 1] - x[left])
+            pdf_range = np.ptp(pdf[np.isfinite(pdf)]) \
+                if np.any(np.isfinite(pdf)) else 1.0
+            pdf_error = np.abs(pdf_mid - (pdf[left] + t * (pdf[left + 1]
+                                                          - pdf[left])))
+            cdf_error = np.abs(cdf_mid - (cdf[left] + t * (cdf[left + 1]
+                                                          - cdf[left])))
+            bad = (pdf_error > tolerance * (pdf_range or 1.0)) | \
+                (cdf_error > tolerance * (upper - lower))
+        bad |= ~np.isfinite(t)
+
+        # Insert the midpoints; both halves of a bad interval are refined
+        position = np.searchsorted(cdf, cdf_mid)
+        cdf = np.insert(cdf, position, cdf_mid)
+        x = np.insert(x, position, x_mid)
+        pdf = np.insert(pdf, position, pdf_mid)
+        refine = np.zeros(len(cdf) - 1, dtype=bool)
+        new_position = position + np.arange(len(position))
+        refine[new_position[bad] - 1] = True
+        refine[new_position[bad]] = True
+    return x, cdf, pdf
+
+
+def _pdf_cdf_curves(label, fit_params):
+    """
+    Return adaptive (x, cdf, pdf) curves of 'label' at MLE fit_params
+    """
+    return adaptive_pdf_cdf(freeze(label, fit_params))
+
+
+def pdf_cdf_curves(fits):
+    """
+    Return the (x, cdf, pdf) curves of each (label, fit_params) of fits
+
+    Module-level so that a batch can run as one background task (e.g. for
+    overlay plots); see SciPyContDist.set_pdf_cdf_curves.
+    """
+    return [_pdf_cdf_curves(label, fit_params) for label, fit_params in fits]
+
+
+def calc_pdf_cdf_curves(dist_objs, executor=None):
+    """
+    Compute the PDF/CDF curves of several fitted distr. objects in a batch.
+
+    Only objects without curves for their current fit are computed; the
+    work is spread over 'executor' (e.g. for overlay plots).
+    """
+    if executor is None:
+        executor = SerialExecutor()
+    todo = [dist_obj for dist_obj in dist_objs
+            if not dist_obj.has_pdf_cdf_curves()]
+    curves = executor.map(_pdf_cdf_curves,
+                          [dist_obj.get_label() for dist_obj in todo],
+                          [dist_obj.get_fit_params() for dist_obj in todo])
+    for dist_obj, curve in zip(todo, curves):
+        dist_obj.set_pdf_cdf_curves(curve)
+
+
+class PDFCDFOverlay:
+    """
+    Overlay of the PDF/CDF curves of several fitted distr. objects, drawn
+    with the same interface as SciPyContDist.plot_pdfcdf
+    """
+
+    def __init__(self, dist_objs):
+        self.dist_objs = list(dist_objs)
+
+    def get_label(self):
+        return ", ".join(dist_obj.get_label() for dist_obj in self.dist_objs)
+
+    def release_plot_data(self):
+        for dist_obj in self.dist_objs:
+            dist_obj.release_plot_data()
+
+    def plot_pdfcdf(self, axes):
+        """
+        Draw the PDF (solid) and CDF (dashed) of every object on the axes
+        """
+        calc_pdf_cdf_curves(self.dist_objs)
+        ax2 = axes.twinx()
+        for dist_obj in self.dist_objs:
+            line = axes.plot(dist_obj.scipy_vals,
+                             dist_obj.pdf_vals,
+                             '-',
+                             label=dist_obj.get_label())[0]
+            ax2.plot(dist_obj.scipy_vals,
+                     dist_obj.cdf_vals,
+                     '--',
+                     color=line.get_color())
+        axes.set_xlabel("Parameter Values")
+        axes.set_ylabel("PDF Value (solid)")
+        ax2.set_ylabel("CDF Value (dashed)")
+        axes.set_title("PDF/CDF Overlay")
+        axes.legend(loc=2)
+
+
+def weighted_linregress(x, y, weights):
+    """
+    Return (slope, intercept, r) of the least squares line weighted by weights
+    """
+    total = np.sum(weights)
+    xmean = np.dot(weights, x) / total
+    ymean = np.dot(weights, y) / total
+    dx, dy = x - xmean, y - ymean
+    sxx = np.dot(weights, dx * dx)
+    syy = np.dot(weights, dy * dy)
+    sxy = np.dot(weights, dx * dy)
+    slope = sxy / sxx
+    r = sxy / np.sqrt(sxx * syy) if sxx * syy > 0 else 0.0
+    return slope, ymean - slope * xmean, min(max(r, -1.0), 1.0)
+
+
+def _chunk_moments(quantiles, y, weights=None):
+    """
+    Return the regression moments of the rows of quantiles against y
+
+    The moments are (total weight, x means, y mean, Sxx, Syy, Sxy), with the
+    sums of squares and products about the means of the chunk, as in the
+    two-pass computation of scipy.stats.linregress; weights are optional.
+    """
+    if weights is None:
+        total = float(len(y))
+        xmean = np.mean(quantiles, axis=1)
+        ymean = np.mean(y)
+        dx = quantiles - xmean[:, None]
+        dy = y - ymean
+        wdy = dy
+        wdx = dx
+    else:
+        total = np.sum(weights)
+        xmean = np.dot(quantiles, weights) / total
+        ymean = np.dot(weights, y) / total
+        dx = quantiles - xmean[:, None]
+        dy = y - ymean
+        wdy = weights * dy
+        wdx = dx * weights
+    sxx = np.einsum("ij,ij->i", wdx, dx)
+    return total, xmean, ymean, sxx, np.dot(wdy, dy), np.dot(dx, wdy)
+
+
+def _merge_moments(first, second):
+    """
+    Return the regression moments of two chunks combined (Chan et al.)
+    """
+    if first is None:
+        return second
+    wa, xa, ya, sxxa, syya, sxya = first
+    wb, xb, yb, sxxb, syyb, sxyb = second
+    total = wa + wb
+    dx, dy = xb - xa, yb - ya
+    factor = wa * wb / total
+    return (total,
+            xa + dx * (wb / total),
+            ya + dy * (wb / total),
+            sxxa + sxxb + dx * dx * factor,
+            syya + syyb + dy * dy * factor,
+            sxya + sxyb + dx * dy * factor)
+
+
+def _mle_norm(samples, guess_scale):
+    return (np.mean(samples), np.std(samples)), 0
+
+
+def _mle_expon(samples, guess_scale):
+    loc = np.min(samples)
+    return (loc, np.mean(samples) - loc), 0
+
+
+def _mle_uniform(samples, guess_scale):
+    loc = np.min(samples)
+    return (loc, np.max(samples) - loc), 0
+
+
+def _mle_laplace(samples, guess_scale):
+    loc = np.median(samples)
+    return (loc, np.mean(np.abs(samples - loc))), 0
+
+
+def _mle_halfnorm(samples, guess_scale):
+    loc = np.min(samples)
+    return (loc, np.sqrt(np.mean((samples - loc)**2.0))), 0
+
+
+def _mle_gumbel_r(samples, guess_scale):
+    """
+    Solve the profile likelihood equation of the Gumbel scale; 1-D root find
+    """
+    mean = np.mean(samples)
+
+    def func(scale):
+        weights = scipy.special.softmax(-samples / scale)
+        return mean - np.dot(weights, samples) - scale
+
+    # bracket the root, starting from the regression estimate of the scale
+    if not (np.isfinite(guess_scale) and guess_scale > 0):
+        guess_scale = np.std(samples) or 1.0
+    lbrack, rbrack = guess_scale / 2.0, guess_scale * 2.0
+    while np.sign(func(lbrack)) == np.sign(func(rbrack)):
+        lbrack /= 2.0
+        rbrack *= 2.0
+    res = scipy.optimize.root_scalar(func,
+                                     bracket=(lbrack, rbrack),
+                                     rtol=1e-14,
+                                     xtol=1e-14)
+    scale = res.root
+    loc = -scale * scipy.special.logsumexp(-samples / scale,
+                                           b=1.0/len(samples))
+    return (loc, scale), res.iterations
+
+
+def _mle_gumbel_l(samples, guess_scale):
+    (loc, scale), iterations = _mle_gumbel_r(-samples, guess_scale)
+    return (-loc, scale), iterations
+
+
+# Analytic (or 1-D profile likelihood) MLEs of (loc, scale) for distributions
+# without shape parameters; each returns ((loc, scale), iterations)
+CLOSED_FORM_MLE = {"norm"     : _mle_norm,
+                   "expon"    : _mle_expon,
+                   "uniform"  : _mle_uniform,
+                   "laplace"  : _mle_laplace,
+                   "halfnorm" : _mle_halfnorm,
+                   "gumbel_r" : _mle_gumbel_r,
+                   "gumbel_l" : _mle_gumbel_l}
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+class _CountingOptimizer:
+    """
+    Wrap scipy.optimize.fmin for rv_continuous.fit, recording its work
+
+    If a 'deadline' (time.perf_counter value) is given, the optimization
+    stops there and returns the best parameters evaluated so far (see
+    timed_out).  The best parameters are also reported as progress, at most
+    every PROGRESS_SECONDS (see gamutlibs.executors.report_progress).
+    """
+
+    PROGRESS_SECONDS = 1.0
+
+    def __init__(self, deadline=None):
+        self.calls       = 0
+        self.iterations  = 0
+        self.evaluations = 0
+        self.deadline    = deadline
+        self.timed_out   = False
+        self.best_x      = None
+        self.best_value  = np.inf
+        self.reported    = time.perf_counter()
+
+    def __call__(self, func, x0, args=(), disp=0):
+        def objective(x, *args):
+            value = func(x, *args)
+            if self.best_x is None or value < self.best_value:
+                self.best_x, self.best_value = np.array(x), value
+            now = time.perf_counter()
+            if now - self.reported > self.PROGRESS_SECONDS and \
+                    np.isfinite(self.best_value):
+                self.reported = now
+                report_progress(fit_params=tuple(float(value)
+                                                 for value in self.best_x))
+            if self.deadline is not None and now > self.deadline:
+                raise _BudgetExhausted()
+            return value
+
+        self.calls += 1
+        try:
+            results = scipy.optimize.fmin(objective,
+                                          x0,
+                                          args=args,
+                                          disp=disp,
+                                          full_output=True)
+        except _BudgetExhausted:
+            self.timed_out = True
+            return self.best_x
+        self.iterations += results[2]
+        self.evaluations += results[3]
+        return results[0]
+
+
+def _fit_candidate(dist_obj, engine, settings=None, budget=None):
+    """
+    Perform prob. plot regression and MLE fit for dist_obj; return dist_obj.
+
+    Module-level so that it can be pickled and dispatched to a process pool.
+    The stages are timed into dist_obj's timings, with the instrumentation
+    'settings' of the submitting process (see instrument.get_settings).  The
+    MLE fit stops at the 'budget' (seconds, from the start); the regression
+    results are reported as progress, in case the fit is killed.
+    """
+    deadline = time.perf_counter() + budget if budget is not None else None
+    instrument.apply_settings(settings)
+    timings = dist_obj.get_timings()
+    with instrument.stage("fit",
+                          timings,
+                          label=dist_obj.get_label(),
+                          samples=len(engine.get_sorted_samples())):
+        results = engine.probplot(dist_obj.get_label(),
+                                  dist_obj.get_shapes(),
+                                  timings)
+        dist_obj.feed_pplot_data(results[0],
+                                 results[1],
+                                 engine.get_uniform_medians(),
+                                 engine.r2_error_bound(*results[0]))
+        report_progress(r2=float(dist_obj.r2),
+                        r2_bound=float(dist_obj.r2_bound),
+                        loc=float(dist_obj.loc),
+                        scale=float(dist_obj.scale))
+        dist_obj.MLE_fit(engine.get_fit_samples(), deadline)
+    dist_obj.set_source(engine.get_fingerprint())
+    return dist_obj
+
+
+class ProbabilityPlotEngine:
+    """
+    Perform probability plot regressions against one shared, sorted data set.
+
+    scipy.stats.probplot sorts the samples and recomputes the order statistic
+    medians on every call.  ProbabilityPlotEngine does both once per data set
+    (keyed by the fingerprint of the samples), so that each candidate
+    distribution only costs one evaluation of its ppf and a linear regression.
+
+    Large data mode (opt-in, see set_reduction): data sets of more than
+    'reduced_points' samples are reduced, in one pass over the sorted data,
+    to a stratified subset of order statistics (see stratified_ranks).  The
+    regression is weighted by the number of order statistics each point
+    stands for, and r2_error_bound estimates the resulting error in R^2.
+    MLE fits use a seeded simple random subsample of 'fit_points' samples
+    instead (see get_fit_samples): unlike the stratified subset, it is an
+    i.i.d. sample of the data, so the MLE remains valid for every family.
+
+    The sorted samples and order statistic medians are read-only buffers
+    shared by every candidate (see SciPyContDist.attach); quantile arrays of
+    candidates with equal distribution and shapes are shared too (see
+    share_quantiles).
+
+    Usage:
+
+    engine = ProbabilityPlotEngine(samples)
+    (osm, osr), (slope, intercept, r) = engine.probplot(label, shapes)
+    """
+
+    def __init__(self,
+                 samples=None,
+                 reduced_points=None,
+                 fit_points=100000):
+        self.fingerprint    = None
+        self.sorted_samples = None
+        self.osm_uniform    = None
+        self.weights        = None
+        self.gaps           = None
+        self.fit_samples    = None
+        self.reduced_points = reduced_points
+        self.fit_points     = fit_points
+        self.shared_quantiles = weakref.WeakValueDictionary()
+        if samples is not None:
+            self.set_samples(samples)
+
+    def __getstate__(self):
+        """
+        Pickle (e.g. for worker processes) without the shared quantiles
+        """
+        state = dict(self.__dict__)
+        del state["shared_quantiles"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.shared_quantiles = weakref.WeakValueDictionary()
+
+    def set_reduction(self, reduced_points, fit_points=100000):
+        """
+        Enable large data mode (None disables it); applies from set_samples
+        """
+        self.reduced_points = reduced_points
+        self.fit_points = fit_points
+
+    def is_reduced(self):
+        """
+        Return True if the current data set is reduced (large data mode)
+        """
+        return self.weights is not None
+
+    def set_samples(self, samples):
+        """
+        Sort samples and compute order statistic medians, unless unchanged.
+
+        Return True if the cached values were rebuilt.
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        reduce = self.reduced_points is not None and \
+            samples.size > self.reduced_points
+        fingerprint = sample_fingerprint(samples)
+        if reduce:
+            fingerprint += "|reduced:%d:%d" % (self.reduced_points,
+                                               self.fit_points)
+        if fingerprint == self.fingerprint:
+            return False
+        self.fingerprint = fingerprint
+        self.shared_quantiles = weakref.WeakValueDictionary()
+        sorted_samples = np.sort(samples, axis=None)
+        n = len(sorted_samples)
+        if not reduce:
+            self.sorted_samples = sorted_samples
+            self.osm_uniform = uniform_order_statistic_medians(n)
+            self.weights = self.gaps = self.fit_samples = None
+            self._freeze_buffers()
+            return True
+
+        ranks = stratified_ranks(n, self.reduced_points)
+        rng = np.random.default_rng(0)
+        self.fit_samples = sorted_samples[
+            np.sort(rng.choice(n, min(self.fit_points, n), replace=False))]
+        self.sorted_samples = sorted_samples[ranks]
+        self.osm_uniform = uniform_order_statistic_medians(n)[ranks]
+        # Trapezoid weights: each gap between chosen ranks is shared by its
+        # two end points; the weights sum to n
+        self.gaps = np.diff(ranks).astype(np.float64)
+        self.weights = np.zeros(len(ranks))
+        self.weights[:-1] += 0.5 * self.gaps
+        self.weights[1:] += 0.5 * self.gaps
+        self.weights[[0, -1]] += 0.5
+        self._freeze_buffers()
+        return True
+
+    def _freeze_buffers(self):
+        """
+        Make the shared arrays read-only
+        """
+        for array in (self.sorted_samples, self.osm_uniform, self.weights,
+                      self.gaps, self.fit_samples):
+            if array is not None:
+                array.flags.writeable = False
+
+    def get_shared_buffers(self):
+        """
+        Return the arrays shared by all candidates (for memory reports)
+        """
+        return [array for array in (self.sorted_samples, self.osm_uniform,
+                                    self.weights, self.gaps,
+                                    self.fit_samples)
+                if array is not None]
+
+    def share_quantiles(self, label, shapes, osm):
+        """
+        Return the shared quantile array of (label, shapes), registering osm
+
+        If an array of the same distribution and shapes is in use for this
+        data set, that array is returned, so that osm can be released.
+        """
+        key = (label, tuple(float(shape) for shape in shapes))
+        shared = self.shared_quantiles.get(key)
+        if shared is not None and len(shared) == len(osm):
+            return shared
+        osm.flags.writeable = False
+        self.shared_quantiles[key] = osm
+        return osm
+
+    def get_fingerprint(self):
+        """
+        Return the fingerprint of the current data set
+        """
+        return self.fingerprint
+
+    def get_sorted_samples(self):
+        """
+        Return the sorted samples (ordered response values)
+        """
+        return self.sorted_samples
+
+    def get_uniform_medians(self):
+        """
+        Return Filliben's uniform order statistic medians for the data set
+        """
+        return self.osm_uniform
+
+    def get_weights(self):
+        """
+        Return the regression weight of each point (None unless reduced)
+        """
+        return self.weights
+
+    def get_fit_samples(self):
+        """
+        Return the samples used for MLE fitting
+        """
+        if self.fit_samples is None:
+            return self.sorted_samples
+        return self.fit_samples
+
+    def quantiles(self, label, shapes=()):
+        """
+        Return the theoretical quantiles (osm) of the distribution 'label'
+        """
+        return rv_handle(label).ppf(self.osm_uniform, *shapes)
+
+    def shared_quantile_array(self, label, shapes=()):
+        """
+        Return the (shared, read-only) quantiles of 'label', computed once
+        """
+        key = (label, tuple(float(shape) for shape in shapes))
+        shared = self.shared_quantiles.get(key)
+        if shared is None:
+            shared = self.share_quantiles(label,
+                                          shapes,
+                                          self.quantiles(label, shapes))
+        return shared
+
+    def probplot(self, label, shapes=(), timings=None):
+        """
+        Return ((osm, osr), (slope, intercept, r)) as in scipy.stats.probplot
+
+        The 'ppf' and 'regression' stages are timed into 'timings' (a dict).
+        """
+        with instrument.stage("ppf", timings, label=label):
+            osm = self.quantiles(label, shapes)
+        osr = self.sorted_samples
+        with instrument.stage("regression", timings, label=label):
+            if self.weights is None:
+                slope, intercept, r = scipy.stats.linregress(osm, osr)[:3]
+            else:
+                slope, intercept, r = weighted_linregress(osm,
+                                                          osr,
+                                                          self.weights)
+        return (osm, osr), (slope, intercept, r)
+
+    def probplot_batch(self,
+                       candidates,
+                       keep_quantiles=False,
+                       chunk_elements=PROBPLOT_CHUNK_ELEMENTS,
+                       timings=None):
+        """
+        Return the prob. plots of several candidates, from one pass over osr
+
+        candidates is a list of (label, shapes); the result is a list of
+        ((osm, osr), (slope, intercept, r)) in the same order, matching
+        probplot.  The quantiles of all candidates are stacked into a matrix
+        (one row per candidate) against the sorted samples, so that the
+        regressions are a few matrix-vector products, and are evaluated in
+        chunks of samples (at most chunk_elements quantiles at a time) whose
+        moments are merged.  The osm arrays are only assembled (and shared,
+        see share_quantiles) if keep_quantiles is True; otherwise osm is
+        None.  Quantiles already shared are not re-evaluated.  Candidates
+        with constant quantiles, which scipy.stats.linregress rejects, get a
+        NaN slope and intercept.  The work is timed as the 'probplot_batch'
+        stage into 'timings' (a dict).
+        """
+        keys = list()
+        for label, shapes in candidates:
+            key = (label, tuple(float(shape) for shape in shapes))
+            if key not in keys:
+                keys.append(key)
+        n = len(self.sorted_samples)
+        shared = [self.shared_quantiles.get(key) for key in keys]
+        shared = [osm if osm is not None and len(osm) == n else None
+                  for osm in shared]
+        if keep_quantiles:
+            kept = [osm if osm is not None else np.empty(n)
+                    for osm in shared]
+        rows = max(1, chunk_elements // max(1, len(keys)))
+        moments = None
+        with instrument.stage("probplot_batch",
+                              timings,
+                              candidates=len(keys),
+                              samples=n):
+            for start in range(0, n, rows):
+                stop = min(start + rows, n)
+                quantiles = np.empty((len(keys), stop - start))
+                for ii, (label, shapes) in enumerate(keys):
+                    if shared[ii] is not None:
+                        quantiles[ii] = shared[ii][start:stop]
+                    else:
+                        quantiles[ii] = rv_handle(label).ppf(
+                            self.osm_uniform[start:stop], *shapes)
+                        if keep_quantiles:
+                            kept[ii][start:stop] = quantiles[ii]
+                moments = _merge_moments(
+                    moments,
+                    _chunk_moments(quantiles,
+                                   self.sorted_samples[start:stop],
+                                   None if self.weights is None
+                                   else self.weights[start:stop]))
+        _, xmean, ymean, sxx, syy, sxy = moments
+
+        results = dict()
+        for ii, key in enumerate(keys):
+            slope = sxy[ii] / sxx[ii] if sxx[ii] != 0 else np.nan
+            if sxx[ii] * syy > 0:
+                r = min(max(sxy[ii] / np.sqrt(sxx[ii] * syy), -1.0), 1.0)
+            else:
+                r = 0.0
+            osm = None
+            if keep_quantiles:
+                osm = self.share_quantiles(key[0], key[1], kept[ii])
+            results[key] = ((osm, self.sorted_samples),
+                            (slope, ymean - slope * xmean[ii], r))
+        return [results[(label, tuple(float(shape) for shape in shapes))]
+                for label, shapes in candidates]
+
+    def r2_error_bound(self, osm, osr):
+        """
+        Return an estimated bound on the error of R^2 from data reduction.
+
+        Within each gap between two chosen order statistics both the samples
+        and the quantiles are monotone, so the omitted points are bracketed by
+        the gap's end points.  The bound is the spread between the R^2 of the
+        left and the right end point (Riemann) regressions, which bracket the
+        trapezoid one; it is 0.0 for unreduced data.
+        """
+        if self.weights is None:
+            return 0.0
+        left = weighted_linregress(osm, osr, np.append(self.gaps, 1.0))[2]
+        right = weighted_linregress(osm, osr, np.insert(self.gaps, 0, 1.0))[2]
+        return float(abs(left**2.0 - right**2.0))
+
+
+def format_memory_report(report):
+    """
+    Return the dict of CandidateDistributions.memory_report as a table
+    """
+    lines = ["%-20s %12s %12s" % ("distribution", "own [MB]", "shared [MB]")]
+    for label, shapes, own, shared in report["candidates"]:
+        if shapes:
+            label += "(%s)" % ", ".join("%g" % shape for shape in shapes)
+        lines.append("%-20s %12.3f %12.3f" % (label, own / 1.0e6,
+                                              shared / 1.0e6))
+    own = sum(row[2] for row in report["candidates"])
+    lines.append("%-20s %12.3f %12.3f" % ("total", own / 1.0e6,
+                                          report["shared"] / 1.0e6))
+    return "\n".join(lines)
+
 
 class CandidateDistributions:
     """
@@ -19,46 +763,323 @@ class CandidateDistributions:
     CandidateDistributions is the list 'dists'.  User- specified distributions
     for consideration are added to and removed from this list.  This list also
     serves as an iterable item when data or outlier information is changed.
+
+    The probability plot and MLE work for each distribution is dispatched
+    through 'executor', any object with the submit/map interface of
+    concurrent.futures.Executor (see gamutlibs.executors.make_executor).
+    By default the work is performed serially on the calling thread.
+
+    If a 'cache' (see gamutlibs.fitcache.FitResultCache) is supplied, results
+    are looked up there before being computed, and stored after.  If a
+    'registry' (see gamutlibs.registry.DistributionRegistry) is supplied, the
+    most expensive families are scheduled first (see get_schedule).
+
+    Each fit may be given a wall-clock time budget, globally or per family
+    (see set_time_budget).  A fit out of time returns the best results found
+    so far, marked as timed out (see SciPyContDist.is_timed_out); with an
+    IsolatedExecutor, fits stuck past their budget are killed.
+
+    When many candidates are considered, they can be screened on subsamples
+    first (see screen), so that only the most promising are fully fit.
     """
-    
-    def __init__(self):
+
+    def __init__(self, executor=None, cache=None, registry=None):
         """
-        Initialize the emtpy list for 'dists'
+        Initialize the emtpy list for 'dists', the executor and the cache
         """
         self.dists = list()
+        if executor is None:
+            executor = SerialExecutor()
+        self.executor = executor
+        self.cache = cache
+        self.registry = registry
+        self.significance_level = None
+        self.engine = ProbabilityPlotEngine()
+        self.time_budget = None
+        self.family_budgets = dict()
+
+    def set_executor(self, executor):
+        """
+        Replace the executor used for the prob. plot and MLE calculations
+        """
+        self.executor.shutdown(wait=False)
+        self.executor = executor
 
         
+    def set_time_budget(self, seconds, family_budgets=None):
+        """
+        Set the time budget of each fit (seconds, None for no limit)
+
+        family_budgets (a dict of label -> seconds or None) overrides the
+        budget of particular families.  Timed-out fits are marked stale, to
+        be redone with the new budgets.
+        """
+        self.time_budget = seconds
+        if family_budgets is not None:
+            self.family_budgets = dict(family_budgets)
+        for dist_obj in self.dists:
+            if dist_obj.is_timed_out():
+                dist_obj.set_source(None)
+
+    def get_time_budget(self, label):
+        """
+        Return the time budget of fits of 'label' (None for no limit)
+        """
+        return self.family_budgets.get(label, self.time_budget)
+
+    def set_significance_level(self, value):
+        """
+        Record the outlier significance level (None if outliers are kept)
+        """
+        self.significance_level = value
+
     def add_distribution(self,
                          dist_name,
                          shape_fac_count,
                          shape_factors,
-                         samples):
+                         samples=None):
         """
         Initialize distr. object, compute regress. values, and append obj 'dists'
+
+        If samples is None, the object is appended without results; these can
+        then be computed asynchronously with 'submit'.  Return the object.
         """
         dist_obj = SciPyContDist(dist_name, shape_fac_count)
         dist_obj.set_shapes(*shape_factors)
-        self._calc_results(dist_obj, samples)
+        if samples is not None:
+            dist_obj = self.submit(dist_obj, samples).result()
         self.dists.append(dist_obj)
+        return dist_obj
+
+    def set_samples(self, samples):
+        """
+        Set the data set to fit; return True if it differs from the last one
+        """
+        return self.engine.set_samples(samples)
+
+    def submit(self, dist_obj, samples=None):
+        """
+        Start prob. plot regression and max. likelihood est. fit for dist_obj.
+
+        The work is done on a copy of dist_obj, so that dist_obj itself can
+        still be used while the work is in progress.  Return a Future of the
+        computed copy (already completed if the results were cached).  With
+        a process pool the copy is returned from the worker process.
+        """
+        if samples is not None:
+            self.engine.set_samples(samples)
+        dist_obj = copy.copy(dist_obj)
+        dist_obj.shapes = dict(dist_obj.shapes)
+        dist_obj.timings = dict()
+        if self._restore_cached(dist_obj):
+            future = Future()
+            future.set_result(dist_obj)
+            return future
+        budget = self.get_time_budget(dist_obj.get_label())
+        work = submit_with_budget(self.executor,
+                                  budget,
+                                  _fit_candidate,
+                                  dist_obj,
+                                  self.engine,
+                                  instrument.get_settings(),
+                                  budget)
+        future = Future()
+        fingerprint = self.engine.get_fingerprint()
+        future.add_done_callback(lambda f: f.cancelled() and work.cancel())
+        work.add_done_callback(
+            lambda w: self._finish(dist_obj, fingerprint, w, future))
+        if self.cache is not None:
+            key = self._cache_key(dist_obj)
+            future.add_done_callback(lambda f: self._store_cached(key, f))
+        return future
+
+    def _finish(self, dist_obj, fingerprint, work, future):
+        """
+        Complete future with the outcome of the fit (work), once it is done
+
+        A fit killed for exceeding its budget gives dist_obj with the
+        partial results the fit reported (see SciPyContDist.restore_partial).
+        """
+        if work.cancelled():
+            future.cancel()
+            return
+        if not future.set_running_or_notify_cancel():
+            return
+        if isinstance(work.exception(), TimeBudgetExceeded):
+            dist_obj.restore_partial(work.exception().partial,
+                                     self.engine,
+                                     fingerprint)
+            dist_obj.timings["fit"] = {"stage"   : "fit",
+                                       "label"   : dist_obj.get_label(),
+                                       "seconds" : work.exception().seconds,
+                                       "peak_MB" : None}
+            future.set_result(dist_obj)
+        elif work.exception() is not None:
+            future.set_exception(work.exception())
+        else:
+            if not work.result().is_stale(self.engine.get_fingerprint()):
+                work.result().attach(self.engine)
+            future.set_result(work.result())
+
+    def _cache_key(self, dist_obj):
+        """
+        Return the fit-result cache key for dist_obj and the current samples
+        """
+        return self.cache.make_key(self.engine.get_fingerprint(),
+                                   dist_obj.get_label(),
+                                   dist_obj.get_shapes(),
+                                   self.significance_level)
+
+    def _restore_cached(self, dist_obj):
+        """
+        Restore the results of dist_obj from the cache; return True on a hit
+        """
+        if self.cache is None:
+            return False
+        result = self.cache.get(self._cache_key(dist_obj))
+        if result is None:
+            return False
+        dist_obj.restore_results(result, self.engine)
+        return True
+
+    def _store_cached(self, key, future):
+        """
+        Store the results of a completed fit in the cache
+        """
+        if not future.cancelled() and future.exception() is None and \
+                not future.result().is_timed_out():
+            self.cache.put(key, future.result().get_results())
+
+    def get_stale(self):
+        """
+        Return the indices of the distributions without current results
+
+        Distributions pruned by screening (see screen) are left out.
+        """
+        fingerprint = self.engine.get_fingerprint()
+        return [ii for ii, dist_obj in enumerate(self.dists)
+                if dist_obj.is_stale(fingerprint) and
+                not dist_obj.is_pruned(fingerprint)]
 
+    def get_schedule(self):
+        """
+        Return the indices of the stale distributions, most expensive first
+        """
+        stale = self.get_stale()
+        if self.registry is None:
+            return stale
+        return sorted(stale, key=lambda ii:
+                      -self.registry.get_cost(self.dists[ii].get_label()))
+
+    def replace_obj(self, old_obj, new_obj):
+        """
+        Replace old_obj (by identity) with new_obj; return its index or None
+        """
+        for ii, dist_obj in enumerate(self.dists):
+            if dist_obj is old_obj:
+                self.dists[ii] = new_obj
+                return ii
+        return None
+
+    def memory_report(self):
+        """
+        Return the memory held for the candidates, as a dict
 
-    def _calc_results(self, dist_obj, samples):
+        'shared' is the number of bytes of the engine's buffers (counted
+        once); 'candidates' lists (label, shapes, own bytes, shared bytes)
+        per distribution, where shared bytes are those of arrays also used by
+        the engine or by other candidates.
         """
-        Perform prob. plot regression and max. likelihood est. fit for dist_obj.
+        shared = self.engine.get_shared_buffers()
+        quantiles = list(self.engine.shared_quantiles.values())
+        rows = list()
+        for dist_obj in self.dists:
+            own, common = dist_obj.get_memory_usage(shared + quantiles)
+            rows.append((dist_obj.get_label(),
+                         dist_obj.get_shapes(),
+                         own,
+                         common))
+        return {"shared"     : sum(array.nbytes for array in shared) +
+                               sum(array.nbytes for array in quantiles),
+                "candidates" : rows}
+
+    def screen(self, samples=None, **settings):
         """
-        results = scipy.stats.probplot(samples,
-                                       dist=dist_obj.get_label(),
-                                       sparams=(dist_obj.get_shapes() ))
-        dist_obj.feed_pplot_data(results[0], results[1])
-        dist_obj.MLE_fit()
+        Screen the stale distributions before fitting; return the report.
 
+        The candidates are prob. plotted against growing subsamples, and only
+        the best (the finalists) are kept stale; the others are marked pruned,
+        and are not fit to this data set (see gamutlibs.screening.
+        screen_candidates, which takes the keyword 'settings').
+        """
+        from gamutlibs.screening import screen_candidates
+        if samples is not None:
+            self.engine.set_samples(samples)
+        dist_objs = [self.dists[ii] for ii in self.get_stale()]
+        report = screen_candidates(self.engine,
+                                   [(dist_obj.get_label(),
+                                     dist_obj.get_shape_count(),
+                                     dist_obj.get_shapes())
+                                    for dist_obj in dist_objs],
+                                   self.executor,
+                                   self.get_time_budget,
+                                   **settings)
+        self.apply_screening(dist_objs, report)
+        return report
 
-    def calc_all(self, samples):
+    def apply_screening(self, dist_objs, report):
+        """
+        Record the decisions of a ScreeningReport of dist_objs (in order)
         """
-        Perform regression calcs for all distributions in self.dists.
+        for dist_obj, decision in zip(dist_objs, report.get_decisions()):
+            dist_obj.set_screening(decision, report.get_fingerprint())
+
+    def clear_screening(self):
+        """
+        Discard the screening decisions, so that pruned distributions are fit
         """
         for dist_obj in self.dists:
-            self._calc_results(dist_obj, samples)
+            dist_obj.set_screening(None)
+
+    def probplot_all(self, samples=None, indices=None, keep_quantiles=False):
+        """
+        Return the prob. plot regressions of distributions, computed at once.
+
+        The regressions of the distributions of 'indices' (default: all) are
+        evaluated together against the sorted samples (see
+        ProbabilityPlotEngine.probplot_batch), without MLE fits, and returned
+        as a list of (slope, intercept, r) in the order of indices.  The
+        distribution objects are not modified.
+        """
+        if samples is not None:
+            self.engine.set_samples(samples)
+        if indices is None:
+            indices = range(len(self.dists))
+        results = self.engine.probplot_batch(
+            [(self.dists[ii].get_label(), self.dists[ii].get_shapes())
+             for ii in indices],
+            keep_quantiles)
+        return [regression for _, regression in results]
+
+    def calc_all(self, samples, screen=False):
+        """
+        Perform regression calcs for the stale distributions in self.dists.
+
+        Only distributions whose results were computed from a different data
+        set or different shape factors are recomputed.  If screen is True,
+        the stale distributions are screened first (see screen), and only
+        the finalists are computed.  The calculations are spread over the
+        executor; results are collected in the order of self.dists.  Return
+        the indices of the recomputed distributions.
+        """
+        self.engine.set_samples(samples)
+        if screen:
+            self.screen()
+        stale = self.get_schedule()
+        futures = [self.submit(self.dists[ii]) for ii in stale]
+        for ii, future in zip(stale, futures):
+            self.dists[ii] = future.result()
+        return stale
 
 
     def get_count(self):
@@ -122,19 +1143,139 @@ class SciPyContDist():
     associated values for shape_count;  these values are simulatenous populated
     when SciPyContDist is instantiated within
     CandidateDistributions.add_distribution using an dict.iteritems() loop.
+
+    The ordered samples (y) and order statistic medians of a fitted object
+    are the read-only buffers shared through the ProbabilityPlotEngine (see
+    attach); they are not pickled with the object, nor is the frozen SciPy
+    distribution, which is created on first use (see scipy_obj).
     """
-    
+
+    __slots__ = ("label",
+                 "shape_count",
+                 "loc",
+                 "scale",
+                 "shapes",
+                 "source",
+                 "r2",
+                 "r2_bound",
+                 "timings",
+                 "x",
+                 "y",
+                 "uniform_medians",
+                 "fit_params",
+                 "fit_method",
+                 "fit_iterations",
+                 "fit_evaluations",
+                 "timed_out",
+                 "gof",
+                 "bootstrap",
+                 "screening",
+                 "scipy_command",
+                 "curves_params",
+                 "scipy_vals",
+                 "cdf_vals",
+                 "pdf_vals",
+                 "_scipy_obj")
+
+    # Attributes shared with the engine, or derived; not pickled
+    _UNPICKLED = ("y", "uniform_medians", "_scipy_obj")
+
     def __init__(self,
                  label,
                  shape_count=0,
                  loc=None,
                  scale=None):
 
-        self.label       = label
-        self.shape_count = shape_count
-        self.loc         = None
-        self.scale       = None
-        self.shapes      = dict()
+        self.label           = label
+        self.shape_count     = shape_count
+        self.loc             = None
+        self.scale           = None
+        self.shapes          = dict()
+        self.source          = None
+        self.r2              = None
+        self.r2_bound        = None
+        self.timings         = dict()
+        self.x               = None
+        self.y               = None
+        self.uniform_medians = None
+        self.fit_params      = None
+        self.fit_method      = None
+        self.fit_iterations  = 0
+        self.fit_evaluations = 0
+        self.timed_out       = False
+        self.gof             = None
+        self.bootstrap       = None
+        self.screening       = None
+        self.scipy_command   = "(no MLE fit)"
+        self.curves_params   = None
+        self.scipy_vals      = None
+        self.cdf_vals        = None
+        self.pdf_vals        = None
+        self._scipy_obj      = None
+
+    def __getstate__(self):
+        """
+        Return the attributes to pickle (see _UNPICKLED)
+        """
+        return {name: getattr(self, name) for name in self.__slots__
+                if name not in self._UNPICKLED}
+
+    def __setstate__(self, state):
+        self.__init__(state["label"], state["shape_count"])
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @property
+    def scipy_obj(self):
+        """
+        Frozen SciPy distribution at the MLE parameter values (or None)
+        """
+        if self._scipy_obj is None and self.has_fit():
+            self._scipy_obj = freeze(self.get_label(), self.fit_params)
+        return self._scipy_obj
+
+    def attach(self, engine):
+        """
+        Point the prob. plot arrays at the shared buffers of engine
+
+        The ordered samples and order statistic medians become those of the
+        engine, and the quantiles are shared with candidates of the same
+        distribution and shapes (see ProbabilityPlotEngine.share_quantiles).
+        """
+        if self.r2 is None or self.x is None:
+            return
+        self.y = engine.get_sorted_samples()
+        self.uniform_medians = engine.get_uniform_medians()
+        self.x = engine.share_quantiles(self.get_label(),
+                                        self.get_shapes(),
+                                        self.x)
+
+    def release_plot_data(self):
+        """
+        Release the PDF/CDF curves (recomputed when plotted again)
+        """
+        self.curves_params = None
+        self.scipy_vals = self.cdf_vals = self.pdf_vals = None
+
+    def get_memory_usage(self, shared=()):
+        """
+        Return (own bytes, shared bytes) of the arrays held by this object
+
+        Arrays listed in 'shared' (or views of them) are counted as shared.
+        """
+        shared_ids = set(id(array) for array in shared)
+        own = sys.getsizeof(self)
+        shared_bytes = 0
+        for name in ("x", "y", "uniform_medians",
+                     "scipy_vals", "cdf_vals", "pdf_vals"):
+            array = getattr(self, name)
+            if array is None:
+                continue
+            if id(array) in shared_ids or id(array.base) in shared_ids:
+                shared_bytes += array.nbytes
+            else:
+                own += array.nbytes
+        return own, shared_bytes
 
 
     def get_label(self):
@@ -199,15 +1340,74 @@ class SciPyContDist():
         return shape_vals
 
 
+    def set_source(self, fingerprint):
+        """
+        Record the data set fingerprint and shape factors behind the results
+        """
+        self.source = (fingerprint, tuple(self.get_shapes()))
+
+    def has_results(self):
+        """
+        Return True if prob. plot and MLE results have been computed
+        """
+        return self.source is not None
+
+    def is_stale(self, fingerprint):
+        """
+        Return True if the results were not computed from the given data set
+        and the current shape factors
+        """
+        return self.source != (fingerprint, tuple(self.get_shapes()))
+
+    def set_screening(self, decision, fingerprint=None):
+        """
+        Record the screening decision (a dict, see gamutlibs.screening) made
+        for the data set of 'fingerprint' and the current shape factors
+        """
+        if decision is not None:
+            decision = dict(decision,
+                            source=(fingerprint, tuple(self.get_shapes())))
+        self.screening = decision
+
+    def get_screening(self):
+        """
+        Return the screening decision (a dict), or None if not screened
+        """
+        return self.screening
+
+    def is_pruned(self, fingerprint):
+        """
+        Return True if screening excluded the distribution from fitting the
+        given data set with the current shape factors
+        """
+        decision = self.get_screening()
+        return decision is not None and \
+            decision["status"] != "finalist" and \
+            decision["source"] == (fingerprint, tuple(self.get_shapes()))
+
     def get_r2(self):
         """
         Return the coefficient of determination for the probability plot
         """
         return self.r2
 
+    def get_r2_bound(self):
+        """
+        Return the estimated error bound of R^2 (0.0 unless data were reduced)
+        """
+        return self.r2_bound
+
+    def get_timings(self):
+        """
+        Return the stage entries (by stage name) of the last fit/restore
+        """
+        return self.timings
+
     def feed_pplot_data(self,
                         plot_data,
-                        lin_regress_data):
+                        lin_regress_data,
+                        uniform_medians=None,
+                        r2_bound=0.0):
         """
         Store results from prob. plot regression as attributes
         """
@@ -216,46 +1416,308 @@ class SciPyContDist():
         self.scale = lin_regress_data[0]        # slope
         self.loc   = lin_regress_data[1]        # intercept
         self.r2    = (lin_regress_data[2])**2.0 # coeff of determination
+        self.uniform_medians = uniform_medians  # Filliben's estimate
+        self.r2_bound = r2_bound                # data reduction error
 
 
     def _calc_pdf_cdf(self, num_points=1000):
         """
         Construct PDF and CDF curves of fit the SciPy distribution
-        """
 
+        The curves are sampled adaptively (see adaptive_pdf_cdf) and cached
+        until the MLE fit changes.
+        """
+        if self.has_pdf_cdf_curves():
+            return
         # Note: do not include 1st or last points, which may correspond to 
         # +/- infinite
-        self.cdf_vals = np.linspace(1.0/num_points,
-                                    (num_points-1)/num_points,
-                                    num_points-2)
-        self.scipy_vals = self.scipy_obj.ppf(self.cdf_vals)
-        self.pdf_vals = self.scipy_obj.pdf(self.scipy_vals)
+        self.set_pdf_cdf_curves(adaptive_pdf_cdf(self.scipy_obj,
+                                                 max_points=num_points))
 
+    def has_pdf_cdf_curves(self):
+        """
+        Return True if PDF/CDF curves of the current MLE fit are cached
+        """
+        return self.curves_params is not None and \
+            self.curves_params == self.get_fit_params()
 
-    def MLE_fit(self):
+    def set_pdf_cdf_curves(self, curves):
+        """
+        Store (x, cdf, pdf) curves computed for the current MLE fit
+        """
+        self.scipy_vals, self.cdf_vals, self.pdf_vals = curves
+        self.curves_params = self.get_fit_params()
+
+
+    def MLE_fit(self, samples=None, deadline=None, statistics=True):
         """
         Fit dist. parameters to data using maximum likelihood estimate method
+
+        The ordered samples of the prob. plot are fit unless samples are given.
+
+        Distributions in CLOSED_FORM_MLE are fit analytically.  Otherwise the
+        optimizer is warm-started from the user's shape factors and the loc.
+        and scale estimated by the prob. plot regression (or of the current
+        fit, if its shapes are the shape factors), falling back to SciPy's
+        default starting point if that fails.  The path taken and the
+        number of iterations are stored (see get_fit_method).  The fit is
+        timed as stage 'mle', with the number of objective evaluations (see
+        gamutlibs.instrument).
+
+        At 'deadline' (a time.perf_counter value) the optimizer is stopped:
+        the fit is marked as timed out, and the best parameters found so far
+        are kept (if valid).
+
+        Unless 'statistics' is False, the goodness-of-fit statistics of the
+        fit follow (see compute_gof); samples must then be sorted.  Bootstrap
+        intervals of a previous fit are discarded.
+        """
+        if samples is None:
+            samples = self.y
+        self.timed_out = False
+        self.bootstrap = None
+        with instrument.stage("mle",
+                              self.timings,
+                              label=self.get_label(),
+                              samples=len(samples)) as entry:
+            self._MLE_fit(samples, deadline)
+            entry["method"] = self.fit_method
+            entry["evaluations"] = self.fit_evaluations
+        if statistics:
+            self.compute_gof(samples)
+
+    def compute_gof(self, sorted_samples):
+        """
+        Compute the goodness-of-fit statistics of the MLE fit (see get_gof)
+
+        Timed as stage 'gof'; without an MLE fit the statistics are None.
+        """
+        if not self.has_fit():
+            self.gof = None
+            return
+        with instrument.stage("gof",
+                              self.timings,
+                              label=self.get_label(),
+                              samples=len(sorted_samples)):
+            self.gof = goodness_of_fit(self.get_label(),
+                                       self.fit_params,
+                                       sorted_samples)
+
+    def get_gof(self):
+        """
+        Return the KS, A^2, W^2, log-likelihood, AIC and BIC of the MLE fit
+
+        The dict has the keys of goodness.GOF_FIELDS; values are None if the
+        statistics were not computed.
+        """
+        if self.gof is None:
+            return dict.fromkeys(GOF_FIELDS)
+        return dict(self.gof)
+
+    def _MLE_fit(self, samples, deadline=None):
         """
-        samples=self.y
-        fit_params = \
-            eval("scipy.stats.%s.fit(samples)" % self.get_label())
+        Fit samples (see MLE_fit)
+        """
+        label = self.get_label()
+        if label in CLOSED_FORM_MLE:
+            fit_params, self.fit_iterations = \
+                CLOSED_FORM_MLE[label](samples, self.scale)
+            self.fit_evaluations = self.fit_iterations
+            self.fit_method = "closed-form"
+            self.set_fit_params(fit_params)
+            return
+
+        # A fit whose shapes were adopted as the shape factors (e.g. by
+        # scan.choose_shapes) is resumed rather than started over
+        loc, scale = self.loc, self.scale
+        resume = self.has_fit() and \
+            list(self.fit_params[:-2]) == list(self.get_shapes())
+        if resume:
+            loc, scale = self.fit_params[-2:]
+
+        if deadline is not None and time.perf_counter() > deadline:
+            # out of time before the fit started
+            self.fit_iterations = self.fit_evaluations = 0
+            self.timed_out = True
+            self.fit_method = "timed out"
+            if not resume:
+                self.clear_fit_params()
+            return
+
+        rv = rv_handle(label)
+        optimizer = _CountingOptimizer(deadline)
+        fit_params = None
+        if np.isfinite(loc) and np.isfinite(scale) and scale > 0:
+            try:
+                fit_params = rv.fit(samples,
+                                    *self.get_shapes(),
+                                    loc=loc,
+                                    scale=scale,
+                                    optimizer=optimizer)
+                self.fit_method = "warm-start"
+            except Exception:
+                fit_params = None
+        if fit_params is None and not optimizer.timed_out:
+            fit_params = rv.fit(samples, optimizer=optimizer)
+            self.fit_method = "cold-start"
+        if optimizer.calls == 0:
+            # SciPy used a specialized estimator of its own
+            self.fit_method = "scipy-specialized"
+        self.fit_iterations = optimizer.iterations
+        self.fit_evaluations = optimizer.evaluations
+        if optimizer.timed_out:
+            self.timed_out = True
+            self.fit_method = "timed out"
+        if fit_params is None:
+            self.clear_fit_params()
+        else:
+            self.set_fit_params(fit_params)
+
+    def clear_fit_params(self):
+        """
+        Discard the MLE fit (e.g. none was found within the time budget)
+        """
+        self.fit_params    = None
+        self._scipy_obj    = None
+        self.gof           = None
+        self.scipy_command = "(no MLE fit)"
+
+    def has_fit(self):
+        """
+        Return True if MLE parameter values are available
+        """
+        return self.fit_params is not None
+
+    def is_timed_out(self):
+        """
+        Return True if the last fit ran out of time (see MLE_fit)
+        """
+        return self.timed_out
+
+    def restore_partial(self, partial, engine, fingerprint):
+        """
+        Restore the results reported by a fit killed at its time budget.
+
+        'partial' holds the regression results (r2, r2_bound, loc, scale)
+        and the best MLE 'fit_params', as far as they were reported (it may
+        be None).  The object is marked as timed out, with results computed
+        from the data set of 'fingerprint'.
+        """
+        partial = partial or dict()
+        self.timed_out = True
+        self.fit_method = "timed out"
+        self.fit_iterations = self.fit_evaluations = 0
+        self.gof      = None
+        self.bootstrap = None
+        self.r2       = partial.get("r2")
+        self.r2_bound = partial.get("r2_bound", 0.0)
+        self.loc      = partial.get("loc")
+        self.scale    = partial.get("scale")
+        if self.r2 is not None and \
+                fingerprint == engine.get_fingerprint():
+            self.x = engine.shared_quantile_array(self.get_label(),
+                                                  self.get_shapes())
+            self.y = engine.get_sorted_samples()
+            self.uniform_medians = engine.get_uniform_medians()
+        else:
+            self.r2 = None
+        if partial.get("fit_params") is not None:
+            self.set_fit_params(partial["fit_params"])
+        else:
+            self.clear_fit_params()
+        self.set_source(fingerprint)
+
+    def set_fit_params(self, fit_params):
+        """
+        Store MLE parameter values (shapes..., loc, scale)
+
+        The frozen SciPy distribution is created when first used (scipy_obj).
+        """
+        self.fit_params = tuple(float(value) for value in fit_params)
         scale = fit_params[-1]
         loc = fit_params[-2]
         shapes = fit_params[:-2]
-        self.fit_obj = SciPyContDist(self.get_label(),
-                                     loc=loc,
-                                     scale=scale,
-                                     shape_count=len(shapes))
-        self.fit_obj.set_shapes(*shapes)
         
-        # Assemble scipy call string
+        # Assemble scipy call string (for display)
         self.scipy_command = "scipy.stats.%s(" % self.get_label()
         for shape in shapes:
             self.scipy_command += "%10.6e, " % shape
         self.scipy_command += "loc=%10.6e, scale=%10.6e)" % (loc, scale)
-        
-        # Instantiate a frozen SciPy distribution using MLE fit param. values
-        self.scipy_obj = self.scipy_obj = eval(self.get_scipy_command())
+        self._scipy_obj = None
+
+    def get_fit_params(self):
+        """
+        Return the MLE parameter values as a tuple (shapes..., loc, scale)
+        """
+        return self.fit_params
+
+    def get_fit_method(self):
+        """
+        Return the MLE path used ('closed-form', 'warm-start', 'cold-start'
+        or 'scipy-specialized')
+        """
+        return self.fit_method
+
+    def get_fit_iterations(self):
+        """
+        Return the number of iterations used by the MLE fit
+        """
+        return self.fit_iterations
+
+    def set_bootstrap(self, intervals):
+        """
+        Store bootstrap confidence intervals of the MLE fit (or None)
+
+        See gamutlibs.bootstrap.BootstrapIntervals.
+        """
+        self.bootstrap = intervals
+
+    def get_bootstrap(self):
+        return self.bootstrap
+
+    def get_results(self):
+        """
+        Return the prob. plot and MLE results as a dict of plain values
+
+        Results missing from a timed-out fit are None.
+        """
+        plain = lambda value: None if value is None else float(value)
+        results = {"r2"             : plain(self.r2),
+                   "r2_bound"       : plain(self.r2_bound),
+                   "loc"            : plain(self.loc),
+                   "scale"          : plain(self.scale),
+                   "fit_params"     : self.get_fit_params(),
+                   "fit_method"     : self.fit_method,
+                   "fit_iterations" : int(self.fit_iterations),
+                   "timed_out"      : self.is_timed_out()}
+        results.update(self.get_gof())
+        return results
+
+    def restore_results(self, results, engine):
+        """
+        Restore results produced by get_results for the engine's data set.
+
+        Only the theoretical quantiles (for plotting) are re-evaluated; the
+        regression and the MLE fit are not repeated.
+        """
+        with instrument.stage("restore", self.timings, label=self.get_label()):
+            self.x = engine.shared_quantile_array(self.get_label(),
+                                                  self.get_shapes())
+        self.y     = engine.get_sorted_samples()
+        self.uniform_medians = engine.get_uniform_medians()
+        self.r2    = results["r2"]
+        self.r2_bound = results.get("r2_bound", 0.0)
+        self.loc   = results["loc"]
+        self.scale = results["scale"]
+        self.set_fit_params(results["fit_params"])
+        self.timed_out = False
+        self.fit_method = results["fit_method"]
+        self.fit_iterations = results["fit_iterations"]
+        # results cached before the statistics were introduced lack them
+        gof = {name: results.get(name) for name in GOF_FIELDS}
+        self.gof = gof if gof["ks"] is not None else None
+        self.bootstrap = None
+        self.set_source(engine.get_fingerprint())
 
     def get_scipy_command(self):
         """
@@ -280,10 +1742,15 @@ class SciPyContDist():
                   '-k',
                   label="Regression")
 
-        axes.plot(self.x,
-                  self.y,
+        # Decimate the samples layer; tails and extremes are drawn exactly
+        shown = decimation_indices(len(self.x))
+        label = "Samples"
+        if len(shown) < len(self.x):
+            label += " (%d of %d shown)" % (len(shown), len(self.x))
+        axes.plot(self.x[shown],
+                  self.y[shown],
                   'ro',
-                  label="Samples")
+                  label=label)
 
         eq = "OV(TQ) = %6.4E*TQ +  %6.4E\n$R^2$=%.4f" \
             % (self.scale, self.loc, self.r2)
@@ -320,14 +1787,15 @@ class SciPyContDist():
                  label="CDF")
         ax2.set_ylabel("CDF Value")
         
-        # Filliben's estimate of the ordered statistic medians
-        #     Filliben, J. J. (February 1975), The Probability Plot Correlation
-        #     Coefficient Test for Normality, Technometrics, pp. 111-117.
-        quantiles = \
-            scipy.stats.morestats._calc_uniform_order_statistic_medians(len(self.x))
-
-        ax2.plot(self.y,
-                 quantiles,
+        # Filliben's estimate of the ordered statistic medians, shared with
+        # the probability plot engine when available
+        quantiles = self.uniform_medians
+        if quantiles is None:
+            quantiles = uniform_order_statistic_medians(len(self.x))
+
+        shown = decimation_indices(len(self.y))
+        ax2.plot(self.y[shown],
+                 quantiles[shown],
                  'ro')
         ax2.legend(loc=1)
     
@@ -0,0 +1,367 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import connection
+import collections
+import multiprocessing
+import os
+import threading
+import time
+
+EXECUTOR_KINDS = ("serial", "thread", "process")
+
+# Extra seconds a task may run past its budget before its process is killed
+# (tasks are expected to stop by themselves at their budget, see
+# gamutlibs.distributions._CountingOptimizer)
+KILL_GRACE = 1.0
+
+# Seconds a worker may take to receive a task (start up and import the task's
+# modules) before the task's budget starts and it is counted as running
+STARTUP_GRACE = 60.0
+
+# Connection of the task running in this (worker) process, if any
+_worker_conn = None
+
+
+class TimeBudgetExceeded(Exception):
+    """
+    Raised (through the Future) for a task killed for exceeding its budget
+
+    'partial' holds the progress reported by the task before it was killed
+    (see report_progress), or None.
+    """
+
+    def __init__(self, budget, seconds, partial=None):
+        super().__init__("time budget of %g s exceeded after %.1f s"
+                         % (budget, seconds))
+        self.budget  = budget
+        self.seconds = seconds
+        self.partial = partial
+
+
+def report_progress(**values):
+    """
+    Report partial results of the running task to an IsolatedExecutor
+
+    The values reported by a task are merged into one dict, which is passed
+    on if the task is killed (see TimeBudgetExceeded).  Elsewhere this does
+    nothing.
+    """
+    if _worker_conn is not None:
+        _worker_conn.send(("progress", values))
+
+
+def submit_with_budget(executor, budget, fn, *args, **kwargs):
+    """
+    Submit fn(*args, **kwargs) to executor with a wall-clock budget (seconds)
+
+    The budget is enforced (by killing the task) only by an IsolatedExecutor;
+    other executors run the task to completion.  None means no budget.
+    """
+    if budget is not None and hasattr(executor, "submit_with_budget"):
+        return executor.submit_with_budget(budget, fn, *args, **kwargs)
+    return executor.submit(fn, *args, **kwargs)
+
+
+class SerialExecutor:
+    """
+    Execute work immediately on the calling thread.
+
+    SerialExecutor mirrors the portion of the concurrent.futures.Executor
+    interface used by gamut (submit, map, shutdown), so that it can be swapped
+    for a thread or process pool without changing the calling code.
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) now; return a completed Future
+        """
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def map(self, fn, *iterables):
+        """
+        Return the results of fn applied over iterables, in order
+        """
+        return [fn(*args) for args in zip(*iterables)]
+
+    def shutdown(self, wait=True):
+        """
+        Nothing to release for the serial executor
+        """
+        pass
+
+
+def _isolated_worker(conn):
+    """
+    Run the tasks received on conn, one at a time, sending back each outcome
+    """
+    global _worker_conn
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        fn, args, kwargs = task
+        # The budget of the task starts now, after any imports of unpickling
+        conn.send(("started", None))
+        _worker_conn = conn
+        try:
+            outcome = ("result", fn(*args, **kwargs))
+        except BaseException as exc:
+            outcome = ("exception", exc)
+        _worker_conn = None
+        try:
+            conn.send(outcome)
+        except Exception as exc:
+            conn.send(("exception", RuntimeError("Result could not be sent "
+                                                 "(%s)" % exc)))
+
+
+class _Worker:
+    """
+    A worker process of an IsolatedExecutor, and the task it is running
+    """
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_isolated_worker,
+                                       args=(child_conn,),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.future     = None
+        self.budget     = None
+        self.dispatched = None
+        self.started    = None
+        self.partial    = None
+
+    def start_task(self, future, budget, task):
+        self.future     = future
+        self.budget     = budget
+        self.dispatched = time.monotonic()
+        self.started    = None
+        self.partial    = None
+        self.conn.send(task)
+
+    def begin_task(self):
+        """
+        Start the budget of the task (the worker has begun running it)
+        """
+        self.started = time.monotonic()
+
+    def get_elapsed(self):
+        """
+        Return the seconds the task has run (since dispatch, if not begun)
+        """
+        return time.monotonic() - (self.started or self.dispatched)
+
+    def end_task(self):
+        future, self.future = self.future, None
+        return future
+
+    def get_deadline(self):
+        """
+        Return the monotonic time at which the task is killed (None: never)
+
+        The budget runs from the time the worker begins the task, so that it
+        excludes the start-up of a new worker process; a worker that has not
+        begun the task within STARTUP_GRACE is killed too.
+        """
+        if self.future is None or self.budget is None:
+            return None
+        if self.started is None:
+            return self.dispatched + STARTUP_GRACE + self.budget + KILL_GRACE
+        return self.started + self.budget + KILL_GRACE
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class IsolatedExecutor:
+    """
+    Run work in a pool of worker processes that can be killed per task.
+
+    Unlike concurrent.futures.ProcessPoolExecutor, a task submitted with a
+    time budget (submit_with_budget) that runs past it (plus KILL_GRACE) has
+    its worker process killed and replaced; its Future then raises
+    TimeBudgetExceeded with the partial results the task reported.  Worker
+    processes are started with 'spawn' and reused between tasks; the budget
+    of a task starts when its worker begins it (see _Worker.get_deadline).
+    """
+
+    def __init__(self, max_workers=None, budget=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.budget      = budget
+        self._context    = multiprocessing.get_context("spawn")
+        self._pending    = collections.deque()
+        self._workers    = list()
+        self._lock       = threading.Lock()
+        self._wakeup_r, self._wakeup_w = self._context.Pipe(duplex=False)
+        self._shutdown   = False
+        self._manager    = None
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Schedule fn(*args, **kwargs) with the default budget; return a Future
+        """
+        return self.submit_with_budget(self.budget, fn, *args, **kwargs)
+
+    def submit_with_budget(self, budget, fn, *args, **kwargs):
+        """
+        Schedule fn(*args, **kwargs) with a budget in seconds (None: none)
+        """
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new work after shutdown")
+            self._pending.append((future, budget, (fn, args, kwargs)))
+            if self._manager is None:
+                self._manager = threading.Thread(target=self._manage,
+                                                 daemon=True)
+                self._manager.start()
+        self._wakeup_w.send_bytes(b"")
+        return future
+
+    def map(self, fn, *iterables):
+        """
+        Return the results of fn applied over iterables, in order
+        """
+        futures = [self.submit(fn, *args) for args in zip(*iterables)]
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """
+        Stop the workers once the submitted work is done
+
+        With cancel_futures, work not yet started is cancelled.
+        """
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                for future, _, _ in self._pending:
+                    future.cancel()
+                self._pending.clear()
+            manager = self._manager
+        self._wakeup_w.send_bytes(b"")
+        if wait and manager is not None:
+            manager.join()
+
+    def _start_tasks(self):
+        """
+        Hand pending work to idle workers, starting workers as needed
+        """
+        with self._lock:
+            while self._pending:
+                idle = [worker for worker in self._workers
+                        if worker.future is None]
+                if not idle and len(self._workers) >= self.max_workers:
+                    break
+                future, budget, task = self._pending.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if idle:
+                    worker = idle[0]
+                else:
+                    worker = _Worker(self._context)
+                    self._workers.append(worker)
+                worker.start_task(future, budget, task)
+            return self._shutdown and not self._pending and \
+                all(worker.future is None for worker in self._workers)
+
+    def _manage(self):
+        """
+        Dispatch work, collect outcomes and enforce budgets (manager thread)
+        """
+        while True:
+            if self._start_tasks():
+                break
+            deadlines = [worker.get_deadline() for worker in self._workers]
+            deadlines = [deadline for deadline in deadlines
+                         if deadline is not None]
+            timeout = max(min(deadlines) - time.monotonic(), 0.0) \
+                if deadlines else None
+            busy = [worker for worker in self._workers
+                    if worker.future is not None]
+            ready = connection.wait([self._wakeup_r]
+                         + [worker.conn for worker in busy]
+                         + [worker.process.sentinel for worker in busy],
+                         timeout)
+            if self._wakeup_r in ready:
+                while self._wakeup_r.poll():
+                    self._wakeup_r.recv_bytes()
+            for worker in busy:
+                self._collect(worker, ready)
+
+        for worker in self._workers:
+            worker.conn.send(None)
+            worker.process.join()
+        self._workers = list()
+
+    def _collect(self, worker, ready):
+        """
+        Handle messages, crashes and time-outs of a busy worker
+        """
+        try:
+            while worker.future is not None and worker.conn.poll():
+                kind, value = worker.conn.recv()
+                if kind == "started":
+                    worker.begin_task()
+                elif kind == "progress":
+                    worker.partial = dict(worker.partial or {}, **value)
+                elif kind == "result":
+                    worker.end_task().set_result(value)
+                else:
+                    worker.end_task().set_exception(value)
+        except (EOFError, OSError):
+            pass
+        if worker.future is None:
+            return
+
+        deadline = worker.get_deadline()
+        if worker.process.sentinel in ready or not worker.process.is_alive():
+            error = RuntimeError("worker process terminated abruptly "
+                                 "(exit code %s)" % worker.process.exitcode)
+        elif deadline is not None and time.monotonic() >= deadline:
+            error = TimeBudgetExceeded(worker.budget,
+                                       worker.get_elapsed(),
+                                       worker.partial)
+        else:
+            return
+        # Replace the worker; its process may be stuck in compiled code
+        worker.kill()
+        self._workers.remove(worker)
+        worker.end_task().set_exception(error)
+
+
+def make_executor(kind="serial", max_workers=None):
+    """
+    Return an executor of the requested kind ('serial', 'thread', 'process').
+
+    max_workers is the number of worker threads/processes (Default = None,
+    which picks based on the number of cores).  Process pools are
+    IsolatedExecutors, so that runaway tasks can be killed; their workers are
+    started with the 'spawn' method so that they do not inherit the state of
+    the Qt event loop.
+    """
+    if kind == "serial":
+        return SerialExecutor()
+    elif kind == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers)
+    elif kind == "process":
+        return IsolatedExecutor(max_workers=max_workers)
+    raise ValueError("Unknown executor kind '%s'; expected one of %s"
+                     % (kind, ", ".join(EXECUTOR_KINDS)))
@@ -0,0 +1,133 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+from collections import OrderedDict
+import threading
+import shelve
+import scipy
+
+
+class FitResultCache:
+    """
+    Content-addressed cache of probability plot and MLE fit results.
+
+    Results are keyed by the fingerprint of the sample array, the SciPy label
+    of the distribution, its shape factors, the outlier significance level and
+    the installed SciPy version (see 'make_key').  The most recently used
+    'max_entries' results are held in memory; older entries are evicted in
+    least-recently-used order.
+
+    If 'path' is given (opt-in), every result is also written to an on-disk
+    shelve at that location, so that results survive restarts.  Entries
+    evicted from memory are reloaded from disk on their next use; the shelve
+    itself is not size-limited (delete its files to empty it).
+
+    Usage:
+
+    cache = FitResultCache(max_entries=1024, path=None)
+    key = cache.make_key(fingerprint, label, shapes, significance_level)
+    result = cache.get(key)      # None on a miss
+    cache.put(key, result)
+    cache.get_stats()            # hits, misses, entries, hit rate
+    """
+
+    def __init__(self,
+                 max_entries=1024,
+                 path=None):
+
+        self.max_entries = max_entries
+        self.path        = path
+        self.hits        = 0
+        self.misses      = 0
+        self._entries    = OrderedDict()
+        self._lock       = threading.Lock()
+        self._store      = None
+        if path is not None:
+            self._store = shelve.open(path)
+
+    @staticmethod
+    def make_key(fingerprint,
+                 label,
+                 shapes,
+                 significance_level=None):
+        """
+        Return the cache key for a fit of 'label' to the fingerprinted samples
+        """
+        shapes = tuple(float(shape) for shape in shapes)
+        return "|".join([fingerprint,
+                         label,
+                         repr(shapes),
+                         repr(significance_level),
+                         scipy.__version__])
+
+    def get(self, key):
+        """
+        Return the cached result for key (None if absent), updating counters
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            if self._store is not None and key in self._store:
+                result = self._store[key]
+                self._insert(key, result)
+                self.hits += 1
+                return result
+            self.misses += 1
+            return None
+
+    def put(self, key, result):
+        """
+        Store result (a dict of plain Python values) under key
+        """
+        with self._lock:
+            self._insert(key, result)
+            if self._store is not None:
+                self._store[key] = result
+                self._store.sync()
+
+    def _insert(self, key, result):
+        """
+        Insert into the in-memory LRU, evicting the oldest entries if full
+        """
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_stats(self):
+        """
+        Return the hit/miss counters and size of the cache as a dict
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits"     : self.hits,
+                    "misses"   : self.misses,
+                    "entries"  : len(self._entries),
+                    "hit_rate" : self.hits / lookups if lookups else 0.0}
+
+    def clear(self):
+        """
+        Empty the in-memory cache and reset the counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        """
+        Close the on-disk store, if any
+        """
+        with self._lock:
+            if self._store is not None:
+                self._store.close()
+                self._store = None
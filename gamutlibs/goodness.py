@@ -0,0 +1,98 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+import numpy as np
+from gamutlibs.registry import rv_handle
+
+# Goodness-of-fit statistics of each MLE fit, in the order displayed
+GOF_FIELDS = ("ks", "ad", "cvm", "loglik", "aic", "bic")
+
+# CDF values are clipped to [CDF_CLIP, 1 - CDF_CLIP] in the Anderson-Darling
+# statistic, whose logarithms diverge at 0 and 1
+CDF_CLIP = 1.0e-300
+
+
+def edf_statistics(cdf_values):
+    """
+    Return (KS D, Anderson-Darling A^2, Cramer-von Mises W^2)
+
+    cdf_values are the fitted CDF at the sorted samples (ascending), so that
+    all three statistics follow from the one array without re-sorting.
+    """
+    u = np.asarray(cdf_values, dtype=np.float64)
+    n = len(u)
+    # (2i - 1)/2n at the ranks i = 1..n; i/n and (i - 1)/n are 1/2n off it
+    mid = (np.arange(n, dtype=np.float64) + 0.5) / n
+    deviation = u - mid
+    ks = 0.5 / n + np.max(np.abs(deviation))
+    cvm = 1.0 / (12.0 * n) + np.dot(deviation, deviation)
+    u = np.clip(u, CDF_CLIP, 1.0 - np.finfo(np.float64).epsneg)
+    log_terms = np.log(u)
+    log_terms += np.log1p(-u[::-1])
+    ad = -n - 2.0 * np.dot(mid, log_terms)
+    return float(ks), float(ad), float(cvm)
+
+
+def information_criteria(loglik, param_count, n):
+    """
+    Return (AIC, BIC) of a fit with log-likelihood loglik to n samples
+    """
+    aic = 2.0 * param_count - 2.0 * loglik
+    bic = param_count * np.log(n) - 2.0 * loglik
+    return float(aic), float(bic)
+
+
+def cdf_and_loglik(label, fit_params, sorted_samples):
+    """
+    Return (CDF at the sorted samples, log-likelihood) of a distribution
+
+    The samples are standardized once and passed to the distribution's
+    _cdf/_logpdf directly: the support of sorted samples is a contiguous
+    slice, so SciPy's per-element argument and support masking (which
+    dominates the cost of cheap distributions) is not needed.
+    """
+    handle = rv_handle(label)
+    shapes, loc, scale = fit_params[:-2], fit_params[-2], fit_params[-1]
+    if not (scale > 0 and np.all(handle._argcheck(*shapes))):
+        return np.full(len(sorted_samples), np.nan), np.nan
+    z = (np.asarray(sorted_samples, dtype=np.float64) - loc) / scale
+    lower, upper = handle.support(*shapes)
+    # CDF: 0 below the open support, 1 above it
+    first = np.searchsorted(z, lower, side="right")
+    last = np.searchsorted(z, upper, side="left")
+    cdf_values = np.zeros(len(z))
+    cdf_values[last:] = 1.0
+    cdf_values[first:last] = handle._cdf(z[first:last], *shapes)
+    # Log-PDF: -inf outside the closed support
+    if z[0] < lower or z[-1] > upper:
+        return cdf_values, -np.inf
+    loglik = np.sum(handle._logpdf(z, *shapes)) - len(z) * np.log(scale)
+    return cdf_values, float(loglik)
+
+
+def goodness_of_fit(label, fit_params, sorted_samples):
+    """
+    Return a dict of the GOF_FIELDS of an MLE fit to the sorted samples
+
+    fit_params are (shapes..., loc, scale), all counted as estimated.  The
+    CDF and the log-PDF are each evaluated once, vectorized over the
+    samples (see cdf_and_loglik), which costs far less than the fit itself.
+    """
+    with np.errstate(all="ignore"):
+        cdf_values, loglik = cdf_and_loglik(label,
+                                            fit_params,
+                                            sorted_samples)
+        ks, ad, cvm = edf_statistics(cdf_values)
+    if np.isnan(loglik):
+        loglik = -np.inf
+    aic, bic = information_criteria(loglik,
+                                    len(fit_params),
+                                    len(sorted_samples))
+    return dict(zip(GOF_FIELDS, (ks, ad, cvm, loglik, aic, bic)))
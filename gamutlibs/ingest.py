@@ -0,0 +1,109 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+import os
+import time
+import io
+import numpy as np
+
+# Extensions of raw binary files, read as native float64 values
+RAW_EXTENSIONS = (".bin", ".raw", ".f64")
+
+FILE_FILTER = "Sample Files (*.csv *.npy *.bin *.raw *.f64);;" \
+              "Comma-Separated Values (*.csv);;" \
+              "NumPy Arrays (*.npy);;" \
+              "Raw float64 Binary (*.bin *.raw *.f64)"
+
+
+def load_samples(fpath, chunk_bytes=1 << 24):
+    """
+    Load samples from fpath as a flat, read-only float64 array.
+
+    Returns (samples, report), where report is a dict with the format, the
+    number of samples and bytes, the elapsed seconds and the throughput.
+
+    - *.npy files are memory-mapped (zero-copy, when the data are float64)
+    - *.bin, *.raw, *.f64 files are memory-mapped as native float64 values
+    - anything else is parsed as comma-separated values, 'chunk_bytes' at a
+      time, into a preallocated float64 buffer.  Samples can be listed on one
+      or more rows and in one or more columns; all values are flattened.
+    """
+    start = time.perf_counter()
+    extension = os.path.splitext(fpath)[1].lower()
+    if extension == ".npy":
+        samples = np.load(fpath, mmap_mode="r")
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1)
+        file_format = "npy"
+    elif extension in RAW_EXTENSIONS:
+        samples = np.memmap(fpath, dtype=np.float64, mode="r")
+        file_format = "raw"
+    else:
+        samples = _parse_csv(fpath, chunk_bytes)
+        file_format = "csv"
+    if samples.size == 0:
+        raise ValueError("No samples found in %s" % fpath)
+    samples.flags.writeable = False
+
+    seconds = time.perf_counter() - start
+    nbytes = os.path.getsize(fpath)
+    report = {"format"         : file_format,
+              "samples"        : int(samples.size),
+              "bytes"          : nbytes,
+              "seconds"        : seconds,
+              "MB_per_s"       : nbytes / 1.0e6 / seconds if seconds else 0.0,
+              "samples_per_s"  : samples.size / seconds if seconds else 0.0}
+    return samples, report
+
+
+def _parse_csv(fpath, chunk_bytes):
+    """
+    Parse a CSV of numbers chunk-wise into a preallocated float64 buffer
+    """
+    nbytes = os.path.getsize(fpath)
+    buffer = None
+    count = 0
+    remainder = b""
+    with open(fpath, "rb") as f:
+        eof = False
+        while not eof:
+            chunk = remainder + f.read(chunk_bytes)
+            eof = len(chunk) == len(remainder)
+            if not eof:
+                # hold back the (possibly) incomplete last line
+                cut = chunk.rfind(b"\n") + 1
+                chunk, remainder = chunk[:cut], chunk[cut:]
+            values = _parse_chunk(chunk)
+            if values.size == 0:
+                continue
+
+            if buffer is None:
+                # Estimate the total number of samples from the first chunk
+                estimate = int(values.size * nbytes / len(chunk) * 1.05) + 1
+                buffer = np.empty(max(estimate, values.size), np.float64)
+            if count + values.size > buffer.size:
+                buffer.resize((2 * (count + values.size),), refcheck=False)
+            buffer[count:count + values.size] = values
+            count += values.size
+    if buffer is None:
+        return np.empty(0, np.float64)
+    buffer.resize((count,), refcheck=False)
+    return buffer
+
+
+def _parse_chunk(chunk):
+    """
+    Return the values of a block of complete CSV lines as a float64 array
+    """
+    if not chunk.strip():
+        return np.empty(0, np.float64)
+    return np.loadtxt(io.BytesIO(chunk),
+                      delimiter=",",
+                      dtype=np.float64,
+                      ndmin=2).reshape(-1)
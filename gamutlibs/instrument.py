@@ -0,0 +1,199 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+import collections
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+# Number of most recent stage entries kept in the log
+MAX_LOG = 1000
+
+# Completed stage entries of this process, oldest first
+_log = collections.deque(maxlen=MAX_LOG)
+
+# Open stages of each thread (innermost last)
+_local = threading.local()
+
+# Called as hook(entry, pstats.Stats) after each outermost stage, if set
+_profile_hook = None
+
+
+def track_memory(enabled=True):
+    """
+    Turn recording of peak memory (with tracemalloc) on or off
+
+    Tracing allocations slows down Python-heavy code, so it is off unless
+    requested.  Peaks are approximate while several threads run stages.
+    """
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_tracking_memory():
+    return tracemalloc.is_tracing()
+
+
+def set_profile_hook(hook=None):
+    """
+    Profile every outermost stage with cProfile, passing the results to hook
+
+    hook(entry, stats) receives the stage entry and a pstats.Stats object;
+    None turns profiling off.
+    """
+    global _profile_hook
+    _profile_hook = hook
+
+
+def get_profile_hook():
+    return _profile_hook
+
+
+def get_settings():
+    """
+    Return the instrumentation settings, to be applied in worker processes
+    """
+    return {"memory"       : is_tracking_memory(),
+            "profile_hook" : _profile_hook}
+
+
+def apply_settings(settings):
+    """
+    Apply settings returned by get_settings (in this process)
+    """
+    if settings is None:
+        return
+    track_memory(settings["memory"])
+    set_profile_hook(settings["profile_hook"])
+
+
+class ProfileDumper:
+    """
+    Profile hook writing the stats of each stage to a .prof file in directory
+
+    The files can be read with pstats or e.g. snakeviz.  Instances can be
+    pickled, so that stages run in worker processes are profiled as well.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def __call__(self, entry, stats):
+        name = "%s-%s-%d-%d.prof" % (entry["stage"],
+                                     entry.get("label", "gamut"),
+                                     os.getpid(),
+                                     int(entry["started"] * 1.0e6))
+        stats.dump_stats(os.path.join(self.directory, name))
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = list()
+    return stack
+
+
+@contextlib.contextmanager
+def stage(name, record=None, **info):
+    """
+    Instrument the enclosed block as stage 'name'.
+
+    Yields the stage entry, a dict with the 'stage' name, 'info' items and,
+    on exit, the wall-clock 'seconds' and the 'peak_MB' of memory allocated
+    above the level at entry (None unless track_memory is on).  The block
+    may add items of its own (e.g. 'evaluations').  The entry is appended to
+    the log and, if given, stored as record[name].
+    """
+    entry = dict(info)
+    entry["stage"] = name
+    entry["started"] = time.time()
+    entry["seconds"] = None
+    entry["peak_MB"] = None
+    stack = _stack()
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+    frame = {"base": current if tracing else 0, "peak": 0}
+    stack.append(frame)
+
+    profiler = None
+    if _profile_hook is not None and len(stack) == 1:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield entry
+    finally:
+        entry["seconds"] = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+        stack.pop()
+        if tracing and tracemalloc.is_tracing():
+            peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            entry["peak_MB"] = (peak - frame["base"]) / 1.0e6
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+        _log.append(entry)
+        if record is not None:
+            record[name] = entry
+        if profiler is not None:
+            _profile_hook(entry, pstats.Stats(profiler))
+
+
+def get_log():
+    """
+    Return the completed stage entries of this process, oldest first
+    """
+    return list(_log)
+
+
+def clear_log():
+    _log.clear()
+
+
+def format_timings(timings):
+    """
+    Return a one-line summary of a dict of stage entries (e.g. of a fit)
+    """
+    parts = list()
+    for name, entry in timings.items():
+        text = "%s %.3f s" % (name, entry["seconds"])
+        if entry.get("evaluations") is not None:
+            text += " / %d evals" % entry["evaluations"]
+        if entry.get("peak_MB") is not None:
+            text += " / %.1f MB" % entry["peak_MB"]
+        parts.append(text)
+    return ", ".join(parts)
+
+
+def export_json(fpath, distributions=None):
+    """
+    Write the stage log and (optionally) per-distribution timings to fpath
+
+    distributions is a list of dicts, e.g. {'label', 'shapes', 'timings'}.
+    """
+    with open(fpath, "w") as f:
+        json.dump({"created"       : time.strftime("%Y-%m-%dT%H:%M:%S"),
+                   "log"           : get_log(),
+                   "distributions" : distributions or list()},
+                  f,
+                  indent=1,
+                  default=str)
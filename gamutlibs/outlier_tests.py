@@ -9,8 +9,33 @@
 ###############################################################################
 
 
-from scipy.stats import t
+import contextlib
+import scipy.stats
 import numpy as np
+try:
+    from gamutlibs.instrument import stage
+except ImportError:
+    # Run as a script (the NIST check below): the test is not timed
+    @contextlib.contextmanager
+    def stage(name, record=None, **info):
+        yield dict(info)
+
+# Bound r on the number of outliers tested in large sample sets (see
+# bounded_max_outliers): a fraction of N, at least 10 and at most the cap
+MAX_OUTLIER_FRACTION = 0.01
+MAX_OUTLIER_CAP      = 1000
+
+
+def bounded_max_outliers(n):
+    """
+    Return a bound r on the number of outliers to test among n samples
+
+    Testing every reduced sample set (r = N-3) costs O(N) steps, and near
+    the end of the path a few remaining samples can exceed their critical
+    values by chance, flagging nearly the whole data set.
+    """
+    return int(min(max(10, MAX_OUTLIER_FRACTION * n), MAX_OUTLIER_CAP))
+
 
 class GeneralizedExtremeStudentizedDeviate:
     """
@@ -19,8 +44,14 @@ class GeneralizedExtremeStudentizedDeviate:
     Usage:
         genESD_object = \
             GeneralizedExtremeStudentizedDeviate(data,
-                                                 significance_level=0.05)
-        data_no_outliers = genESD_object.get_remaining_samples()
+                                                 significance_level=0.05,
+                                                 max_outliers=None)
+        data_no_outliers = genESD_object.get_remainders()
+
+        # Re-evaluate at other significance levels without recomputing the
+        # test statistics
+        counts = genESD_object.count_outliers([0.01, 0.05, 0.10])
+        genESD_object.set_significance_level(0.10)
         
     The generalized extreme Studentized deviate is essentially the Grubbs test,
     or maximum normed residual test, applied sequentially.  This object accepts
@@ -28,7 +59,13 @@ class GeneralizedExtremeStudentizedDeviate:
     It iteratively removes outliers and computes the test statistics and 
     critical values of the reduced sample set; this continues until the test
     statistics fall below the critcal value of the t distribution for that 
-    sample size.
+    sample size.  At most 'max_outliers' (Rosner's upper bound r) samples are
+    tested; for large sample sets, specifying r bounds the work done.
+
+    The test statistics and the order in which samples are removed do not
+    depend on the significance level, so they are computed once, on
+    instantiation; only the critical values are computed per significance
+    level.
     
     The Generalized ESD test detects for outliers of a univariate data set that
     follows an approximately normal distribution.
@@ -48,19 +85,56 @@ class GeneralizedExtremeStudentizedDeviate:
     
     def __init__(self,
                  samples,
-                 significance_level=0.05):
-        
-        # Initialize
-        self.outliers = list()
+                 significance_level=0.05,
+                 max_outliers=None):
         
         # Set inputs as attributes
-        self.samples = np.sort(samples)
-        self.N = np.size(samples)
+        self.samples = np.sort(np.asarray(samples, dtype=np.float64),
+                               axis=None)
+        self.N = np.size(self.samples)
         self.significance_level= significance_level
+
+        # Rosner's upper bound, r, on the number of outliers (Default: N-3,
+        # i.e. test every reduced sample set with 3 or more samples)
+        if max_outliers is None:
+            max_outliers = self.N - 3
+        self.max_outliers = int(max(min(max_outliers, self.N - 3), 0))
+
+        # Critical values lambda_1 ... lambda_r of each significance level
+        self.critical_values = dict()
         
-        # Get to business
+        # Get to business: compute the statistic path once, then evaluate it
+        with stage("esd",
+                   samples=self.N,
+                   max_outliers=self.max_outliers) as entry:
+            self.removed, self.max_norm_residuals = \
+                self._compute_all_test_statistics()
+            self._compute_outliers()
+            entry["evaluations"] = self.max_outliers
+
+    def set_significance_level(self, significance_level):
+        """
+        Re-evaluate the outliers at a new significance level
+        """
+        self.significance_level = significance_level
         self._compute_outliers()
 
+    def count_outliers(self, significance_levels):
+        """
+        Return the number of outliers for each of several significance levels
+
+        The critical values of each level are computed once, and cached.
+        """
+        levels = np.atleast_1d(np.asarray(significance_levels, dtype=float))
+        if self.max_outliers == 0:
+            # no reduced sample set to test (r = 0, or N <= 3)
+            return np.zeros(len(levels), dtype=int)
+        exceeds = self.max_norm_residuals \
+            > np.array([self._get_critical_values(level) for level in levels])
+        # index of the last exceedance (+1) along each row, 0 if none
+        last = exceeds.shape[1] - np.argmax(exceeds[:, ::-1], axis=1)
+        return np.where(exceeds.any(axis=1), last, 0)
+
     def _compute_outliers(self):
         """
         Remove outliers according to the Generalized extreme Studentized
@@ -71,63 +145,84 @@ class GeneralizedExtremeStudentizedDeviate:
         http://www.itl.nist.gov/div898/handbook/eda/section3/eda35h3.htm
         """
 
-        # maximum normed residuals (MNR) statistic (for descreasing data set)
-        max_norm_residuals = np.zeros(self.N)
-        
-        # True table for (MNR > critical value), initialized
-        statistic_exceeds_crit = np.zeros(self.N, dtype=int)
-        
-        # maximum normed residuals (for descreasing data set)
-        max_norm_residuals = np.zeros(self.N)
-
-        for ii, ((sample, R), lamb) \
-            in enumerate(zip(self._compute_all_test_statistics(),
-                             self._compute_critical_values())):
-            max_norm_residuals[ii] = sample
-            if R > lamb:
-                statistic_exceeds_crit[ii] = 1
-        self.num_outliers = np.nonzero(statistic_exceeds_crit)[0][-1] + 1
-        self.outliers = max_norm_residuals[:self.num_outliers]
-        mask = [1 if sample in self.outliers else 0 for sample in self.samples]
-        self.remainders = np.delete(self.samples,np.nonzero(mask)[0])
+        # The number of outliers is the largest i for which R_i > lambda_i
+        self.num_outliers = \
+            int(self.count_outliers(self.significance_level)[0])
+
+        # Remove the outliers by index (duplicates of an outlier value that
+        # were not themselves flagged are kept)
+        removed = self.removed[:self.num_outliers]
+        self.outliers = self.samples[removed]
+        mask = np.ones(self.N, dtype=bool)
+        mask[removed] = False
+        self.remainders = self.samples[mask]
         
     def _compute_all_test_statistics(self):
         """
-        Yield the maximum normed residuals for samples as outliers are removed
+        Return the indices removed and maximum normed residuals at each step
+
+        Running sums of the samples and their squares make the mean and
+        standard deviation of each reduced sample set O(1).  The sums are
+        taken about the mean of the current sample set, and are recomputed
+        exactly each time the set halves, to avoid loss of precision.
         """
+        r = self.max_outliers
+        removed = np.zeros(r, dtype=np.intp)
+        max_norm_residuals = np.zeros(r)
+
         samples = self.samples
-        n = self.N
-        while n > 1:
-            mean = np.mean(samples)
-            std = np.std(samples, ddof=1)
-            nr_minval = np.abs(samples[0]-mean)/std
-            nr_maxval = np.abs(samples[-1]-mean)/std
+        lo, hi = 0, self.N - 1
+        refresh_at = self.N
+        for ii in range(r):
+            n = hi - lo + 1
+            if n <= refresh_at:
+                window = samples[lo:hi + 1]
+                shift = float(np.mean(window))
+                s1 = float(np.sum(window - shift))
+                s2 = float(np.sum((window - shift)**2.0))
+                refresh_at = n // 2
+            mean = s1 / n
+            std = np.sqrt(max(s2 - s1 * mean, 0.0) / (n - 1.0))
+            xmin = float(samples[lo]) - shift
+            xmax = float(samples[hi]) - shift
+            if std > 0.0:
+                nr_minval = abs(xmin - mean) / std
+                nr_maxval = abs(xmax - mean) / std
+            else:
+                nr_minval = nr_maxval = 0.0
             if nr_minval > nr_maxval:
-                yield samples[0], nr_minval
-                samples = samples[1:]
+                removed[ii], max_norm_residuals[ii] = lo, nr_minval
+                s1, s2 = s1 - xmin, s2 - xmin**2.0
+                lo += 1
             else:
-                yield samples[-1], nr_maxval
-                samples = samples[:-1]
-            n -= 1
+                removed[ii], max_norm_residuals[ii] = hi, nr_maxval
+                s1, s2 = s1 - xmax, s2 - xmax**2.0
+                hi -= 1
+        return removed, max_norm_residuals
 
-    def _compute_critical_values(self):
+    def _get_critical_values(self, significance_level):
         """
-        Yield the critical t-values based on samples sizes N to 1. 
+        Return the (cached) critical values of a significance level
+        """
+        significance_level = float(significance_level)
+        if significance_level not in self.critical_values:
+            self.critical_values[significance_level] = \
+                self._compute_critical_values(significance_level)
+        return self.critical_values[significance_level]
+
+    def _compute_critical_values(self, significance_level):
+        """
+        Return the critical values lambda_i, for i = 1 ... r, in one pass
+
+        significance_level may also be an array (e.g. a column), in which
+        case the critical values are broadcast against it.
         """
-        
         N = self.N
-        i = 1
-        while N-2 > i:
-            q = 1.0 - self.significance_level/(2.0*(N-i+1))  # quantile
-            v = N - i - 1
-            tval = t.ppf(q, df=v)
-            
-            # Critical Value
-            lamb = (N-i) * tval / np.sqrt((N-i-1.0 + tval**2.0)*(N-i+1.0))
-            yield lamb
-            
-            # Update for next iteration
-            i += 1
+        i = np.arange(1, self.max_outliers + 1)
+        q = 1.0 - significance_level/(2.0*(N-i+1))  # quantile
+        v = N - i - 1
+        tval = scipy.stats.t.ppf(q, df=v)
+        return (N-i) * tval / np.sqrt((N-i-1.0 + tval**2.0)*(N-i+1.0))
             
 
     def get_num_outliers(self):
@@ -168,3 +263,9 @@ if __name__ == "__main__":
     print(test.get_remainders())                        # -0.25 ... 4.64                       
     print(len(test.remainders))                         # 51
     print(len(data))                                    # 54
+    test = GeneralizedExtremeStudentizedDeviate(data, max_outliers=0)
+    print(test.count_outliers([0.01, 0.05]))            # [0 0]
+    print(len(test.get_remainders()))                   # 54
+    test = GeneralizedExtremeStudentizedDeviate(data[:3])
+    print(test.get_num_outliers())                      # 0
+    print(test.count_outliers(0.05))                    # [0]
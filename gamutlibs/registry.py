@@ -0,0 +1,322 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+import json
+import os
+import sys
+import time
+import warnings
+from importlib import metadata
+import numpy as np
+
+# Version of the registry file layout
+REGISTRY_FORMAT = 2
+
+DEFAULT_REGISTRY_PATH = os.path.join(os.path.expanduser("~"),
+                                     ".gamut_registry.json")
+
+# Number of ppf/log-likelihood points used to measure the cost of a family
+COST_POINTS = 32
+
+# rv_continuous objects, by label (see rv_handle)
+_handles = dict()
+
+
+def installed_scipy_version():
+    """
+    Return the version of the installed SciPy, without importing scipy.stats
+    """
+    return metadata.version("scipy")
+
+
+def rv_handle(label):
+    """
+    Return the scipy.stats rv_continuous object of 'label' (cached)
+    """
+    rv = _handles.get(label)
+    if rv is None:
+        import scipy.stats
+        rv = _handles[label] = getattr(scipy.stats, label)
+    return rv
+
+
+def freeze(label, fit_params):
+    """
+    Return the frozen distribution of 'label' at (shapes..., loc, scale)
+    """
+    return rv_handle(label)(*fit_params[:-2],
+                            loc=fit_params[-2],
+                            scale=fit_params[-1])
+
+
+def shape_brackets(rv):
+    """
+    Return finite (lower, upper) search brackets for each shape of rv
+
+    Brackets are derived from the domain of each shape parameter; open
+    bounds are moved inside the domain and infinite bounds are replaced by
+    finite defaults.
+    """
+    brackets = list()
+    for info in rv._shape_info():
+        lower, upper = (float(value) for value in info.domain)
+        lower_inclusive, upper_inclusive = info.inclusive
+        if np.isfinite(lower) and not lower_inclusive:
+            lower = lower + 1.0e-2
+        if np.isfinite(upper) and not upper_inclusive:
+            upper = upper - 1.0e-2
+        if not (np.isfinite(lower) or np.isfinite(upper)):
+            lower, upper = -5.0, 5.0
+        elif not np.isfinite(lower):
+            lower = upper - 10.0
+        elif not np.isfinite(upper):
+            upper = lower + 10.0
+        brackets.append((lower, upper))
+    return brackets
+
+
+def _default_shapes(rv, brackets):
+    """
+    Return valid shape values inside the brackets of rv (None if not found)
+
+    The midpoints are tried first, then points at increasing fractions of
+    the brackets (for families constraining e.g. a < b).
+    """
+    candidates = [[0.5 * (lo + hi) for lo, hi in brackets],
+                  [lo + 0.25 * (hi - lo) for lo, hi in brackets],
+                  [lo + (0.2 + 0.6 * ii / max(len(brackets), 1)) * (hi - lo)
+                   for ii, (lo, hi) in enumerate(brackets)]]
+    for shapes in candidates:
+        if not brackets or bool(np.all(rv._argcheck(*shapes))):
+            return shapes
+    return None
+
+
+def _measure_cost(rv, shapes):
+    """
+    Return the seconds of one ppf and one log-likelihood evaluation of rv
+    """
+    p = np.linspace(0.01, 0.99, COST_POINTS)
+    start = time.perf_counter()
+    with warnings.catch_warnings(), np.errstate(all="ignore"):
+        warnings.simplefilter("ignore")
+        x = rv.ppf(p, *shapes)
+        rv.nnlf(tuple(shapes) + (0.0, 1.0), x[np.isfinite(x)])
+    return time.perf_counter() - start
+
+
+def describe(label):
+    """
+    Introspect scipy.stats.'label'; return its registry entry (a dict)
+
+    The cost is left None (see measure_costs).
+    """
+    rv = rv_handle(label)
+    brackets = shape_brackets(rv)
+    shapes = _default_shapes(rv, brackets)
+    entry = {"shape_names"    : [info.name for info in rv._shape_info()],
+             "brackets"       : brackets,
+             "default_shapes" : shapes,
+             "support"        : [float(rv.a), float(rv.b)],
+             "cost"           : None}
+    if shapes is not None:
+        try:
+            entry["support"] = [float(value) for value in rv.support(*shapes)]
+        except Exception:
+            pass
+    return entry
+
+
+def measure_costs(entries):
+    """
+    Return the cost of each entry (label -> cost relative to 'norm', or None)
+
+    Slow (a few seconds for all of scipy.stats): the cost of a family is
+    measured at its default shapes (see _measure_cost).  Module-level so that
+    it can be dispatched to a process pool.
+    """
+    costs = dict()
+    for label, entry in entries.items():
+        costs[label] = None
+        if entry["default_shapes"] is not None:
+            try:
+                costs[label] = _measure_cost(rv_handle(label),
+                                             entry["default_shapes"])
+            except Exception:
+                pass
+    reference = costs.get("norm") or 1.0e-4
+    return {label: cost / reference if cost is not None else None
+            for label, cost in costs.items()}
+
+
+def build_registry(measure=True):
+    """
+    Return the registry entries (label -> dict) of every continuous
+    distribution of the installed scipy.stats
+
+    Imports scipy.stats; unless 'measure' is False, the cost of each family
+    is measured too (slow, see measure_costs).
+    """
+    import scipy.stats
+    entries = dict()
+    for label in dir(scipy.stats):
+        rv = getattr(scipy.stats, label)
+        if isinstance(rv, scipy.stats.rv_continuous) and \
+                not label.startswith("_"):
+            entries[label] = describe(label)
+    if measure:
+        for label, cost in measure_costs(entries).items():
+            entries[label]["cost"] = cost
+    return entries
+
+
+class DistributionRegistry:
+    """
+    Registry of the continuous distributions of the installed scipy.stats.
+
+    For each distribution (by SciPy label), the registry holds the rv object
+    handle, the shape names, the support at the default shapes, default
+    shape brackets and the measured cost relative to 'norm' (one ppf plus one
+    log-likelihood evaluation), so that schedulers can start expensive
+    families first.
+
+    Usage:
+
+    registry = DistributionRegistry.load()
+    rv = registry.get_rv("gamma")
+    labels = registry.by_cost()
+    """
+
+    def __init__(self, entries, path=None):
+        self.entries = dict(entries)
+        self.path    = path
+
+    @classmethod
+    def load(cls, path=DEFAULT_REGISTRY_PATH, measure=True):
+        """
+        Return the registry read from the JSON file at 'path'.
+
+        The file records the SciPy version (and file format) it was built
+        against.  If it is missing, unreadable or out of date, the registry is
+        rebuilt with build_registry and the file rewritten (when possible).
+        With measure=False the costs are not measured (nor the file written):
+        the caller measures them later, e.g. in the background, and passes
+        them to set_costs.
+        """
+        version = installed_scipy_version()
+        try:
+            with open(path) as f:
+                contents = json.load(f)
+            if contents.get("format") == REGISTRY_FORMAT and \
+                    contents.get("scipy") == version and \
+                    contents["distributions"]:
+                return cls(contents["distributions"], path)
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+        registry = cls(build_registry(measure), path)
+        if measure:
+            registry.save()
+        return registry
+
+    def save(self):
+        """
+        Write the registry to its file (if it has one and it can be written)
+        """
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "w") as f:
+                json.dump({"format"        : REGISTRY_FORMAT,
+                           "scipy"         : installed_scipy_version(),
+                           "distributions" : self.entries},
+                          f,
+                          indent=1,
+                          sort_keys=True)
+        except OSError:
+            sys.stderr.write("Could not write distribution registry %s\n"
+                             % self.path)
+
+    def has_costs(self):
+        """
+        Return True if the costs have been measured (see measure_costs)
+        """
+        return any(entry["cost"] is not None
+                   for entry in self.entries.values())
+
+    def set_costs(self, costs):
+        """
+        Store measured costs (label -> relative cost) and save the registry
+        """
+        for label, cost in costs.items():
+            if label in self.entries:
+                self.entries[label]["cost"] = cost
+        self.save()
+
+    def get_entries(self):
+        return self.entries
+
+    def get_labels(self):
+        """
+        Return the registered SciPy labels, alphabetically
+        """
+        return sorted(self.entries)
+
+    def get_rv(self, label):
+        """
+        Return the scipy.stats rv_continuous object of 'label'
+        """
+        return rv_handle(label)
+
+    def get_shape_count(self, label):
+        return len(self.entries[label]["shape_names"])
+
+    def get_shape_counts(self):
+        """
+        Return a dict of label -> number of shape parameters
+        """
+        return {label: self.get_shape_count(label)
+                for label in self.get_labels()}
+
+    def get_shape_names(self, label):
+        return list(self.entries[label]["shape_names"])
+
+    def get_brackets(self, label):
+        return [tuple(bracket) for bracket in self.entries[label]["brackets"]]
+
+    def get_default_shapes(self, label):
+        return self.entries[label]["default_shapes"]
+
+    def get_support(self, label):
+        return tuple(self.entries[label]["support"])
+
+    def get_cost(self, label):
+        """
+        Return the relative cost of 'label' (1.0 if unknown or unmeasured)
+        """
+        entry = self.entries.get(label)
+        if entry is None or entry["cost"] is None:
+            return 1.0
+        return entry["cost"]
+
+    def by_cost(self, labels=None):
+        """
+        Return labels (default: all) sorted by decreasing cost
+        """
+        if labels is None:
+            labels = self.get_labels()
+        return sorted(labels, key=lambda label: -self.get_cost(label))
+
+    def freeze(self, label, fit_params):
+        """
+        Return the frozen distribution of 'label' at (shapes..., loc, scale)
+        """
+        return freeze(label, fit_params)
+
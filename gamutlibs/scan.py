@@ -0,0 +1,208 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+from concurrent.futures import as_completed
+import warnings
+import time
+import numpy as np
+from gamutlibs.distributions import SciPyContDist, _fit_candidate
+from gamutlibs.distributions import _CountingOptimizer
+from gamutlibs.executors import TimeBudgetExceeded, submit_with_budget
+from gamutlibs.goodness import GOF_FIELDS
+from gamutlibs.registry import rv_handle
+from gamutlibs.screening import screen_candidates
+from gamutlibs.shapeopt import maximize_ppcc
+
+RESULT_FIELDS = ["label",
+                 "r2",
+                 "r2_bound",
+                 "loc",
+                 "scale",
+                 "shapes",
+                 "shape_source",
+                 "fit_params",
+                 "fit_method",
+                 "fit_iterations",
+                 *GOF_FIELDS,
+                 "seconds",
+                 "timed_out",
+                 "error"]
+
+# Number of shape values sampled by choose_shapes before polishing the best
+SHAPE_SAMPLES = 32
+
+
+def choose_shapes(label, shape_count, engine, deadline=None):
+    """
+    Return (shapes, source, fit_params) used to prob. plot 'label'
+
+    Single-shape families use the shape maximizing the probability plot
+    correlation coefficient over engine's samples (shapeopt.maximize_ppcc);
+    families with more shape factors use the shapes of an MLE fit, returned
+    as fit_params so that it can be resumed rather than repeated (else
+    fit_params is None).  Selection stops at 'deadline' (a time.perf_counter
+    value) with the best shapes found so far; TimeoutError is raised if
+    there are none.
+    """
+    samples = engine.get_fit_samples()
+    if shape_count == 0:
+        return [], "none", None
+    if shape_count == 1:
+        try:
+            result = maximize_ppcc(engine,
+                                   label,
+                                   num_samples=SHAPE_SAMPLES,
+                                   deadline=deadline)
+            if rv_handle(label)._argcheck(*result["shapes"]):
+                return result["shapes"], "ppcc", None
+        except ValueError:
+            pass
+    optimizer = _CountingOptimizer(deadline)
+    fit_params = rv_handle(label).fit(samples, optimizer=optimizer)
+    if fit_params is None or not np.all(np.isfinite(fit_params)):
+        raise TimeoutError("no shape factors found for %s in time" % label)
+    fit_params = [float(value) for value in fit_params]
+    return fit_params[:-2], "mle", fit_params
+
+
+def scan_distribution(label, shape_count, engine, budget=None):
+    """
+    Choose shapes, prob. plot and MLE fit one distribution; return a row dict.
+
+    Failures are recorded in the 'error' field rather than raised, so that an
+    unattended scan runs through every distribution.  Shape selection and the
+    MLE fit stop at the 'budget' (seconds), keeping the best parameters found
+    so far.
+    """
+    row = dict.fromkeys(RESULT_FIELDS)
+    row["label"] = label
+    row["timed_out"] = False
+    start = time.perf_counter()
+    deadline = start + budget if budget is not None else None
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            with np.errstate(all="ignore"):
+                shapes, row["shape_source"], fit_params = \
+                    choose_shapes(label, shape_count, engine, deadline)
+                dist_obj = SciPyContDist(label, shape_count)
+                dist_obj.set_shapes(*shapes)
+                if fit_params is not None:
+                    dist_obj.set_fit_params(fit_params)
+                if budget is not None:
+                    budget = deadline - time.perf_counter()
+                dist_obj = _fit_candidate(dist_obj, engine, None, budget)
+        row.update(dist_obj.get_results())
+        row["shapes"] = list(shapes)
+        if row["timed_out"]:
+            row["error"] = "timed out"
+        elif not np.isfinite(row["r2"]):
+            row["error"] = "non-finite probability plot regression"
+    except TimeoutError:
+        row["timed_out"] = True
+        row["fit_method"] = "timed out"
+        row["error"] = "timed out"
+    except Exception as exc:
+        row["error"] = "%s: %s" % (type(exc).__name__, exc)
+    row["seconds"] = time.perf_counter() - start
+    return row
+
+
+def timed_out_row(label, exc):
+    """
+    Return the result row of a scan killed for exceeding its time budget
+    """
+    row = dict.fromkeys(RESULT_FIELDS)
+    row.update(exc.partial or {})
+    row["label"] = label
+    row["seconds"] = exc.seconds
+    row["timed_out"] = True
+    row["fit_method"] = "timed out"
+    row["error"] = "timed out"
+    return row
+
+
+def scan_all(distributions, engine, executor, budgets=None):
+    """
+    Yield result rows of scan_distribution as they complete.
+
+    distributions is a dict of SciPy label -> number of shape parameters,
+    submitted in its order (e.g. most expensive first, see
+    DistributionRegistry.by_cost); the work is spread over 'executor'.
+    budgets is a function of the label giving the time budget of its scan
+    (seconds or None), enforced by killing the scan with an IsolatedExecutor.
+    """
+    futures = dict()
+    for label, count in distributions.items():
+        budget = budgets(label) if budgets is not None else None
+        future = submit_with_budget(executor,
+                                    budget,
+                                    scan_distribution,
+                                    label,
+                                    count,
+                                    engine,
+                                    budget)
+        futures[future] = label
+    for future in as_completed(futures):
+        if isinstance(future.exception(), TimeBudgetExceeded):
+            yield timed_out_row(futures[future], future.exception())
+        else:
+            yield future.result()
+
+
+def screen_distributions(distributions, engine, executor, budgets=None,
+                         **settings):
+    """
+    Screen distributions before scanning; return (finalists, report).
+
+    distributions is a dict as for scan_all; the finalists are the subset of
+    it to scan, in the same order.  The shapes of each candidate are chosen
+    on each screening subsample (see choose_shapes and gamutlibs.screening.
+    screen_candidates, which takes the keyword 'settings').
+    """
+    labels = list(distributions)
+    report = screen_candidates(engine,
+                               [(label, distributions[label], None)
+                                for label in labels],
+                               executor,
+                               budgets,
+                               chooser=choose_shapes,
+                               **settings)
+    finalists = {labels[ii]: distributions[labels[ii]]
+                 for ii in report.get_finalists()}
+    return finalists, report
+
+
+def screened_row(decision):
+    """
+    Return the result row of a distribution excluded by screening
+    """
+    row = dict.fromkeys(RESULT_FIELDS)
+    row["label"] = decision["label"]
+    row["shapes"] = decision["shapes"]
+    row["shape_source"] = "screening"
+    row["seconds"] = 0.0
+    row["timed_out"] = decision["status"] == "timed out"
+    row["error"] = "%s in screening round %s (%s)" % (decision["status"],
+                                                      decision["round"],
+                                                      decision["reason"])
+    return row
+
+
+def rank_results(rows):
+    """
+    Return rows sorted by decreasing R^2; failed distributions last
+    """
+    def key(row):
+        r2 = row.get("r2")
+        if row.get("error") or r2 is None or not np.isfinite(r2):
+            return (1, 0.0)
+        return (0, -r2)
+    return sorted(rows, key=key)
@@ -0,0 +1,271 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+import math
+import time
+import warnings
+import numpy as np
+from gamutlibs.distributions import ProbabilityPlotEngine
+from gamutlibs.distributions import uniform_order_statistic_medians
+from gamutlibs.executors import SerialExecutor, TimeBudgetExceeded
+from gamutlibs.executors import submit_with_budget
+from gamutlibs.registry import rv_handle
+
+# Size of the first screening subsample; each round keeps the best 1/ETA of
+# the candidates (but at least FINALISTS) and grows the subsample ETA-fold
+SCREEN_START     = 500
+SCREEN_ETA       = 3
+SCREEN_FINALISTS = 3
+
+# Largest fraction of the subsample allowed outside a candidate's support
+SUPPORT_TOLERANCE = 0.05
+
+# Outcomes of screening
+SCREEN_STATUSES = ("finalist", "pruned", "unsupported", "failed", "timed out")
+
+
+def screening_subsample(sorted_samples, size):
+    """
+    Return 'size' order statistics of the sorted samples for a prob. plot
+
+    The order statistics are those at the subsample's own plotting positions
+    (Filliben's uniform order statistic medians), so that each estimates the
+    quantile it is plotted against; the extremes of a large data set would
+    otherwise stretch the tails of the subsample's prob. plot.
+    """
+    n = len(sorted_samples)
+    if size >= n:
+        return sorted_samples
+    ranks = np.round(uniform_order_statistic_medians(size) * n - 0.5)
+    return sorted_samples[np.clip(ranks, 0, n - 1).astype(np.intp)]
+
+
+def support_violation(label, shapes, slope, intercept, sorted_samples):
+    """
+    Return the fraction of samples outside the support of a regression fit
+
+    The support of 'label' (with 'shapes') is located and scaled by the
+    prob. plot regression line; a non-positive slope leaves no valid scale,
+    so every sample counts as outside.
+    """
+    if not (np.isfinite(slope) and np.isfinite(intercept) and slope > 0):
+        return 1.0
+    lower, upper = rv_handle(label).support(*shapes)
+    z = (sorted_samples - intercept) / slope
+    outside = np.searchsorted(z, lower, side="left") + \
+        len(z) - np.searchsorted(z, upper, side="right")
+    return float(outside) / len(z)
+
+
+def _score_candidate(label,
+                     shape_count,
+                     shapes,
+                     subsample,
+                     chooser=None,
+                     budget=None):
+    """
+    Prob. plot one candidate against a subsample; return a dict of the score
+
+    Module-level so that it can be dispatched to a process pool.  If shapes
+    is None they are chosen for the subsample by chooser(label, shape_count,
+    engine, deadline), whose result starts with the shapes (e.g.
+    scan.choose_shapes); the deadline is 'budget' seconds from the start.
+    """
+    deadline = time.perf_counter() + budget if budget is not None else None
+    engine = ProbabilityPlotEngine(subsample)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        with np.errstate(all="ignore"):
+            if shapes is None:
+                shapes = chooser(label, shape_count, engine, deadline)[0]
+            (osm, osr), (slope, intercept, r) = engine.probplot(label, shapes)
+            outside = support_violation(label, shapes, slope, intercept, osr)
+    return {"shapes"  : [float(shape) for shape in shapes],
+            "r2"      : float(r**2.0),
+            "outside" : outside}
+
+
+class ScreeningReport:
+    """
+    Decisions of a successive-halving screen of candidate distributions
+
+    There is one decision (a dict) per candidate, in the order screened:
+    its 'status' (see SCREEN_STATUSES), the 'round' and subsample 'size' of
+    its last score, that score ('r2'), its 'shapes' and the 'reason' it was
+    pruned.  'fingerprint' identifies the data set screened.
+    """
+
+    def __init__(self, decisions, sizes, fingerprint, seconds):
+        self.decisions   = decisions
+        self.sizes       = sizes
+        self.fingerprint = fingerprint
+        self.seconds     = seconds
+
+    def get_decisions(self):
+        return self.decisions
+
+    def get_finalists(self):
+        """
+        Return the indices of the candidates promoted to full fits
+        """
+        return [ii for ii, decision in enumerate(self.decisions)
+                if decision["status"] == "finalist"]
+
+    def get_sizes(self):
+        """
+        Return the subsample size of each round
+        """
+        return self.sizes
+
+    def get_fingerprint(self):
+        return self.fingerprint
+
+    def get_seconds(self):
+        return self.seconds
+
+    def summary(self):
+        """
+        Return a one-line summary of the screen
+        """
+        return "Screening kept %d of %d candidates (%d rounds, %.2f s)" \
+            % (len(self.get_finalists()),
+               len(self.decisions),
+               len(self.sizes),
+               self.seconds)
+
+    def report(self):
+        """
+        Return a table of the decisions, finalists first
+        """
+        lines = [self.summary() + "; subsample sizes: %s"
+                 % (", ".join(str(size) for size in self.sizes) or "none"),
+                 "%-24s %-12s %5s %8s %10s  %s"
+                 % ("distribution", "status", "round", "samples", "R^2",
+                    "reason")]
+        order = sorted(range(len(self.decisions)), key=lambda ii:
+                       (SCREEN_STATUSES.index(self.decisions[ii]["status"]),
+                        -(self.decisions[ii]["round"] or 0),
+                        -(self.decisions[ii]["r2"] or 0.0)))
+        for ii in order:
+            decision = self.decisions[ii]
+            label = decision["label"]
+            if decision["shapes"]:
+                label += "(%s)" % ", ".join("%g" % shape
+                                            for shape in decision["shapes"])
+            lines.append("%-24s %-12s %5s %8s %10s  %s"
+                         % (label,
+                            decision["status"],
+                            decision["round"] or "-",
+                            decision["size"] or "-",
+                            "-" if decision["r2"] is None
+                            else "%.6f" % decision["r2"],
+                            decision["reason"]))
+        return "\n".join(lines)
+
+
+def screen_candidates(engine,
+                      candidates,
+                      executor=None,
+                      budgets=None,
+                      start=SCREEN_START,
+                      eta=SCREEN_ETA,
+                      finalists=SCREEN_FINALISTS,
+                      chooser=None):
+    """
+    Screen candidates by successive halving; return a ScreeningReport.
+
+    candidates is a list of (label, shape count, shapes), shapes being None
+    to choose them on each subsample with 'chooser' (see _score_candidate).
+    Each round prob. plots the remaining candidates against a subsample of
+    the engine's (MLE fit) samples (see screening_subsample), rejects those
+    with more than SUPPORT_TOLERANCE of the subsample outside their support
+    at the regression's loc and scale, and promotes the best 1/eta by R^2
+    (at least 'finalists') to the next round, on an eta-fold subsample.
+    Screening stops before a round would use all the samples: the full
+    prob. plot and MLE fit are left to the finalists.
+
+    The scores of a round are spread over 'executor' (default: serial);
+    budgets is a function of the label giving the time budget of one score
+    (seconds or None), which bounds the choice of shapes on any executor.
+    """
+    begin = time.perf_counter()
+    if executor is None:
+        executor = SerialExecutor()
+    samples = engine.get_fit_samples()
+    decisions = [{"label"  : label,
+                  "shapes" : None if shapes is None else list(shapes),
+                  "status" : "finalist",
+                  "round"  : None,
+                  "size"   : None,
+                  "r2"     : None,
+                  "reason" : ""}
+                 for label, _, shapes in candidates]
+    alive = list(range(len(candidates)))
+    sizes = list()
+    size = start
+    while len(alive) > finalists and size < len(samples):
+        sizes.append(size)
+        subsample = screening_subsample(samples, size)
+        futures = dict()
+        for ii in alive:
+            label, shape_count, shapes = candidates[ii]
+            budget = budgets(label) if budgets is not None else None
+            futures[ii] = submit_with_budget(executor,
+                                             budget,
+                                             _score_candidate,
+                                             label,
+                                             shape_count,
+                                             shapes,
+                                             subsample,
+                                             chooser,
+                                             budget)
+        scored = list()
+        for ii in alive:
+            decision = decisions[ii]
+            decision["round"], decision["size"] = len(sizes), size
+            exc = futures[ii].exception()
+            if isinstance(exc, TimeBudgetExceeded):
+                decision["status"] = "timed out"
+                decision["reason"] = "prob. plot took over %.3g s" \
+                    % exc.seconds
+                continue
+            if isinstance(exc, TimeoutError):
+                decision["status"] = "timed out"
+                decision["reason"] = "no shapes chosen within %.3g s" \
+                    % budgets(decision["label"])
+                continue
+            if exc is not None:
+                decision["status"] = "failed"
+                decision["reason"] = "%s: %s" % (type(exc).__name__, exc)
+                continue
+            score = futures[ii].result()
+            decision["shapes"] = score["shapes"]
+            decision["r2"] = score["r2"]
+            if score["outside"] > SUPPORT_TOLERANCE:
+                decision["status"] = "unsupported"
+                decision["reason"] = "%.1f%% of samples outside the support" \
+                    % (100.0 * score["outside"])
+            elif not np.isfinite(score["r2"]):
+                decision["status"] = "failed"
+                decision["reason"] = "non-finite prob. plot regression"
+            else:
+                scored.append(ii)
+        scored.sort(key=lambda ii: -decisions[ii]["r2"])
+        keep = max(finalists, int(math.ceil(len(scored) / float(eta))))
+        for rank, ii in enumerate(scored[keep:], keep + 1):
+            decisions[ii]["status"] = "pruned"
+            decisions[ii]["reason"] = "ranked %d of %d by R^2" \
+                % (rank, len(scored))
+        alive = scored[:keep]
+        size *= eta
+    return ScreeningReport(decisions,
+                           sizes,
+                           engine.get_fingerprint(),
+                           time.perf_counter() - begin)
@@ -0,0 +1,264 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+import warnings
+import time
+import numpy as np
+import scipy.stats
+import scipy.optimize
+from gamutlibs.registry import rv_handle, shape_brackets
+
+# Largest number of ppf values evaluated in one array operation
+MAX_CHUNK_ELEMENTS = 1 << 22
+
+# Largest number of shape vectors evaluated between checks of a deadline
+DEADLINE_CHUNK_ROWS = 8
+
+
+def default_shape_bounds(label):
+    """
+    Return finite (lower, upper) search bounds for each shape of 'label'
+
+    (see gamutlibs.registry.shape_brackets)
+    """
+    return shape_brackets(rv_handle(label))
+
+
+def ppcc_grid(engine, label, shape_grid, deadline=None):
+    """
+    Return the prob. plot correlation coefficient for each row of shape_grid
+
+    shape_grid is an (M, k) array of shape factor values for a distribution
+    with k shapes.  The theoretical quantiles of all M candidates are computed
+    by broadcast ppf calls over engine's order statistic medians, in chunks of
+    at most MAX_CHUNK_ELEMENTS values; invalid shapes give NaN.  For reduced
+    (large data mode) engines the correlation is weighted like the engine's
+    regression.  With a 'deadline' (a time.perf_counter value) the chunks are
+    of at most DEADLINE_CHUNK_ROWS candidates, and those not started by the
+    deadline are left NaN.
+    """
+    shape_grid = np.atleast_2d(np.asarray(shape_grid, dtype=np.float64))
+    medians = engine.get_uniform_medians()
+    y = engine.get_sorted_samples()
+    weights = engine.get_weights()
+    if weights is None:
+        weights = np.ones(len(y))
+    weights = weights / np.sum(weights)
+    yc = y - np.dot(weights, y)
+    ynorm = np.sqrt(np.dot(weights, yc * yc))
+    dist = rv_handle(label)
+
+    ppcc = np.full(len(shape_grid), np.nan)
+    rows = max(1, MAX_CHUNK_ELEMENTS // max(len(medians), 1))
+    if deadline is not None:
+        rows = min(rows, DEADLINE_CHUNK_ROWS)
+    with warnings.catch_warnings(), np.errstate(all="ignore"):
+        warnings.simplefilter("ignore")
+        for start in range(0, len(shape_grid), rows):
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            chunk = shape_grid[start:start + rows]
+            osm = dist.ppf(medians[np.newaxis, :],
+                           *[shape[:, np.newaxis] for shape in chunk.T])
+            osm = osm - np.dot(osm, weights)[:, np.newaxis]
+            ppcc[start:start + rows] = np.dot(osm, weights * yc) / \
+                (np.sqrt(np.dot(osm**2.0, weights)) * ynorm)
+    return ppcc
+
+
+class _DeadlinePassed(Exception):
+    pass
+
+
+def maximize_ppcc(engine,
+                  label,
+                  bounds=None,
+                  num_samples=256,
+                  num_polish=3,
+                  deadline=None):
+    """
+    Find the shape factors of 'label' maximizing the prob. plot correlation.
+
+    The search covers 1 to 4 shape parameters within 'bounds' (a list of
+    (lower, upper) tuples, by default from default_shape_bounds).  A
+    scrambled Sobol sample of 'num_samples' shape vectors is evaluated in
+    vectorized form (ppcc_grid), and the 'num_polish' best are refined with
+    a bounded local optimizer.
+
+    The search stops at 'deadline' (a time.perf_counter value), keeping the
+    best shapes evaluated so far.  ValueError is raised if none are valid.
+
+    Return a dict with the optimal 'shapes', the 'ppcc' and 'r2' values, the
+    number of ppf 'evaluations' (shape vectors tried), the 'seconds' spent
+    and whether the search was cut short ('timed_out').
+    """
+    start = time.perf_counter()
+    if bounds is None:
+        bounds = default_shape_bounds(label)
+    bounds = np.asarray(bounds, dtype=np.float64)
+    lower, upper = bounds[:, 0], bounds[:, 1]
+    k = len(bounds)
+
+    # Global stage: quasi-random sample of the bounded shape space
+    qmc = scipy.stats.qmc
+    sobol = qmc.Sobol(d=k, scramble=True, seed=0)
+    grid = qmc.scale(sobol.random(num_samples), lower, upper) \
+        if np.all(upper > lower) else np.tile(lower, (num_samples, 1))
+    ppcc = ppcc_grid(engine, label, grid, deadline)
+    evaluations = len(grid)
+    timed_out = False
+
+    order = np.argsort(np.where(np.isfinite(ppcc), -ppcc, np.inf))
+    best_shapes, best_objective = None, np.inf
+    if np.isfinite(ppcc[order[0]]):
+        best_shapes, best_objective = grid[order[0]], 1.0 - ppcc[order[0]]
+
+    # Local stage: polish the best few starting points
+    def objective(shapes):
+        nonlocal best_shapes, best_objective
+        if deadline is not None and time.perf_counter() > deadline:
+            raise _DeadlinePassed()
+        value = ppcc_grid(engine, label, shapes)[0]
+        if not np.isfinite(value):
+            return 2.0
+        if 1.0 - value < best_objective:
+            best_shapes = np.atleast_1d(np.array(shapes, dtype=np.float64))
+            best_objective = 1.0 - value
+        return 1.0 - value
+
+    for index in order[:num_polish]:
+        if not np.isfinite(ppcc[index]):
+            continue
+        try:
+            if k == 1:
+                # bounded scalar search between the neighbouring sample points
+                values = np.sort(grid[:, 0])
+                position = np.searchsorted(values, grid[index, 0])
+                result = scipy.optimize.minimize_scalar(
+                    lambda shape: objective([shape]),
+                    bounds=(values[max(position - 1, 0)],
+                            values[min(position + 1, len(values) - 1)]),
+                    method="bounded")
+            else:
+                result = scipy.optimize.minimize(objective,
+                                                 grid[index],
+                                                 method="Nelder-Mead",
+                                                 bounds=bounds)
+        except _DeadlinePassed:
+            timed_out = True
+            break
+        evaluations += result.nfev
+    timed_out = timed_out or \
+        (deadline is not None and time.perf_counter() > deadline)
+
+    if best_shapes is None:
+        raise ValueError("No valid shape factors found for %s within %s"
+                         % (label, bounds.tolist()))
+    value = 1.0 - best_objective
+    return {"shapes"      : [float(shape) for shape in best_shapes],
+            "ppcc"        : float(value),
+            "r2"          : float(value)**2.0,
+            "evaluations" : int(evaluations),
+            "seconds"     : time.perf_counter() - start,
+            "timed_out"   : timed_out}
+
+
+class ShapeSweep:
+    """
+    The prob. plot correlation coefficient (PPCC) and R^2 of a distribution
+    as a function of one of its shape factors, the others held fixed.
+
+    The whole curve is computed with broadcast ppf calls (see ppcc_grid),
+    rather than one probability plot per shape value.
+    """
+
+    def __init__(self,
+                 label,
+                 values,
+                 shapes=None,
+                 index=0):
+        self.label  = label
+        self.values = np.asarray(values, dtype=np.float64).reshape(-1)
+        self.shapes = [float(shape) for shape in shapes] \
+            if shapes is not None else [0.0]
+        self.index  = index
+        self.ppcc    = None
+        self.seconds = None
+
+    def compute(self, engine):
+        """
+        Evaluate the PPCC at every shape value, against the data of 'engine'
+        """
+        start = time.perf_counter()
+        grid = np.tile(np.asarray(self.shapes, dtype=np.float64),
+                       (len(self.values), 1))
+        grid[:, self.index] = self.values
+        self.ppcc = ppcc_grid(engine, self.label, grid)
+        self.seconds = time.perf_counter() - start
+        return self
+
+    def get_label(self):
+        return self.label
+
+    def get_values(self):
+        return self.values
+
+    def get_ppcc(self):
+        return self.ppcc
+
+    def get_r2(self):
+        return self.ppcc**2.0
+
+    def get_seconds(self):
+        return self.seconds
+
+    def get_best(self, count=3):
+        """
+        Return the full shape vectors of the 'count' best points of the curve
+
+        Local maxima of the PPCC are preferred (highest first); the best of
+        the remaining points fill in if there are fewer than 'count' of them.
+        """
+        ppcc = np.where(np.isfinite(self.ppcc), self.ppcc, -np.inf)
+        padded = np.concatenate(([-np.inf], ppcc, [-np.inf]))
+        peaks = np.flatnonzero((ppcc > padded[:-2]) & (ppcc >= padded[2:]))
+        others = np.setdiff1d(np.arange(len(ppcc)), peaks)
+        order = np.concatenate((peaks[np.argsort(-ppcc[peaks])],
+                                others[np.argsort(-ppcc[others])]))
+        best = list()
+        for position in order[:count]:
+            if not np.isfinite(ppcc[position]):
+                break
+            shapes = list(self.shapes)
+            shapes[self.index] = float(self.values[position])
+            best.append(shapes)
+        return best
+
+    def plot_sweep(self, axes, count=3):
+        """
+        Draw the R^2 curve on the provided axes, marking the best points
+        """
+        axes.plot(self.values, self.get_r2(), 'b-', label=r'$R^2$')
+        best = np.array([shapes[self.index] for shapes in self.get_best(count)])
+        if len(best):
+            r2 = np.interp(best, self.values, self.get_r2())
+            axes.plot(best, r2, 'ro', label='Best Points')
+        axes.set_xlabel('Shape Factor %d' % (self.index + 1))
+        axes.set_ylabel(r'$R^2$')
+        axes.set_title('%s: Shape Sweep' % self.label)
+        axes.grid(True)
+        axes.legend(loc='best')
+
+
+def shape_sweep(engine, label, values, shapes=None, index=0):
+    """
+    Return a computed ShapeSweep of shape factor 'index' of 'label' over values
+    """
+    return ShapeSweep(label, values, shapes, index).compute(engine)
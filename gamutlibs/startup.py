@@ -0,0 +1,120 @@
+###############################################################################
+#
+#    gamut
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/gamut
+#
+###############################################################################
+
+import importlib
+import subprocess
+import sys
+import time
+import types
+
+# Heavy modules deferred until first use (see defer_heavy_imports)
+HEAVY_MODULES = ("scipy.stats",
+                 "scipy.optimize",
+                 "scipy.special")
+
+
+class _DeferredModule(types.ModuleType):
+    """
+    Placeholder for a module that is imported on first attribute access
+    """
+
+    def __getattr__(self, attr):
+        return getattr(_load_deferred(self.__name__), attr)
+
+    def __dir__(self):
+        return dir(_load_deferred(self.__name__))
+
+
+def _load_deferred(name):
+    """
+    Replace the placeholder of module 'name' by the imported module
+    """
+    if isinstance(sys.modules.get(name), _DeferredModule):
+        del sys.modules[name]
+    module = importlib.import_module(name)
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+def lazy_import(name):
+    """
+    Return module 'name', deferring its import until first attribute access
+
+    A module that is already imported is returned as is.  Until then, later
+    'import name' statements receive the same placeholder, and attribute
+    access through the parent package (e.g. scipy.stats.norm) imports it.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    parent, _, child = name.rpartition(".")
+    module = _DeferredModule(name)
+    sys.modules[name] = module
+    if parent:
+        setattr(importlib.import_module(parent), child, module)
+    return module
+
+
+def defer_heavy_imports(names=HEAVY_MODULES):
+    """
+    Register the heavy modules as lazy, so that importing gamutlibs is cheap
+    """
+    for name in names:
+        lazy_import(name)
+
+
+def preload(names):
+    """
+    Force the (lazy) modules 'names' to load; return {name: milliseconds}
+    """
+    timings = dict()
+    for name in names:
+        start = time.perf_counter()
+        if isinstance(sys.modules.get(name), _DeferredModule):
+            _load_deferred(name)
+        else:
+            importlib.import_module(name)
+        timings[name] = 1000.0 * (time.perf_counter() - start)
+    return timings
+
+
+def import_time_report(module="gamut", top=20):
+    """
+    Return [(module, cumulative ms, self ms), ...] for importing 'module'
+
+    The module is imported in a fresh interpreter with '-X importtime'; the
+    'top' entries with the largest cumulative time are returned.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime",
+                             "-c", "import %s" % module],
+                            stderr=subprocess.PIPE,
+                            stdout=subprocess.DEVNULL,
+                            universal_newlines=True)
+    rows = list()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(),
+                     int(cumulative_us) / 1000.0,
+                     int(self_us) / 1000.0))
+    rows.sort(key=lambda row: -row[1])
+    return rows[:top]
+
+
+def format_import_report(rows):
+    """
+    Return the rows of import_time_report as a printable table
+    """
+    lines = ["%-48s %12s %10s" % ("module", "cumul. [ms]", "self [ms]")]
+    for name, cumulative, own in rows:
+        lines.append("%-48s %12.1f %10.1f" % (name, cumulative, own))
+    return "\n".join(lines)